@@ -1,22 +1,88 @@
+import sys
 import random
 from collections import defaultdict
 import json
+from kuhn_best_response import exploitability, ExploitabilityMonitor
+
+CARD_RANK = {"J": 0, "Q": 1, "K": 2}
+
+# 遗憾更新规则：原始 CFR、CFR+、Linear CFR、Discounted CFR
+VARIANTS = ["cfr", "cfr+", "linear", "discounted"]
+
+# 训练模式：机会采样（全宽遍历动作）、外部采样 MCCFR、结果采样 MCCFR
+MODES = ["chance", "external", "outcome"]
 
 class KuhnTrainer:
-    def __init__(self):
+    def __init__(self, variant="cfr", alpha=1.5, beta=0.0, gamma=2.0, exploration=0.6):
+        if variant not in VARIANTS:
+            raise ValueError(f"Unknown CFR variant: {variant} (choose from {VARIANTS})")
         self.node_map = {}
+        self.variant = variant
+        # DCFR 折扣参数（仅 variant="discounted" 使用）
+        self.alpha = alpha
+        self.beta = beta
+        self.gamma = gamma
+        # 结果采样中遍历者的探索率 ε
+        self.exploration = exploration
+        self.iteration = 0
+        self.exploitability_history = []
+
+    def train(self, iterations=100000, target_exploitability=None, check_every=1000, callback=None,
+              mode="chance"):
+        """
+        target_exploitability 不为 None 时进入收敛模式：每 check_every 次迭代计算一次
+        exploitability，低于目标即提前停止，iterations 只作为上限。
+        callback(trainer, iteration) 每次迭代后调用，返回 True 时停止（如 ExploitabilityMonitor）。
+        mode 选择 "chance"（默认）、"external" 或 "outcome" 采样，三者共用同一份 Node 存储。
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown training mode: {mode} (choose from {MODES})")
+        if callback is None and target_exploitability is not None:
+            callback = ExploitabilityMonitor(check_every, target_exploitability)
+        if isinstance(callback, ExploitabilityMonitor):
+            self.exploitability_history = callback.history
 
-    def train(self, iterations=100000):
         cards = ['J', 'Q', 'K']
         util = 0
+        completed = 0
         for _ in range(iterations):
+            self.iteration += 1
             random.shuffle(cards)
-            util += self.cfr(cards[:2], "", 1, 1)
-        print("Average game value:", util / iterations)
+            if mode == "chance":
+                util += self.cfr(cards[:2], "", 1, 1)
+            elif mode == "external":
+                # 两名玩家轮流作为遍历者
+                util += self.external_sampling(cards[:2], "", 0)
+                self.external_sampling(cards[:2], "", 1)
+            else:
+                # 根节点价值的无偏估计 = 采样收益 / 采样概率 × 路径到达概率
+                value, tail = self.outcome_sampling(cards[:2], "", 0, 1, 1)
+                util += value * tail
+                self.outcome_sampling(cards[:2], "", 1, 1, 1)
+            completed += 1
+            if self.variant == "discounted":
+                for node in self.node_map.values():
+                    node.discount(self.iteration, self.alpha, self.beta, self.gamma)
+
+            if callback is not None and callback(self, self.iteration):
+                if self.exploitability_history:
+                    print(f"[✔] Converged after {self.iteration} iterations: "
+                          f"exploitability {self.exploitability_history[-1][1]:.6f}")
+                break
+
+        print("Average game value:", util / completed)
+        if self.exploitability_history:
+            print("Exploitability:", self.exploitability_history[-1][1])
         print("\n--- Strategy Table ---")
         for key in sorted(self.node_map):
             print(self.node_map[key])
 
+    def get_average_strategy_map(self):
+        return {info_set: node.get_average_strategy() for info_set, node in self.node_map.items()}
+
+    def exploitability(self):
+        return exploitability(self.get_average_strategy_map())
+
     def cfr(self, cards, history, p0, p1):
         plays = len(history)
         player = plays % 2
@@ -25,13 +91,8 @@ class KuhnTrainer:
         if self.is_terminal(history):
             return self.payoff(cards, history)
 
-        info_set = cards[player] + history
-        node = self.node_map.get(info_set)
-        if node is None:
-            node = Node(info_set)
-            self.node_map[info_set] = node
-
-        strategy = node.get_strategy(p0 if player == 0 else p1)
+        node = self.get_node(cards[player] + history)
+        strategy = node.get_strategy((p0 if player == 0 else p1) * self.strategy_weight())
         util = [0.0 for _ in range(2)]
         node_util = 0
 
@@ -43,18 +104,95 @@ class KuhnTrainer:
                 util[a] = -self.cfr(cards, next_history, p0, p1 * strategy[a])
             node_util += strategy[a] * util[a]
 
-        for a in range(2):
-            regret = util[a] - node_util
-            node.regret_sum[a] += (p1 if player == 0 else p0) * regret
+        regrets = [(p1 if player == 0 else p0) * (util[a] - node_util) for a in range(2)]
+        node.update_regret(regrets, self.variant, self.iteration)
 
         return node_util
 
+    def external_sampling(self, cards, history, traverser):
+        """外部采样 MCCFR：遍历者节点展开全部动作，对手节点按当前策略只采样一个动作"""
+        player = len(history) % 2
+        if self.is_terminal(history):
+            return self.utility(cards, history, traverser)
+
+        node = self.get_node(cards[player] + history)
+        if player != traverser:
+            # 对手节点：累积平均策略后采样一个动作
+            strategy = node.get_strategy(self.strategy_weight())
+            a = 0 if random.random() < strategy[0] else 1
+            return self.external_sampling(cards, history + ("p" if a == 0 else "b"), traverser)
+
+        strategy = list(node.get_strategy(0))
+        util = [self.external_sampling(cards, history + act, traverser) for act in ("p", "b")]
+        node_util = strategy[0] * util[0] + strategy[1] * util[1]
+        node.update_regret([u - node_util for u in util], self.variant, self.iteration)
+        return node_util
+
+    def outcome_sampling(self, cards, history, traverser, pi_o, sample_prob):
+        """
+        结果采样 MCCFR：每次只采样一条路径，遍历者节点按 ε-探索策略采样，
+        用重要性权重修正遗憾。返回 (采样收益 / 采样概率, 尾部到达概率)。
+        """
+        player = len(history) % 2
+        if self.is_terminal(history):
+            return self.utility(cards, history, traverser) / sample_prob, 1.0
+
+        node = self.get_node(cards[player] + history)
+        strategy = list(node.get_strategy(0))
+        if player == traverser:
+            eps = self.exploration
+            sampling = [eps * 0.5 + (1 - eps) * strategy[a] for a in range(2)]
+        else:
+            sampling = strategy
+        a = 0 if random.random() < sampling[0] else 1
+        next_history = history + ("p" if a == 0 else "b")
+
+        if player == traverser:
+            util, tail = self.outcome_sampling(cards, next_history, traverser,
+                                               pi_o, sample_prob * sampling[a])
+            w = util * pi_o
+            regrets = [0.0, 0.0]
+            for b in range(2):
+                if b == a:
+                    regrets[b] = w * tail * (1 - strategy[a])
+                else:
+                    regrets[b] = -w * tail * strategy[a]
+            node.update_regret(regrets, self.variant, self.iteration)
+        else:
+            util, tail = self.outcome_sampling(cards, next_history, traverser,
+                                               pi_o * strategy[a], sample_prob * sampling[a])
+            # 随机加权平均：对手节点按 对手到达概率 / 采样概率 累积平均策略
+            weight = pi_o / sample_prob * self.strategy_weight()
+            for b in range(2):
+                node.strategy_sum[b] += weight * strategy[b]
+        return util, tail * strategy[a]
+
+    def get_node(self, info_set):
+        node = self.node_map.get(info_set)
+        if node is None:
+            node = Node(info_set)
+            self.node_map[info_set] = node
+        return node
+
+    def utility(self, cards, history, player):
+        """终局收益，视角为指定玩家"""
+        payoff = self.payoff(cards, history)
+        return payoff if len(history) % 2 == player else -payoff
+
+    def strategy_weight(self):
+        # CFR+ 与 Linear CFR 对平均策略按迭代次数线性加权
+        if self.variant in ("cfr+", "linear"):
+            return self.iteration
+        return 1
+
     def is_terminal(self, history):
         return history in ["pp", "pbp", "bp", "bb", "pbb"]
 
     def payoff(self, cards, history):
-        player_card = cards[0]
-        opp_card = cards[1]
+        # 收益视角为当前轮到行动的玩家；按 J < Q < K 比较牌力（字符串比较会得到 K < Q）
+        player = len(history) % 2
+        player_card = CARD_RANK[cards[player]]
+        opp_card = CARD_RANK[cards[1 - player]]
         if history == "pp":
             return 1 if player_card > opp_card else -1
         elif history in ["pbp", "bp"]:
@@ -84,6 +222,26 @@ class Node:
             self.strategy_sum[a] += realization_weight * self.strategy[a]
         return self.strategy
 
+    def update_regret(self, regrets, variant="cfr", iteration=1):
+        for a in range(2):
+            if variant == "linear":
+                self.regret_sum[a] += iteration * regrets[a]
+            else:
+                self.regret_sum[a] += regrets[a]
+            if variant == "cfr+":
+                self.regret_sum[a] = max(self.regret_sum[a], 0.0)
+
+    def discount(self, iteration, alpha, beta, gamma):
+        # DCFR：正遗憾乘 t^α/(t^α+1)，负遗憾乘 t^β/(t^β+1)，累计策略乘 (t/(t+1))^γ
+        positive_scale = iteration ** alpha / (iteration ** alpha + 1)
+        negative_scale = iteration ** beta / (iteration ** beta + 1)
+        for a in range(2):
+            if self.regret_sum[a] > 0:
+                self.regret_sum[a] *= positive_scale
+            else:
+                self.regret_sum[a] *= negative_scale
+            self.strategy_sum[a] *= (iteration / (iteration + 1)) ** gamma
+
     def get_average_strategy(self):
         avg_strategy = [0.0, 0.0]
         normalizing_sum = sum(self.strategy_sum)
@@ -100,8 +258,11 @@ class Node:
 
 
 if __name__ == "__main__":
-    trainer = KuhnTrainer()
-    trainer.train(100000)
+    # 用法：python "Cfr Kuhn Poker.py" [cfr|cfr+|linear|discounted]
+    variant = sys.argv[1] if len(sys.argv) > 1 else "cfr"
+    trainer = KuhnTrainer(variant=variant)
+    # 收敛模式：exploitability 低于 0.001 即停止，100000 次迭代为上限
+    trainer.train(100000, target_exploitability=0.001, check_every=1000)
 
     # 保存平均策略为 JSON 文件
     strategy_dict = {}
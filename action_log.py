@@ -0,0 +1,110 @@
+import os
+import json
+from collections import deque
+
+
+class MemorySink:
+    """内存日志：最多保留 max_records 条（超出后丢弃最旧的记录），max_records=None 时不设上限"""
+
+    def __init__(self, max_records=100000):
+        self.records = deque(maxlen=max_records)
+
+    def write(self, record):
+        self.records.append(record)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class JsonlSink:
+    """
+    把记录以 JSON Lines 追加写入磁盘：先放入定长缓冲区，
+    满 buffer_size 条后一次性批量写入，内存占用与运行长度无关。
+    """
+
+    def __init__(self, path, buffer_size=1024, append=False):
+        self.path = path
+        self.buffer_size = buffer_size
+        self.buffer = []
+        self.count = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(path, "a" if append else "w")
+
+    def write(self, record):
+        self.buffer.append(record)
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self.file.closed:
+            return
+        if self.buffer:
+            self.file.write("".join(json.dumps(r) + "\n" for r in self.buffer))
+            self.count += len(self.buffer)
+            self.buffer.clear()
+        self.file.flush()
+
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+
+def read_jsonl(path):
+    with open(path, "r") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+class ActionLog:
+    """
+    动作日志：未结算的记录按 (round_count, player_uuid) 建索引暂存，
+    回合结束分配奖励时 O(1) 找到对应记录并交给 sink 输出，之后不再驻留内存。
+    rounds 保存当前对局的回合汇总（胜者、筹码、动作），由 reset() 清空。
+    """
+
+    def __init__(self, sink=None):
+        self.sink = sink if sink is not None else MemorySink()
+        self.rounds = {}
+        self.pending = {}
+
+    def set_sink(self, sink):
+        self.flush()
+        self.sink.close()
+        self.sink = sink
+
+    def log_action(self, entry):
+        key = (entry.get("round_count"), entry.get("player_uuid"))
+        self.pending.setdefault(key, []).append(entry)
+
+    def assign_reward(self, round_count, player_uuid, reward):
+        """给该玩家本回合最近一次动作记录赋奖励，并把本回合记录写出；没有待结算记录时返回 False"""
+        entries = self.pending.pop((round_count, player_uuid), None)
+        if not entries:
+            return False
+        entries[-1]["reward"] = reward
+        for entry in entries:
+            self.sink.write(entry)
+        return True
+
+    def record_round(self, round_count, info):
+        self.rounds[round_count] = info
+
+    def flush(self):
+        """写出所有尚未结算的记录（reward 保持为 None）"""
+        for entries in self.pending.values():
+            for entry in entries:
+                self.sink.write(entry)
+        self.pending.clear()
+        self.sink.flush()
+
+    def reset(self):
+        """开始新的对局：写出残留记录并清空回合汇总"""
+        self.flush()
+        self.rounds = {}
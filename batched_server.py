@@ -0,0 +1,108 @@
+import time
+import queue
+import threading
+from concurrent.futures import Future
+
+
+class BatchedServer:
+    """
+    批量请求服务的通用部分：多个线程（多张牌桌）通过 submit / call 提交请求，
+    后台线程把等待中的请求凑成一批——达到 max_batch 条或第一条请求已等待 max_latency 秒——
+    交给子类的 process(requests) 一次处理，再把各自的结果返回给对应的调用者。
+    """
+
+    def __init__(self, max_batch=256, max_latency=0.002):
+        self.max_batch = max_batch
+        self.max_latency = max_latency
+        self.requests = queue.Queue()
+        self.batches = 0
+        self.requests_served = 0
+        self._stop = threading.Event()
+        self._stop.set()
+        # submit 与 stop 互斥：stop 之后不会再有请求进入队列，join 之后排空队列即可
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._loop, daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self):
+        """停止后台线程；队列中剩下的请求照常处理完，等待结果的调用者不会卡住"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            self._stop.set()
+        if thread is not None:
+            thread.join()
+        self._drain()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def submit(self, request):
+        """提交一个请求，返回 Future"""
+        future = Future()
+        with self._lock:
+            if self._stop.is_set():
+                future.set_exception(RuntimeError(f"{type(self).__name__} is not running"))
+            else:
+                self.requests.put((request, future))
+        return future
+
+    def call(self, request):
+        return self.submit(request).result()
+
+    def mean_batch_size(self):
+        return self.requests_served / self.batches if self.batches else 0.0
+
+    def process(self, requests):
+        """一次处理整批请求，返回与 requests 等长的结果序列"""
+        raise NotImplementedError
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                batch = [self.requests.get(timeout=0.05)]
+            except queue.Empty:
+                continue
+            deadline = time.perf_counter() + self.max_latency
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.requests.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._run(batch)
+
+    def _drain(self):
+        while True:
+            batch = []
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self.requests.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return
+            self._run(batch)
+
+    def _run(self, batch):
+        try:
+            results = self.process([request for request, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        self.batches += 1
+        self.requests_served += len(batch)
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
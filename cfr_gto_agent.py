@@ -1,12 +1,63 @@
 import random
 import json
+from bisect import bisect
+from itertools import accumulate
 from pypokerengine.players import BasePokerPlayer
 from shared_data import global_action_log, training_data
+from short_deck_eval import DECK
+from short_deck_engine import STREETS
+
+
+class CompiledStrategy:
+    """
+    把 {info_set: {action: prob}} 策略表编译成前缀树 + 累积概率表：
+    信息集 key（手牌字符 + 历史字符）逐字符推进得到整数状态 id，
+    每个 id 对应 (动作元组, 累积概率元组)，查表与采样都是常数时间。
+    """
+    DEAD = -1  # 前缀不在策略表中
+
+    def __init__(self, strategy_map):
+        self.transitions = [{}]
+        self.entries = [None]
+        for info_set, strategy in strategy_map.items():
+            state = 0
+            for ch in info_set:
+                nxt = self.transitions[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.transitions)
+                    self.transitions[state][ch] = nxt
+                    self.transitions.append({})
+                    self.entries.append(None)
+                state = nxt
+            self.entries[state] = (tuple(strategy.keys()), tuple(accumulate(strategy.values())))
+
+    def step(self, state, ch):
+        if state == self.DEAD:
+            return self.DEAD
+        return self.transitions[state].get(ch, self.DEAD)
+
+    def lookup(self, key):
+        state = 0
+        for ch in key:
+            state = self.step(state, ch)
+        return state
+
+    def sample(self, state, default="call"):
+        """与 random.choices(actions, weights=probs) 同分布；不在表中时返回 default"""
+        entry = self.entries[state] if state != self.DEAD else None
+        if entry is None:
+            return default
+        actions, cum_probs = entry
+        return actions[bisect(cum_probs, random.random() * cum_probs[-1], 0, len(actions) - 1)]
+
 
 class CFRGTOAgent(BasePokerPlayer):
     def __init__(self, strategy_file="kuhn_gto_strategy.json"):
         with open(strategy_file, "r") as f:
             self.strategy_map = json.load(f)
+        self.strategy = CompiledStrategy(self.strategy_map)
+        # 本局信息集的前缀树状态，随自己的动作增量推进；None 表示未收到回合开始消息
+        self.info_state = None
         self.uuid = None
         self.name = "GTO"
 
@@ -17,26 +68,27 @@ class CFRGTOAgent(BasePokerPlayer):
                 break
 
     def receive_round_start_message(self, round_count, hole_card, seats):
-        # 可选：你可以记录 hole_card 或 round_count 做更详细的分析
-        pass
+        # 信息集 key 以手牌首字符开头，之后逐个追加自己的动作首字母
+        self.info_state = self.strategy.step(0, hole_card[0][0])
 
     def receive_street_start_message(self, street, round_state):
-        # 可选：记录当前街道开始的信息，比如街道名称、公共牌等
-        pass
+        # 盲注不会通过 game_update 下发，翻前开始时从历史中补上自己的盲注
+        if street == "preflop" and self.info_state is not None:
+            for act in round_state.get("action_histories", {}).get("preflop", []):
+                if act.get("uuid") == self.uuid:
+                    self.info_state = self.strategy.step(self.info_state, act["action"][0].lower())
 
     def receive_game_update_message(self, new_action, round_state):
-        # 可用于记录对手动作
-        pass
+        if self.info_state is not None and new_action["player_uuid"] == self.uuid:
+            self.info_state = self.strategy.step(self.info_state, new_action["action"][0].lower())
 
     def declare_action(self, valid_actions, hole_card, round_state):
-        card = hole_card[0][0]
-        history = self.get_action_history(round_state)
-        info_set = card + history
-
-        strategy = self.strategy_map.get(info_set, {"call": 1.0})
-        actions = list(strategy.keys())
-        probs = list(strategy.values())
-        action = random.choices(actions, weights=probs)[0]
+        if self.info_state is None:
+            # 未收到回合消息（例如直接调用）时退回到扫描完整历史
+            state = self.strategy.lookup(hole_card[0][0] + self.get_action_history(round_state))
+        else:
+            state = self.info_state
+        action = self.strategy.sample(state)
         amount = self.get_action_amount(valid_actions, action)
 
         # ✅ 日志记录
@@ -45,21 +97,25 @@ class CFRGTOAgent(BasePokerPlayer):
             stack = next(p["stack"] for p in round_state["seats"] if p["uuid"] == self.uuid)
         except:
             stack = 0
+        self.log_decision(round_count, hole_card, round_state.get("community_card", []),
+                          round_state.get("street", ""), stack, valid_actions, action, amount)
+        return action, amount
+
+    def log_decision(self, round_count, hole_card, community_card, street, stack, valid_actions, action, amount):
         state_action_pair = {
             "round_count": round_count,
             "player_uuid": self.uuid,
             "player_name": self.name,
             "hole_card": hole_card,
-            "community_card": round_state.get("community_card", []),
-            "street": round_state.get("street", ""),
+            "community_card": community_card,
+            "street": street,
             "player_stack": stack,
             "valid_actions": valid_actions,
             "action_taken": action,
             "amount": amount,
             "reward": None
         }
-        global_action_log["data"].append(state_action_pair)
-        return action, amount
+        global_action_log.log_action(state_action_pair)
 
     def get_action_amount(self, valid_actions, action):
         for act in valid_actions:
@@ -75,37 +131,75 @@ class CFRGTOAgent(BasePokerPlayer):
             actions = round_state.get("action_histories", {})
             for street in ["preflop", "flop", "turn", "river"]:
                 for act in actions.get(street, []):
-                    if act["player_uuid"] == self.uuid:
+                    # pypokerengine 的历史记录中玩家字段为 "uuid"
+                    if act.get("uuid") == self.uuid:
                         history += act["action"][0].lower()
             return history
         except:
             return ""
 
     def receive_round_result_message(self, winners, hand_info, round_state):
+        # ✅ 按 (回合, uuid) 直接定位待结算的动作记录
+        round_count = round_state.get("round_count", -1)
         try:
-            for entry in reversed(global_action_log["data"]):
-                if entry["player_uuid"] == self.uuid and entry["reward"] is None:
-                    reward = 1 if any(w["uuid"] == self.uuid for w in winners) else -1
-                    entry["reward"] = reward
-                    break
+            won = any(w["uuid"] == self.uuid for w in winners)
         except Exception as e:
             print(f"[ERROR] reward assignment failed: {e}")
+            won = None
 
         # ✅ 添加回合级别的日志记录
-        round_count = round_state.get("round_count", -1)
         try:
             player_stack = next(p["stack"] for p in round_state["seats"] if p["uuid"] == self.uuid)
             opponent_stack = next(p["stack"] for p in round_state["seats"] if p["uuid"] != self.uuid)
         except:
             player_stack = 0
             opponent_stack = 0
-        global_action_log["rounds"][round_count] = {
+        histories = round_state.get("action_histories", {})
+        actions = [f'{a["action"]}:{a.get("amount", 0)}'
+                   for street in ["preflop", "flop", "turn", "river"] for a in histories.get(street, [])]
+        self.record_round(round_count, won, winners[0]["name"] if winners else "",
+                          player_stack, opponent_stack, actions)
+
+    def record_round(self, round_count, won, winner_name, player_stack, opponent_stack, actions):
+        if won is not None:
+            global_action_log.assign_reward(round_count, self.uuid, 1 if won else -1)
+        global_action_log.record_round(round_count, {
             "player1_stack": player_stack,
             "opponent_stack": opponent_stack,
-            "winner": winners[0]["name"] if winners else "",
-            "actions": [f'{a["action"]}:{a.get("amount", 0)}' for a in round_state.get("action_histories", {}).get("preflop", [])]
-           + [f'{a["action"]}:{a.get("amount", 0)}' for a in round_state.get("action_histories", {}).get("flop", [])]
-           + [f'{a["action"]}:{a.get("amount", 0)}' for a in round_state.get("action_histories", {}).get("turn", [])]
-           + [f'{a["action"]}:{a.get("amount", 0)}' for a in round_state.get("action_histories", {}).get("river", [])]
+            "winner": winner_name,
+            "actions": actions
+        })
 
-        }
+    # ===== ShortDeckEngine 快速路径：直接读取 HandState，不构造 round_state =====
+    def game_start(self, engine, seat, max_round):
+        self.engine = engine
+        self.uuid = engine.uuids[seat]
+
+    def round_start(self, state, seat):
+        self.info_state = self.strategy.step(0, DECK[state.hole[seat][0]][0])
+        for _, actor, action, _, _ in state.history:
+            if actor == seat:
+                self.info_state = self.strategy.step(self.info_state, action[0].lower())
+
+    def update(self, state, seat, actor, action, amount):
+        if actor == seat:
+            self.info_state = self.strategy.step(self.info_state, action[0].lower())
+
+    def act(self, state, seat):
+        action = self.strategy.sample(self.info_state)
+        if action == "raise":
+            amount = state.raise_range(seat)[0]
+        elif action == "call":
+            amount = state.call_amount()
+        else:
+            amount = 0
+        self.log_decision(state.round_count, [DECK[c] for c in state.hole[seat]],
+                          [DECK[c] for c in state.community_cards()], STREETS[state.street],
+                          state.stacks[seat], state.valid_actions(seat), action, amount)
+        return action, amount
+
+    def round_end(self, state, seat, winners, hand_info):
+        names = self.engine.names
+        actions = [f"{action}:{amount}" for _, _, action, amount, _ in state.history]
+        self.record_round(state.round_count, seat in winners, names[winners[0]],
+                          state.stacks[seat], state.stacks[1 - seat], actions)
@@ -0,0 +1,263 @@
+import sys
+import json
+import time
+import random
+
+import numpy as np
+
+from poker_games import ACTION_NAMES, KuhnGame, LeducGame, ShortDeckPreflopGame
+
+# 训练模式：机会采样（全宽遍历动作）、外部采样 MCCFR、结果采样 MCCFR
+MODES = ["chance", "external", "outcome"]
+
+
+class InfoSetTable:
+    """
+    紧凑的信息集存储：博弈把信息集编成 (私有部分 id, 历史 id)（见 Game.info_set_id），
+    行号放在 rows[历史 id, 私有部分 id] 这个 int32 数组中（-1 表示尚未出现），
+    regret / strategy 累积量放在按需倍增的 (容量, max_actions) float32 数组中。
+    每个信息集只占数组中的几项，不创建 Node 对象、字典项或 key 字符串；导出时由 ids 经博弈还原 key。
+    """
+
+    def __init__(self, max_actions, capacity=1024, dtype=np.float32):
+        self.max_actions = max_actions
+        self.size = 0
+        self.rows = np.full((64, 16), -1, dtype=np.int32)
+        self.ids = np.zeros((capacity, 2), dtype=np.int32)  # 每行的 (私有部分 id, 历史 id)
+        self.num_actions = np.zeros(capacity, dtype=np.int8)
+        self.regret_sum = np.zeros((capacity, max_actions), dtype=dtype)
+        self.strategy_sum = np.zeros((capacity, max_actions), dtype=dtype)
+
+    def __len__(self):
+        return self.size
+
+    def lookup(self, card_id, history_id, num_actions):
+        rows = self.rows
+        try:
+            idx = rows.item(history_id, card_id)
+        except IndexError:
+            rows = self._grow_rows(history_id, card_id)
+            idx = -1
+        if idx < 0:
+            idx = self.size
+            if idx == len(self.num_actions):
+                self._grow()
+            rows[history_id, card_id] = idx
+            self.ids[idx] = card_id, history_id
+            self.num_actions[idx] = num_actions
+            self.size += 1
+        return idx
+
+    def _grow_rows(self, history_id, card_id):
+        shape = (max(self.rows.shape[0], 2 * history_id + 1), max(self.rows.shape[1], 2 * card_id + 1))
+        rows = np.full(shape, -1, dtype=np.int32)
+        rows[:self.rows.shape[0], :self.rows.shape[1]] = self.rows
+        self.rows = rows
+        return rows
+
+    def _grow(self):
+        capacity = len(self.num_actions) * 2
+        self.num_actions = np.resize(self.num_actions, capacity)
+        for name in ("ids", "regret_sum", "strategy_sum"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def nbytes(self):
+        return (self.rows.nbytes + self.ids.nbytes + self.num_actions.nbytes
+                + self.regret_sum.nbytes + self.strategy_sum.nbytes)
+
+    def average_strategy(self, idx):
+        n = self.num_actions[idx]
+        total = self.strategy_sum[idx, :n].sum()
+        if total > 0:
+            return (self.strategy_sum[idx, :n] / total).tolist()
+        return [1.0 / n] * n
+
+
+class CFRSolver:
+    """
+    基于 Game 接口的通用 CFR：每次迭代采样一次发牌。
+    mode="chance" 对动作做全宽遍历；"external" / "outcome" 为蒙特卡洛 CFR，
+    只展开遍历者的动作或只采样一条路径，适合更大的博弈。
+    可用于 KuhnGame、LeducGame、ShortDeckPreflopGame 或其他实现了 Game 接口的博弈。
+    """
+
+    def __init__(self, game, seed=0, mode="chance", exploration=0.6):
+        if mode not in MODES:
+            raise ValueError(f"Unknown training mode: {mode} (choose from {MODES})")
+        self.game = game
+        self.table = InfoSetTable(game.max_actions)
+        self.rng = random.Random(seed)
+        self.mode = mode
+        self.exploration = exploration
+        self.iteration = 0
+
+    def train(self, iterations=10000, verbose=True, callback=None):
+        util = 0
+        completed = 0
+        start = time.perf_counter()
+        for _ in range(iterations):
+            self.iteration += 1
+            deal = self.game.sample_deal(self.rng)
+            if self.mode == "chance":
+                util += self.cfr(deal, "", 1.0, 1.0)
+            elif self.mode == "external":
+                util += self.external_sampling(deal, "", 0)
+                self.external_sampling(deal, "", 1)
+            else:
+                value, tail = self.outcome_sampling(deal, "", 0, 1.0, 1.0)
+                util += value * tail
+                self.outcome_sampling(deal, "", 1, 1.0, 1.0)
+            completed += 1
+            if callback is not None and callback(self, self.iteration):
+                break
+        elapsed = time.perf_counter() - start
+        if verbose:
+            print(f"[🧮] {type(self.game).__name__} ({self.mode}): {completed} iterations in {elapsed:.2f}s "
+                  f"({elapsed / completed * 1e6:.0f} µs/it), "
+                  f"{len(self.table)} info sets ({self.table.nbytes() / 1024:.0f} KiB)")
+            print("Average game value:", util / completed)
+        return util / completed
+
+    def cfr(self, deal, history, p0, p1):
+        """返回玩家 0 视角的节点价值"""
+        game = self.game
+        if game.is_terminal(history):
+            return game.utility(deal, history)
+        if game.is_chance_node(history):
+            return self.cfr(deal, history + "/", p0, p1)
+
+        player = game.current_player(history)
+        actions = game.legal_actions(history)
+        n = len(actions)
+        table = self.table
+        idx = table.lookup(*game.info_set_id(deal, history, player), n)
+
+        strategy = self.current_strategy(idx, n)
+
+        util = [0.0] * n
+        node_util = 0.0
+        for a, act in enumerate(actions):
+            if player == 0:
+                util[a] = self.cfr(deal, history + act, p0 * strategy[a], p1)
+            else:
+                util[a] = self.cfr(deal, history + act, p0, p1 * strategy[a])
+            node_util += strategy[a] * util[a]
+
+        # 玩家 1 的收益为玩家 0 价值的相反数
+        if player == 0:
+            table.regret_sum[idx, :n] += [p1 * (u - node_util) for u in util]
+            table.strategy_sum[idx, :n] += [p0 * s for s in strategy]
+        else:
+            table.regret_sum[idx, :n] += [p0 * (node_util - u) for u in util]
+            table.strategy_sum[idx, :n] += [p1 * s for s in strategy]
+        return node_util
+
+    def current_strategy(self, idx, n):
+        # 小向量在 Python 中计算更快，只在读写累积量时访问数组
+        positive = [r if r > 0 else 0.0 for r in self.table.regret_sum[idx, :n].tolist()]
+        normalizing_sum = sum(positive)
+        return [r / normalizing_sum for r in positive] if normalizing_sum > 0 else [1.0 / n] * n
+
+    def _sample(self, probs):
+        r = self.rng.random()
+        for a, p in enumerate(probs):
+            r -= p
+            if r < 0:
+                return a
+        return len(probs) - 1
+
+    def external_sampling(self, deal, history, traverser):
+        """外部采样 MCCFR，返回遍历者视角的价值"""
+        game = self.game
+        if game.is_terminal(history):
+            u = game.utility(deal, history)
+            return u if traverser == 0 else -u
+        if game.is_chance_node(history):
+            return self.external_sampling(deal, history + "/", traverser)
+
+        player = game.current_player(history)
+        actions = game.legal_actions(history)
+        n = len(actions)
+        idx = self.table.lookup(*game.info_set_id(deal, history, player), n)
+        strategy = self.current_strategy(idx, n)
+
+        if player != traverser:
+            self.table.strategy_sum[idx, :n] += strategy
+            return self.external_sampling(deal, history + actions[self._sample(strategy)], traverser)
+
+        util = [self.external_sampling(deal, history + act, traverser) for act in actions]
+        node_util = sum(s * u for s, u in zip(strategy, util))
+        self.table.regret_sum[idx, :n] += [u - node_util for u in util]
+        return node_util
+
+    def outcome_sampling(self, deal, history, traverser, pi_o, sample_prob):
+        """结果采样 MCCFR，返回 (遍历者收益 / 采样概率, 尾部到达概率)"""
+        game = self.game
+        if game.is_terminal(history):
+            u = game.utility(deal, history)
+            return (u if traverser == 0 else -u) / sample_prob, 1.0
+        if game.is_chance_node(history):
+            return self.outcome_sampling(deal, history + "/", traverser, pi_o, sample_prob)
+
+        player = game.current_player(history)
+        actions = game.legal_actions(history)
+        n = len(actions)
+        idx = self.table.lookup(*game.info_set_id(deal, history, player), n)
+        strategy = self.current_strategy(idx, n)
+
+        if player == traverser:
+            eps = self.exploration
+            sampling = [eps / n + (1 - eps) * s for s in strategy]
+        else:
+            sampling = strategy
+        a = self._sample(sampling)
+
+        if player == traverser:
+            util, tail = self.outcome_sampling(deal, history + actions[a], traverser,
+                                               pi_o, sample_prob * sampling[a])
+            w = util * pi_o * tail
+            self.table.regret_sum[idx, :n] += [w * ((1.0 if b == a else 0.0) - strategy[a]) for b in range(n)]
+        else:
+            util, tail = self.outcome_sampling(deal, history + actions[a], traverser,
+                                               pi_o * strategy[a], sample_prob * sampling[a])
+            weight = pi_o / sample_prob
+            self.table.strategy_sum[idx, :n] += [weight * s for s in strategy]
+        return util, tail * strategy[a]
+
+    def info_set_keys(self):
+        """按表中行号顺序还原的信息集 key"""
+        return [self.game.key_from_id(card_id, history_id) for card_id, history_id in self.table.ids[:len(self.table)].tolist()]
+
+    def strategy_dict(self):
+        """{info_set: {动作名: 概率}}，Kuhn 下与 kuhn_gto_strategy.json 格式相同"""
+        result = {}
+        for idx, (card_id, history_id) in enumerate(self.table.ids[:len(self.table)].tolist()):
+            actions = self.game.legal_actions(self.game.histories[history_id])
+            probs = self.table.average_strategy(idx)
+            result[self.game.key_from_id(card_id, history_id)] = {ACTION_NAMES[act]: float(p) for act, p in zip(actions, probs)}
+        return result
+
+    def save_strategy(self, path):
+        with open(path, "w") as f:
+            json.dump(self.strategy_dict(), f, indent=2)
+
+
+GAMES = {
+    "kuhn": KuhnGame,
+    "leduc": LeducGame,
+    "shortdeck": ShortDeckPreflopGame,
+}
+
+
+if __name__ == "__main__":
+    # 用法：python cfr_solver.py [kuhn|leduc|shortdeck] [iterations] [chance|external|outcome]
+    name = sys.argv[1] if len(sys.argv) > 1 else "leduc"
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    mode = sys.argv[3] if len(sys.argv) > 3 else "chance"
+    solver = CFRSolver(GAMES[name](), mode=mode)
+    solver.train(iterations)
+    solver.save_strategy(f"{name}_cfr_strategy.json")
+    print(f"\n✅ 策略表已保存为 {name}_cfr_strategy.json")
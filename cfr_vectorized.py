@@ -0,0 +1,225 @@
+import os
+import sys
+import json
+import time
+import importlib.util
+from contextlib import redirect_stdout
+from io import StringIO
+from itertools import permutations
+
+import numpy as np
+
+CARDS = ['J', 'Q', 'K']
+CARD_RANK = {"J": 0, "Q": 1, "K": 2}
+ACTIONS = ["p", "b"]  # 0: pass, 1: bet
+
+# 决策节点（按拓扑顺序）与终局节点
+DECISION_HISTORIES = ["", "p", "b", "pb"]
+TERMINAL_HISTORIES = ["pp", "pbp", "bp", "bb", "pbb"]
+
+
+def kuhn_payoff(cards, history):
+    """终局收益，视角为 history 结束时轮到行动的玩家（与 KuhnTrainer.payoff 一致）"""
+    player = len(history) % 2
+    player_wins = CARD_RANK[cards[player]] > CARD_RANK[cards[1 - player]]
+    if history == "pp":
+        return 1 if player_wins else -1
+    elif history in ["pbp", "bp"]:
+        return 1
+    elif history in ["pbb", "bb"]:
+        return 2 if player_wins else -2
+    return 0
+
+
+class KuhnTree:
+    """
+    预先展开的 Kuhn 博弈树（只构建一次）。
+    每一行 = (决策历史, 发牌)，共 4 × 6 = 24 行；信息集编号为稠密整数 id。
+    """
+
+    def __init__(self):
+        self.deals = list(permutations(CARDS, 2))
+        self.num_deals = len(self.deals)
+
+        # 信息集 id：按决策历史、再按手牌排序
+        self.info_sets = [card + h for h in DECISION_HISTORIES for card in CARDS]
+        self.info_set_index = {key: i for i, key in enumerate(self.info_sets)}
+        self.num_info_sets = len(self.info_sets)
+
+        # 行编号：决策行在前，终局行在后（都按 历史 × 发牌 展开）
+        histories = DECISION_HISTORIES + TERMINAL_HISTORIES
+        row_of = {(h, d): k * self.num_deals + d
+                  for k, h in enumerate(histories) for d in range(self.num_deals)}
+        self.num_rows = len(DECISION_HISTORIES) * self.num_deals
+        num_nodes = len(histories) * self.num_deals
+
+        rows = [(h, d) for h in DECISION_HISTORIES for d in range(self.num_deals)]
+        self.row_info_set = np.array([self.info_set_index[self.deals[d][len(h) % 2] + h] for h, d in rows])
+        self.row_player = np.array([len(h) % 2 for h, d in rows])
+        self.row_depth = np.array([len(h) for h, d in rows])
+        self.child_index = np.array([[row_of[(h + act, d)] for act in ACTIONS] for h, d in rows])
+
+        # 到达概率：Kuhn 中每一行对每个玩家至多有一个祖先动作，
+        # 记录该动作在展平策略数组中的位置；没有祖先时指向末尾的常数 1.0
+        one = self.num_rows * 2
+        self.own_ancestor = np.full(self.num_rows, one)
+        self.opp_ancestor = np.full(self.num_rows, one)
+        for r, (h, d) in enumerate(rows):
+            for depth in range(len(h)):
+                flat = row_of[(h[:depth], d)] * 2 + ACTIONS.index(h[depth])
+                if depth % 2 == len(h) % 2:
+                    self.own_ancestor[r] = flat
+                else:
+                    self.opp_ancestor[r] = flat
+
+        # 按深度从深到浅反向求值
+        self.levels = [np.nonzero(self.row_depth == depth)[0]
+                       for depth in sorted(set(self.row_depth.tolist()), reverse=True)]
+
+        # 节点价值（玩家 0 视角），终局部分为常数
+        self.initial_values = np.zeros(num_nodes)
+        for h in TERMINAL_HISTORIES:
+            sign = 1 if len(h) % 2 == 0 else -1
+            for d, deal in enumerate(self.deals):
+                self.initial_values[row_of[(h, d)]] = sign * kuhn_payoff(deal, h)
+
+        # 反事实遗憾的符号：玩家 1 的收益为玩家 0 价值的相反数
+        self.regret_sign = np.where(self.row_player == 0, 1.0, -1.0)
+
+        # 散射矩阵：把各行累加到对应信息集
+        self.scatter = np.zeros((self.num_info_sets, self.num_rows))
+        self.scatter[self.row_info_set, np.arange(self.num_rows)] = 1.0
+        self.root_rows = np.nonzero(self.row_depth == 0)[0]
+
+
+class VectorizedKuhnTrainer:
+    """
+    NumPy 版 CFR：每次迭代同时遍历全部 6 种发牌，
+    regret / strategy 累积量存放在以信息集 id 为下标的稠密数组中。
+    """
+
+    def __init__(self):
+        self.tree = KuhnTree()
+        n = self.tree.num_info_sets
+        self.regret_sum = np.zeros((n, 2))
+        self.strategy_sum = np.zeros((n, 2))
+        self._values = self.tree.initial_values.copy()
+        self._flat_strategy = np.ones(self.tree.num_rows * 2 + 1)
+
+    def get_strategy(self):
+        positive = np.maximum(self.regret_sum, 0)
+        normalizing_sum = positive.sum(axis=1, keepdims=True)
+        return np.divide(positive, normalizing_sum, out=np.full_like(positive, 0.5),
+                         where=normalizing_sum > 0)
+
+    def get_average_strategy(self):
+        normalizing_sum = self.strategy_sum.sum(axis=1, keepdims=True)
+        return np.divide(self.strategy_sum, normalizing_sum, out=np.full_like(self.strategy_sum, 0.5),
+                         where=normalizing_sum > 0)
+
+    def cfr_iteration(self):
+        tree = self.tree
+        row_strategy = self.get_strategy()[tree.row_info_set]
+
+        # 前向：由祖先动作概率直接得到双方到达概率
+        flat = self._flat_strategy
+        flat[:-1] = row_strategy.ravel()
+        own_reach = flat[tree.own_ancestor]
+        opp_reach = flat[tree.opp_ancestor]
+
+        # 反向：逐层计算节点价值（玩家 0 视角）
+        values = self._values
+        for level in tree.levels:
+            values[level] = (row_strategy[level] * values[tree.child_index[level]]).sum(axis=1)
+
+        node_util = values[:tree.num_rows, None]
+        regret = (values[tree.child_index] - node_util) * (tree.regret_sign * opp_reach)[:, None]
+
+        self.regret_sum += tree.scatter @ regret
+        self.strategy_sum += tree.scatter @ (own_reach[:, None] * row_strategy)
+        return values[tree.root_rows].mean()
+
+    def train(self, iterations=20000, verbose=True, callback=None):
+        """callback(trainer, iteration) 每次迭代后调用，返回 True 时提前停止（如 ExploitabilityMonitor）"""
+        util = 0
+        completed = 0
+        for i in range(1, iterations + 1):
+            util += self.cfr_iteration()
+            completed += 1
+            if callback is not None and callback(self, i):
+                break
+        if verbose:
+            print("Average game value:", util / completed)
+            print("\n--- Strategy Table ---")
+            for key in sorted(self.tree.info_sets):
+                print(self.format_info_set(key))
+        return util / completed
+
+    def exploitability(self):
+        from kuhn_best_response import exploitability  # 避免循环导入
+        return exploitability(self.strategy_dict())
+
+    def format_info_set(self, info_set):
+        avg_strategy = self.get_average_strategy()[self.tree.info_set_index[info_set]]
+        return f"{info_set}: PASS={avg_strategy[0]:.2f}, BET={avg_strategy[1]:.2f}"
+
+    def strategy_dict(self):
+        avg_strategy = self.get_average_strategy()
+        return {info_set: {"PASS": float(avg_strategy[i][0]), "BET": float(avg_strategy[i][1])}
+                for i, info_set in enumerate(self.tree.info_sets)}
+
+    def save_strategy(self, path="kuhn_gto_strategy.json"):
+        with open(path, "w") as f:
+            json.dump(self.strategy_dict(), f, indent=2)
+
+
+def load_recursive_trainer_module():
+    """加载 `Cfr Kuhn Poker.py`（文件名含空格，无法直接 import）"""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Cfr Kuhn Poker.py")
+    module = sys.modules.get("cfr_kuhn_poker")
+    if module is None:
+        spec = importlib.util.spec_from_file_location("cfr_kuhn_poker", path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules["cfr_kuhn_poker"] = module
+        spec.loader.exec_module(module)
+    return module
+
+
+def benchmark(iterations=20000):
+    """比较递归 KuhnTrainer 与 NumPy 引擎的 iterations/sec（递归版每次迭代只采样 1 种发牌）"""
+    KuhnTrainer = load_recursive_trainer_module().KuhnTrainer
+
+    recursive = KuhnTrainer()
+    start = time.perf_counter()
+    with redirect_stdout(StringIO()):
+        recursive.train(iterations)
+    recursive_time = time.perf_counter() - start
+
+    vectorized = VectorizedKuhnTrainer()
+    start = time.perf_counter()
+    vectorized.train(iterations, verbose=False)
+    vectorized_time = time.perf_counter() - start
+
+    num_deals = vectorized.tree.num_deals
+    results = {
+        "recursive_its_per_sec": iterations / recursive_time,
+        "vectorized_its_per_sec": iterations / vectorized_time,
+        "recursive_deals_per_sec": iterations / recursive_time,
+        "vectorized_deals_per_sec": iterations * num_deals / vectorized_time,
+    }
+    print(f"\n[⏱] Benchmark ({iterations} iterations)")
+    print(f"  Recursive KuhnTrainer : {results['recursive_its_per_sec']:>10.0f} it/s "
+          f"({results['recursive_deals_per_sec']:.0f} deals/s)")
+    print(f"  VectorizedKuhnTrainer : {results['vectorized_its_per_sec']:>10.0f} it/s "
+          f"({results['vectorized_deals_per_sec']:.0f} deals/s)")
+    print(f"  Speedup (deals/s)     : {results['vectorized_deals_per_sec'] / results['recursive_deals_per_sec']:.1f}x")
+    return results
+
+
+if __name__ == "__main__":
+    trainer = VectorizedKuhnTrainer()
+    trainer.train(20000)
+    trainer.save_strategy("kuhn_gto_strategy.json")
+    print("\n✅ 策略表已保存为 kuhn_gto_strategy.json")
+
+    benchmark(20000)
@@ -0,0 +1,220 @@
+import sys
+import time
+import queue
+from multiprocessing import shared_memory
+
+import numpy as np
+import torch
+import torch.multiprocessing as mp
+from torch.nn.utils import parameters_to_vector, vector_to_parameters
+
+from dqn_agent import DQNAgent
+from rl_env import VecShortDeckEnv
+from shared_data import ACTION_SPACE
+
+STATE_DIM = 13
+
+
+class SharedTransitionQueue:
+    """
+    共享内存中的定长槽位 + 两个下标队列：actor 取一个空槽写入整块转移后把槽号放入 full，
+    learner 读出后把槽号还回 free。队列里只传递槽号，转移数据本身不经过 pickle。
+    每行布局：state | action | reward | next_state | done
+    """
+
+    def __init__(self, num_slots, slot_rows, state_dim=STATE_DIM):
+        self.num_slots = num_slots
+        self.slot_rows = slot_rows
+        self.state_dim = state_dim
+        self.width = 2 * state_dim + 3
+        self.shm = shared_memory.SharedMemory(create=True, size=num_slots * slot_rows * self.width * 4)
+        self.free = mp.Queue()
+        self.full = mp.Queue()
+        for slot in range(num_slots):
+            self.free.put(slot)
+        self._view = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_view"] = None
+        return state
+
+    def slots(self):
+        if self._view is None:
+            self._view = np.ndarray((self.num_slots, self.slot_rows, self.width), dtype=np.float32,
+                                    buffer=self.shm.buf)
+        return self._view
+
+    def put(self, states, actions, rewards, next_states, dones, version, timeout=0.1):
+        """写入一块转移；在 timeout 内没有空槽时返回 False"""
+        try:
+            slot = self.free.get(timeout=timeout)
+        except queue.Empty:
+            return False
+        d = self.state_dim
+        n = len(actions)
+        rows = self.slots()[slot]
+        rows[:n, :d] = states
+        rows[:n, d] = actions
+        rows[:n, d + 1] = rewards
+        rows[:n, d + 2:2 * d + 2] = next_states
+        rows[:n, 2 * d + 2] = dones
+        self.full.put((slot, n, version))
+        return True
+
+    def get_nowait(self):
+        """取出一块转移 (states, actions, rewards, next_states, dones, version)；没有时返回 None"""
+        try:
+            slot, n, version = self.full.get_nowait()
+        except queue.Empty:
+            return None
+        d = self.state_dim
+        rows = self.slots()[slot, :n].copy()
+        self.free.put(slot)
+        return (rows[:, :d], rows[:, d].astype(np.int64), rows[:, d + 1],
+                rows[:, d + 2:2 * d + 2], rows[:, 2 * d + 2], version)
+
+    def close(self):
+        self._view = None
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _actor(actor_id, transitions, params, version, lock, stop, stats, num_envs, steps_per_chunk, epsilon, seed):
+    """actor 进程：用最新同步的策略推进自己的 VecShortDeckEnv，按块把转移写入共享队列"""
+    torch.set_num_threads(1)
+    np.random.seed(seed)
+    agent = DQNAgent(STATE_DIM, len(ACTION_SPACE), memory_size=1)
+    env = VecShortDeckEnv(num_envs=num_envs, seed=seed)
+    states = env.reset()
+    local_version = -1
+    chunk = []
+
+    while not stop.is_set():
+        if version.value != local_version:
+            with lock:
+                vector_to_parameters(params.clone(), agent.policy_net.parameters())
+                local_version = version.value
+
+        actions = agent.select_actions(states, epsilon)
+        next_states, rewards, dones, info = env.step(actions)
+        stored_next = next_states.clone()
+        if dones.any():
+            stored_next[torch.from_numpy(dones)] = info["terminal_states"]
+            with stats.get_lock():
+                stats[2 * actor_id] += len(info["episode_rewards"])
+                stats[2 * actor_id + 1] += float(info["episode_rewards"].sum())
+        chunk.append((states.numpy(), actions, rewards.numpy(), stored_next.numpy(), dones))
+        states = next_states
+
+        if len(chunk) == steps_per_chunk:
+            block = [np.concatenate(parts) for parts in zip(*chunk)]
+            while not stop.is_set() and not transitions.put(*block, version=local_version):
+                pass
+            chunk = []
+
+
+class ActorLearnerTrainer:
+    """
+    异步 actor/learner 训练：num_actors 个 actor 进程各自运行 VecShortDeckEnv 生成转移，
+    learner（主进程）不断把共享队列中的转移放进 agent.memory 并调用 agent.replay() 更新；
+    每 sync_every 次更新把策略参数写入共享张量并递增版本号，actor 检测到新版本后重新加载。
+    """
+
+    def __init__(self, agent=None, num_actors=None, envs_per_actor=16, steps_per_chunk=8,
+                 sync_every=50, target_update=500, epsilon=0.1, seed=0):
+        self.agent = agent or DQNAgent(STATE_DIM, len(ACTION_SPACE))
+        self.num_actors = num_actors or max(1, mp.cpu_count() - 1)
+        self.envs_per_actor = envs_per_actor
+        self.steps_per_chunk = steps_per_chunk
+        self.sync_every = sync_every
+        self.target_update = target_update
+        self.epsilon = epsilon
+        self.seed = seed
+        self.history = []
+
+    def train(self, seconds=60, max_updates=None, report_every=5.0, verbose=True):
+        agent = self.agent
+        params = parameters_to_vector(agent.policy_net.parameters()).detach().clone().share_memory_()
+        version = mp.Value("i", 0)
+        lock = mp.Lock()
+        stop = mp.Event()
+        stats = mp.Array("d", 2 * self.num_actors)
+        transitions = SharedTransitionQueue(num_slots=4 * self.num_actors,
+                                            slot_rows=self.envs_per_actor * self.steps_per_chunk)
+
+        actors = [mp.Process(target=_actor, args=(i, transitions, params, version, lock, stop, stats,
+                                                  self.envs_per_actor, self.steps_per_chunk, self.epsilon,
+                                                  self.seed * 1000 + i))
+                  for i in range(self.num_actors)]
+        for p in actors:
+            p.start()
+
+        updates = received = 0
+        lag_sum = lag_count = 0
+        start = last_report = time.perf_counter()
+        last_received = last_updates = 0
+        try:
+            while time.perf_counter() - start < seconds and (max_updates is None or updates < max_updates):
+                # 先取完已到达的转移，再做一次更新
+                while True:
+                    block = transitions.get_nowait()
+                    if block is None:
+                        break
+                    *batch, actor_version = block
+                    agent.memory.add_batch(*batch)
+                    received += len(batch[1])
+                    lag_sum += version.value - actor_version
+                    lag_count += 1
+
+                if len(agent.memory) < agent.batch_size:
+                    time.sleep(0.001)
+                    continue
+                agent.replay()
+                updates += 1
+                if updates % self.sync_every == 0:
+                    with lock:
+                        params.copy_(parameters_to_vector(agent.policy_net.parameters()).detach())
+                        version.value += 1
+                if updates % self.target_update == 0:
+                    agent.update_target()
+
+                now = time.perf_counter()
+                if now - last_report >= report_every:
+                    self._report(now - start, received, updates, (received - last_received) / (now - last_report),
+                                 (updates - last_updates) / (now - last_report),
+                                 lag_sum / max(lag_count, 1), stats, verbose)
+                    last_report, last_received, last_updates = now, received, updates
+                    lag_sum = lag_count = 0
+        finally:
+            stop.set()
+            for p in actors:
+                p.join(timeout=5)
+                if p.is_alive():
+                    p.terminate()
+            transitions.close()
+
+        elapsed = time.perf_counter() - start
+        if verbose:
+            print(f"\n[🏁] {received} transitions, {updates} updates in {elapsed:.1f}s "
+                  f"({received / elapsed:.0f} transitions/s, {updates / elapsed:.1f} updates/s)")
+        return agent
+
+    def _report(self, elapsed, received, updates, transitions_rate, updates_rate, lag, stats, verbose):
+        episodes = sum(stats[0::2])
+        mean_reward = sum(stats[1::2]) / episodes if episodes else 0.0
+        self.history.append((elapsed, received, updates, transitions_rate, updates_rate, lag, episodes))
+        if verbose:
+            print(f"[⏱] {elapsed:6.1f}s  {transitions_rate:8.0f} transitions/s  {updates_rate:6.1f} updates/s  "
+                  f"policy lag {lag:.2f} versions ({lag * self.sync_every:.0f} updates)  "
+                  f"episodes {episodes:.0f} (avg reward {mean_reward:.1f})")
+
+
+if __name__ == "__main__":
+    # 用法：python dqn_actor_learner.py [actors] [seconds]
+    num_actors = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 60
+    trainer = ActorLearnerTrainer(num_actors=num_actors)
+    agent = trainer.train(seconds=seconds)
+    agent.save_model("trained_dqn.pt")
+    print("[📁] Saved model to trained_dqn.pt")
@@ -3,8 +3,8 @@ import torch.nn as nn
 import torch.optim as optim
 import random
 import numpy as np
-from collections import deque
 from shared_data import ACTION_SPACE
+from replay_buffer import ReplayBuffer
 
 
 class GTO_DQN(nn.Module):
@@ -23,7 +23,8 @@ class GTO_DQN(nn.Module):
 
 
 class DQNAgent:
-    def __init__(self, state_dim, action_dim, lr=1e-3, gamma=0.99, epsilon=1.0, epsilon_min=0.01, epsilon_decay=0.995):
+    def __init__(self, state_dim, action_dim, lr=1e-3, gamma=0.99, epsilon=1.0, epsilon_min=0.01, epsilon_decay=0.995,
+                 memory_size=5000, prioritized=False):
         self.state_dim = state_dim
         self.action_dim = action_dim
 
@@ -35,7 +36,8 @@ class DQNAgent:
         self.optimizer = optim.Adam(self.policy_net.parameters(), lr=lr)
         self.criterion = nn.MSELoss()
 
-        self.memory = deque(maxlen=5000)
+        # 预分配的环形经验池；prioritized=True 时按 TD 误差优先采样
+        self.memory = ReplayBuffer(memory_size, state_dim, prioritized=prioritized)
         self.batch_size = 64
 
         self.gamma = gamma
@@ -62,9 +64,18 @@ class DQNAgent:
             valid_q_values = {a: q_values[action_indices[a]] for a in valid_actions}
             return max(valid_q_values, key=valid_q_values.get)
 
+    def select_actions(self, states, epsilon=0.1):
+        """批量选择动作：一次前向计算 (N, state_dim) 个状态的 Q 值，返回动作下标数组"""
+        self.policy_net.eval()
+        with torch.no_grad():
+            actions = self.policy_net(states).argmax(dim=1).numpy()
+        explore = np.random.rand(len(actions)) < epsilon
+        actions[explore] = np.random.randint(self.action_dim, size=int(explore.sum()))
+        return actions
+
     def remember(self, state, action, reward, next_state, done):
         action_indices = {a: i for i, a in enumerate(ACTION_SPACE)}
-        self.memory.append((state, action_indices[action], reward, next_state, done))
+        self.memory.add(state, action_indices[action], reward, next_state, done)
 
     def act(self, state):
         if np.random.rand() < self.epsilon:
@@ -78,20 +89,18 @@ class DQNAgent:
         if len(self.memory) < self.batch_size:
             return
 
-        batch = random.sample(self.memory, self.batch_size)
-        state, action, reward, next_state, done = zip(*batch)
+        state, action, reward, next_state, done, indices, weights = self.memory.sample(self.batch_size)
 
-        state = torch.FloatTensor(state)
-        next_state = torch.FloatTensor(next_state)
-        action = torch.LongTensor(action)
-        reward = torch.FloatTensor(reward)
-        done = torch.BoolTensor(done)
-
-        current_q = self.policy_net(state).gather(1, action.unsqueeze(1)).squeeze()
+        current_q = self.policy_net(state).gather(1, action.unsqueeze(1)).squeeze(1)
         next_q = self.target_net(next_state).max(1)[0]
-        target_q = reward + (1 - done.float()) * self.gamma * next_q
+        target_q = (reward + (1 - done) * self.gamma * next_q).detach()
 
-        loss = self.criterion(current_q, target_q.detach())
+        if self.memory.prioritized:
+            td_error = current_q - target_q
+            loss = (weights * td_error.pow(2)).mean()
+            self.memory.update_priorities(indices, td_error.detach().numpy())
+        else:
+            loss = self.criterion(current_q, target_q)
 
         self.optimizer.zero_grad()
         loss.backward()
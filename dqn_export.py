@@ -0,0 +1,156 @@
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+from dqn_agent import GTO_DQN
+from dqn_numpy import NumpyQNetwork
+
+STATE_DIM, ACTION_DIM = 13, 3
+EXPORT_DIR = "exports"
+ARTIFACTS = {
+    "torchscript": "dqn_scripted.pt",
+    "int8": "dqn_int8.pt",
+    "onnx": "dqn.onnx",
+    "numpy": "dqn_weights.npz",
+    "numpy-fp16": "dqn_weights_fp16.npz",
+}
+
+
+def load_policy(model_path="trained_dqn.pt"):
+    net = GTO_DQN(STATE_DIM, ACTION_DIM)
+    net.load_state_dict(torch.load(model_path))
+    return net.eval()
+
+
+def _linear_layers(net):
+    return [m for m in net.modules() if isinstance(m, nn.Linear)]
+
+
+def export_torchscript(net, path):
+    torch.jit.script(net).save(path)
+
+
+def export_int8(net, path):
+    """动态量化：Linear 权重存为 int8，激活在运行时量化"""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        quantized = torch.ao.quantization.quantize_dynamic(net, {nn.Linear}, dtype=torch.qint8)
+    torch.jit.script(quantized).save(path)
+
+
+def export_onnx(net, path):
+    torch.onnx.export(net, torch.zeros(1, STATE_DIM), path, input_names=["state"], output_names=["q_values"],
+                      dynamic_axes={"state": {0: "batch"}, "q_values": {0: "batch"}})
+
+
+def export_numpy(net, path, dtype=np.float32):
+    arrays = {}
+    for i, layer in enumerate(_linear_layers(net)):
+        arrays[f"w{i}"] = layer.weight.detach().numpy().astype(dtype)
+        arrays[f"b{i}"] = layer.bias.detach().numpy().astype(dtype)
+    np.savez(path, **arrays)
+
+
+def export_all(model_path="trained_dqn.pt", out_dir=EXPORT_DIR):
+    """导出全部格式；缺少可选依赖（如 onnx）的格式跳过并提示"""
+    net = load_policy(model_path)
+    os.makedirs(out_dir, exist_ok=True)
+    exporters = {
+        "torchscript": export_torchscript,
+        "int8": export_int8,
+        "onnx": export_onnx,
+        "numpy": export_numpy,
+        "numpy-fp16": lambda n, p: export_numpy(n, p, np.float16),
+    }
+    exported = {}
+    for name, exporter in exporters.items():
+        path = os.path.join(out_dir, ARTIFACTS[name])
+        try:
+            exporter(net, path)
+        except ImportError as e:
+            print(f"[!] Skipped {name} export: {e}")
+            continue
+        exported[name] = path
+        print(f"[📁] {name:<12} → {path} ({os.path.getsize(path) / 1024:.1f} KiB)")
+    return exported
+
+
+def load_backend(name, out_dir=EXPORT_DIR, model_path="trained_dqn.pt"):
+    """返回 predict(states: np.ndarray (N, 13)) → np.ndarray (N, 3)"""
+    if name in ("numpy", "numpy-fp16"):
+        return NumpyQNetwork.load(os.path.join(out_dir, ARTIFACTS[name]))
+    if name == "onnx":
+        import onnxruntime
+        session = onnxruntime.InferenceSession(os.path.join(out_dir, ARTIFACTS[name]),
+                                               providers=["CPUExecutionProvider"])
+        return lambda states: session.run(None, {"state": np.asarray(states, dtype=np.float32)})[0]
+
+    if name == "eager":
+        net = load_policy(model_path)
+    elif name in ("torchscript", "int8"):
+        net = torch.jit.load(os.path.join(out_dir, ARTIFACTS[name]))
+    else:
+        raise ValueError(f"Unknown backend: {name}")
+
+    def predict(states):
+        with torch.no_grad():
+            return net(torch.from_numpy(np.asarray(states, dtype=np.float32))).numpy()
+    return predict
+
+
+def benchmark(backends=("eager", "torchscript", "int8", "onnx", "numpy", "numpy-fp16"),
+              batch_sizes=(1, 64), repeats=2000, out_dir=EXPORT_DIR, model_path="trained_dqn.pt"):
+    """每个后端在不同批大小下单次调用的平均延迟（微秒）；无法加载的后端跳过"""
+    rng = np.random.default_rng(0)
+    reference = load_backend("eager", out_dir, model_path)
+    results = {}
+    for name in backends:
+        try:
+            predict = load_backend(name, out_dir, model_path)
+        except (ImportError, OSError, ValueError) as e:
+            print(f"[!] Skipped {name}: {e}")
+            continue
+        for batch in batch_sizes:
+            states = rng.random((batch, STATE_DIM), dtype=np.float32)
+            error = float(np.abs(predict(states) - reference(states)).max())
+            for _ in range(50):
+                predict(states)
+            start = time.perf_counter()
+            for _ in range(repeats):
+                predict(states)
+            results[(name, batch)] = ((time.perf_counter() - start) / repeats * 1e6, error)
+    return results
+
+
+def fastest_backend(results, batch_size=1, tolerance=1e-2):
+    """误差在 tolerance 以内、该批大小下延迟最低的后端"""
+    candidates = [(latency, name) for (name, batch), (latency, error) in results.items()
+                  if batch == batch_size and error <= tolerance]
+    return min(candidates)[1] if candidates else "eager"
+
+
+def select_backend(batch_size=1, out_dir=EXPORT_DIR, model_path="trained_dqn.pt", repeats=200):
+    """快速测一遍各后端，返回 (名称, predict) 中最快的一个，供 DQNPlayerWrapper(backend=...) 使用"""
+    name = fastest_backend(benchmark(batch_sizes=(batch_size,), repeats=repeats,
+                                     out_dir=out_dir, model_path=model_path), batch_size)
+    return name, load_backend(name, out_dir, model_path)
+
+
+if __name__ == "__main__":
+    # 用法：python dqn_export.py [model.pt] [out_dir]
+    model_path = sys.argv[1] if len(sys.argv) > 1 else "trained_dqn.pt"
+    out_dir = sys.argv[2] if len(sys.argv) > 2 else EXPORT_DIR
+    torch.set_num_threads(1)
+    export_all(model_path, out_dir)
+
+    results = benchmark(out_dir=out_dir, model_path=model_path)
+    print(f"\n{'backend':<14}{'batch':>6}{'µs/call':>10}{'max |Δq|':>12}")
+    for (name, batch), (latency, error) in results.items():
+        print(f"{name:<14}{batch:>6}{latency:>10.1f}{error:>12.2e}")
+    for batch in sorted({batch for _, batch in results}):
+        print(f"[🚀] Fastest backend for batch {batch}: {fastest_backend(results, batch)}")
@@ -0,0 +1,25 @@
+import numpy as np
+import torch
+
+from batched_server import BatchedServer
+
+
+class BatchedInferenceServer(BatchedServer):
+    """
+    批量推理服务：多个线程（多张牌桌）通过 submit / infer 提交状态向量，
+    后台线程把等待中的请求凑成一批——达到 max_batch 条或第一条请求已等待 max_latency 秒——
+    做一次前向计算后把各自的 Q 值返回给对应的调用者。
+    """
+
+    def __init__(self, model, max_batch=256, max_latency=0.002):
+        super().__init__(max_batch, max_latency)
+        self.model = model
+
+    def infer(self, state):
+        """提交一个状态向量并等待其 Q 值数组"""
+        return self.call(state)
+
+    def process(self, states):
+        states = torch.from_numpy(np.array(states, dtype=np.float32))
+        with torch.no_grad():
+            return self.model(states).numpy()
@@ -0,0 +1,31 @@
+import numpy as np
+
+
+class NumpyQNetwork:
+    """
+    GTO_DQN（Linear-ReLU-Linear-ReLU-Linear）的纯 NumPy 前向实现，加载时不需要 torch。
+    权重文件由 dqn_export.export_numpy 生成；fp16 文件加载后转回 float32 计算。
+    """
+
+    def __init__(self, weights, biases):
+        # 预先转置，前向计算只需 x @ W + b
+        self.weights = [np.ascontiguousarray(w.T, dtype=np.float32) for w in weights]
+        self.biases = [np.asarray(b, dtype=np.float32) for b in biases]
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            n = len(data.files) // 2
+            return cls([data[f"w{i}"] for i in range(n)], [data[f"b{i}"] for i in range(n)])
+
+    def __call__(self, states):
+        """states: (N, state_dim) 或 (state_dim,)，返回 (N, action_dim) 的 Q 值"""
+        x = np.asarray(states, dtype=np.float32)
+        if x.ndim == 1:
+            x = x[None, :]
+        last = len(self.weights) - 1
+        for i, (w, b) in enumerate(zip(self.weights, self.biases)):
+            x = x @ w + b
+            if i < last:
+                np.maximum(x, 0, out=x)
+        return x
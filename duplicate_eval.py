@@ -0,0 +1,181 @@
+import sys
+import math
+import random
+import importlib
+from itertools import combinations
+
+import numpy as np
+
+from short_deck_eval import DECK, evaluate_batch
+from short_deck_engine import ShortDeckEngine
+
+Z_95 = 1.959964
+ESTIMATORS = ("independent", "aivat", "duplicate", "duplicate+aivat")
+
+
+class FixedDeal:
+    """代替引擎的 rng：sample 时返回预先抽好的 9 张牌（两手底牌 + 5 张公共牌）"""
+
+    def __init__(self, cards):
+        self.cards = list(cards)
+
+    def sample(self, population, k):
+        return self.cards[:k]
+
+
+def showdown_equity(hole, other, board, rng, samples=2000):
+    """
+    hole 对 other（双方底牌已知）在补完公共牌后的胜率（平局算一半）。
+    还差 0~2 张公共牌时精确枚举，否则随机抽 samples 组（无偏估计）。
+    """
+    need = 5 - len(board)
+    if need == 0:
+        boards = np.array([board], dtype=np.int64)
+    else:
+        used = set(hole) | set(other) | set(board)
+        remaining = np.array([c for c in range(len(DECK)) if c not in used], dtype=np.int64)
+        if need <= 2:
+            runouts = np.array(list(combinations(remaining, need)), dtype=np.int64)
+        else:
+            runouts = np.argsort(rng.random((samples, len(remaining))), axis=1)[:, :need]
+            runouts = remaining[runouts]
+        boards = np.hstack([np.tile(np.array(board, dtype=np.int64), (len(runouts), 1)), runouts])
+    mine = evaluate_batch(np.hstack([np.tile(hole, (len(boards), 1)), boards]))
+    theirs = evaluate_batch(np.hstack([np.tile(other, (len(boards), 1)), boards]))
+    return float(((mine > theirs) + 0.5 * (mine == theirs)).mean())
+
+
+def street_pots(state):
+    """每条街发牌时双方已对等投入的底池（发底牌时为盲注），以及实际发到的最后一条街"""
+    bets = [[0, 0] for _ in range(4)]
+    blinds = [0, 0]
+    for street, seat, action, amount, _ in state.history:
+        if action != "FOLD":
+            bets[street][seat] = amount
+        if action in ("SMALLBLIND", "BIGBLIND"):
+            blinds[seat] = amount
+    pots, paid = [2 * min(blinds)], [0, 0]
+    for street in range(3):
+        paid = [paid[s] + bets[street][s] for s in (0, 1)]
+        pots.append(2 * min(paid))
+    last_street = 3 if not any(state.folded) else max(street for street, *_ in state.history)
+    return pots, last_street
+
+
+def luck_correction(state, seat, rng, samples=2000):
+    """
+    AIVAT 式的机会节点修正：价值函数取 v = 底池 × (胜率 − 0.5)，
+    每次发牌（底牌、翻牌、转牌、河牌）的修正为 底池 × (发牌后胜率 − 发牌前胜率)。
+    每一项在发牌前的条件期望为 0，从收益中减去它们的和不改变期望，只去掉运气带来的方差。
+    """
+    hole, other = state.hole[seat], state.hole[1 - seat]
+    pots, last_street = street_pots(state)
+    # 翻前：发牌前双方对称，胜率期望为 0.5；盲注底池在发底牌前就已确定
+    before = 0.5
+    correction = 0.0
+    for street, board_size in enumerate((0, 3, 4, 5)):
+        if street > last_street:
+            break
+        after = showdown_equity(hole, other, state.board[:board_size], rng, samples)
+        correction += pots[street] * (after - before)
+        before = after
+    return correction
+
+
+def play_hand(players, cards, dealer, seed, initial_stack=1000, small_blind=10):
+    """
+    用固定的牌和随机种子打一手牌，返回结束后的 HandState 以及各座位的收益。
+    机器人使用全局 random 模块：这一手内临时换成 seed 对应的随机数流（共同随机数，两种座位安排下各方策略的
+    随机数相同），结束后恢复调用方原来的状态。
+    """
+    saved = random.getstate()
+    random.seed(seed)
+    try:
+        engine = ShortDeckEngine(players, names=["Player1", "Opponent"], initial_stack=initial_stack,
+                                 small_blind=small_blind, rng=FixedDeal(cards))
+        engine.dealer = dealer
+        engine.play(1)
+    finally:
+        random.setstate(saved)
+    return engine.state, [stack - initial_stack for stack in engine.stacks]
+
+
+def make_player(name):
+    """gto / dqn / 对手类型名（passive、aggressive、bluff、random）"""
+    if name == "gto":
+        from cfr_gto_agent import CFRGTOAgent
+        return CFRGTOAgent()
+    if name == "dqn":
+        from dqn_agent import DQNAgent
+        from rl_env import DQNPlayerWrapper
+        agent = DQNAgent(state_dim=13, action_dim=3)
+        agent.load_model("trained_dqn.pt")
+        return DQNPlayerWrapper(agent)
+    return importlib.import_module(f"opponent_{name.lower()}").Bot()
+
+
+def evaluate(agent, opponent, deals=500, seed=0, samples=2000):
+    """
+    agent 对 opponent 打 deals 组牌，每组发牌由 seed 决定，同一组牌再交换座位打一次
+    （对手拿到 agent 原来的牌和位置）。返回各估计量的样本（筹码/手）：
+      independent      只看第一次安排的收益，相当于普通的独立发牌
+      aivat            第一次安排的收益减去机会节点修正
+      duplicate        两次安排收益的平均
+      duplicate+aivat  两次安排修正后收益的平均
+    """
+    deal_rng = np.random.default_rng(seed)
+    equity_rng = np.random.default_rng(seed + 1)
+    samples_by_estimator = {name: [] for name in ESTIMATORS}
+    for i in range(deals):
+        cards = deal_rng.permutation(len(DECK))[:9].tolist()
+        raw, corrected = [], []
+        for seat, players in ((0, [agent, opponent]), (1, [opponent, agent])):
+            state, profits = play_hand(players, cards, i % 2, f"{seed}-{i}")
+            raw.append(profits[seat])
+            corrected.append(profits[seat] - luck_correction(state, seat, equity_rng, samples))
+        samples_by_estimator["independent"].append(raw[0])
+        samples_by_estimator["aivat"].append(corrected[0])
+        samples_by_estimator["duplicate"].append((raw[0] + raw[1]) / 2)
+        samples_by_estimator["duplicate+aivat"].append((corrected[0] + corrected[1]) / 2)
+    return {name: np.array(values, dtype=np.float64) for name, values in samples_by_estimator.items()}
+
+
+def interval(values):
+    """(均值, 95% 置信区间半宽, 标准差)"""
+    std = float(values.std(ddof=1)) if len(values) > 1 else float("inf")
+    return float(values.mean()), Z_95 * std / math.sqrt(len(values)), std
+
+
+def hands_needed(std, target, hands_per_sample=1):
+    """达到置信区间半宽 target 所需的手数"""
+    return math.ceil((Z_95 * std / target) ** 2) * hands_per_sample
+
+
+def report(results, target=None):
+    """
+    各估计量的均值与置信区间，以及达到目标精度 target（置信区间半宽，筹码/手）所需的手数；
+    target 默认取普通独立发牌已达到的精度。duplicate 类估计量每个样本花两手牌。
+    """
+    target = target or interval(results["independent"])[1]
+    print(f"{'estimator':<18}{'chips/hand':>12}{'95% CI ±':>10}{'std':>9}{'hands for ±' + format(target, '.2f'):>17}")
+    hands = {}
+    for name, values in results.items():
+        mean, half, std = interval(values)
+        hands[name] = hands_needed(std, target, 2 if name.startswith("duplicate") else 1)
+        print(f"{name:<18}{mean:>12.2f}{half:>10.2f}{std:>9.1f}{hands[name]:>17}")
+    best = min(hands, key=hands.get)
+    saved = hands["independent"] - hands[best]
+    print(f"[🚀] {best}: {saved} hands saved ({hands['independent'] / max(hands[best], 1):.1f}x fewer) "
+          f"for a ±{target:.2f} chips/hand CI")
+    return {"target": target, "hands": hands, "best": best, "hands_saved": saved}
+
+
+if __name__ == "__main__":
+    # 用法：python duplicate_eval.py [gto|dqn] [opponent] [deals] [target_ci]
+    agent_name = sys.argv[1] if len(sys.argv) > 1 else "gto"
+    opponent_name = sys.argv[2] if len(sys.argv) > 2 else "passive"
+    deals = int(sys.argv[3]) if len(sys.argv) > 3 else 500
+    target = float(sys.argv[4]) if len(sys.argv) > 4 else None
+    results = evaluate(make_player(agent_name), make_player(opponent_name), deals)
+    print(f"[🃏] {agent_name.upper()} vs {opponent_name.upper()}: {deals} deals played in both seatings ({2 * deals} hands)")
+    report(results, target)
@@ -2,6 +2,7 @@
 
 from dqn_agent import DQNAgent
 from rl_env import RLShortDeckEnv
+from sequential_eval import SequentialEvaluator, SPRT
 import torch
 
 # 加载已训练模型
@@ -12,22 +13,33 @@ agent.load_model("trained_dqn.pt")
 
 # 包含所有五种风格的对手
 opponent_types = ["gto", "random", "passive", "aggressive", "bluff"]
-num_games = 1000
-
-for opponent in opponent_types:
-    win_count = 0
-    env = RLShortDeckEnv(agent=agent, opponent=opponent)
-
-    for _ in range(num_games):
-        state = env.reset()
-        done = False
-        while not done:
-            valid_actions = env.get_valid_actions()
-            action = agent.select_action(state, valid_actions)
-            next_state, reward, done, _ = env.step(action)
-            state = next_state
-        if reward > 0:
-            win_count += 1
-
-    win_rate = win_count / num_games
-    print(f"[🎯] DQN Win Rate vs {opponent.upper()}: {win_count} / {num_games} = {win_rate:.2%}")
+num_games = 1000  # 每类对手的上限；胜负已经在统计上确定的对手提前停止（SPRT，见 sequential_eval.py）
+
+
+def play_games(env):
+    """返回 play(n)：在 env 中打 n 局，结果为每局是否获胜"""
+    def play(n):
+        results = []
+        for _ in range(n):
+            state = env.reset()
+            done = False
+            while not done:
+                valid_actions = env.get_valid_actions()
+                action = agent.select_action(state, valid_actions)
+                next_state, reward, done, _ = env.step(action)
+                state = next_state
+            results.append(reward > 0)
+        return results
+    return play
+
+
+# 每轮只给胜率仍不确定的对手再打 50 局
+evaluator = SequentialEvaluator(
+    {opponent: play_games(RLShortDeckEnv(agent=agent, opponent=opponent)) for opponent in opponent_types},
+    make_test=SPRT, batch=50, min_games=100, max_games=num_games)
+tests = evaluator.run()
+
+for opponent, test in tests.items():
+    win_count = int(test.total)
+    print(f"[🎯] DQN Win Rate vs {opponent.upper()}: {win_count} / {test.n} = {test.mean():.2%}")
+evaluator.report()
@@ -1,17 +1,27 @@
+import sys
 import random
-import pandas as pd
-import numpy as np
-from collections import defaultdict
+from itertools import count
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
 from pypokerengine.api.game import setup_config, start_poker
 from dqn_agent import DQNAgent, ACTION_SPACE
 from rl_env import RLShortDeckEnv, DQNPlayerWrapper
-from opponent_aggressive import Bot as AggressivePlayer
-from opponent_passive import Bot as PassivePlayer
-from opponent_random import Bot as RandomPlayer
-from opponent_bluff import Bot as BluffPlayer
+from dqn_inference import BatchedInferenceServer
+from streaming_stats import StreamingStats
+from sequential_eval import SequentialEvaluator, MeanBound
+from opponent_population import OpponentPopulation, PopulationServer
+from opponent_stats import OpponentStats
 
-# 所有可能的对手类型
-opponent_classes = [AggressivePlayer, PassivePlayer, RandomPlayer, BluffPlayer]
+# 用法：python evaluate_multiplayer_dqn.py [concentration]
+# 对手种群：默认（concentration 为 None）每个机器人与 opponent_*.py 中四类脚本机器人之一完全相同，
+# 每个座位的风格均匀抽取，结果可以与 README 和之前的 CSV 比较；
+# 给出 concentration 时改为以四类机器人为中心抽取参数，越小风格越分散
+concentration = float(sys.argv[1]) if len(sys.argv) > 1 else None
+population = OpponentPopulation.sample(4096, concentration=concentration, seed=0)
+
+# 对手倾向统计：按机器人名字（种群中的下标）累计，跨牌桌、跨多次运行保存在 npz 中
+opponent_stats_path = "dqn_opponent_stats.npz"
+opponent_stats = OpponentStats.load(opponent_stats_path)
 
 # 初始化共享环境（用于DQN状态编码）
 shared_env = RLShortDeckEnv(agent=None, opponent=None)
@@ -21,32 +31,41 @@ agent = DQNAgent(state_dim=13, action_dim=len(ACTION_SPACE))
 agent.env = shared_env
 agent.load_model("trained_dqn.pt")
 
-# 多场对局参数
+# 多场对局参数：num_games 为上限，平均收益的正负已经确定（或已精确到 ±tolerance）时提前停止
 num_games = 1000
-total_profit = 0
-wins = 0
-win_rate_trace = []
+tolerance = 2.0  # 筹码/局
+parallel_tables = 64  # 同时进行的牌桌数，所有牌桌的 DQN 决策合并成批量推理
+# 机器人决策是否也跨牌桌合并成批量 decide：每次决策只有几次浮点比较，线程交接的开销
+# （约 28µs/次，逐个 decide_one 约 1.7µs/次，见 opponent_population.benchmark）远大于批量节省的时间，默认关闭
+batch_bot_decisions = False
+
+# 流式统计："all" 为全部对局，其余分组为每类对手（按该局出现的对手类型计入）；
+# 从上次的检查点继续累加，保存时只追加本次新增的轨迹行
+stats = StreamingStats.load("dqn_multiplayer_stats", initial_stack=100)
 
-# ✅ 新增：每类对手的盈利记录
-profit_by_type = defaultdict(list)
 
-for game_idx in range(num_games):
+def make_table(game_idx):
+    """在主线程中抽取牌桌配置（人数、DQN 座位、对手类型），保证与并发执行顺序无关"""
     num_players = random.randint(6, 8)
     dqn_pos = random.randint(0, num_players - 1)
+    bots = iter(random.sample(range(len(population)), num_players - 1))
+    opponents = {i: next(bots) for i in range(num_players) if i != dqn_pos}
+    return game_idx, num_players, dqn_pos, opponents
+
 
+def play_table(table):
+    game_idx, num_players, dqn_pos, opponents = table
     seats = []
     current_opponents = []
 
     for i in range(num_players):
         if i == dqn_pos:
-            seats.append(("dqn", DQNPlayerWrapper(agent)))
+            seats.append(("dqn", DQNPlayerWrapper(agent, server=server, opponent_stats=opponent_stats)))
         else:
-            opponent_class = random.choice(opponent_classes)
-            opponent_instance = opponent_class()
-            seats.append((f"bot_{i}_{game_idx}", opponent_instance))
-            # ✅ 记录每类对手类型（只按类名统计）
-            opponent_name = opponent_class.__name__.replace("Bot", "").replace("Player", "")
-            current_opponents.append(opponent_name)
+            # 同一个机器人在不同牌桌上用同一个名字，对手统计才能跨桌累计
+            seats.append((f"bot_{opponents[i]}", population.player(opponents[i], server=bot_server)))
+            # ✅ 记录每类对手类型（按机器人所属的风格统计）
+            current_opponents.append(population.styles[opponents[i]].capitalize())
 
     config = setup_config(max_round=1, initial_stack=100, small_blind_amount=5)
     for player_name, player_instance in seats:
@@ -54,30 +73,75 @@ for game_idx in range(num_games):
 
     try:
         result = start_poker(config, verbose=0)
-        dqn_stack = result["players"][dqn_pos]["stack"]
-        profit = dqn_stack - 100
-        total_profit += profit
-        if profit > 0:
-            wins += 1
-        win_rate_trace.append(wins / (game_idx + 1))
-        for opp_type in current_opponents:
-            profit_by_type[opp_type].append(profit)
+        return result["players"][dqn_pos]["stack"] - 100, current_opponents
     except Exception as e:
         print(f"[❌] Error in game {game_idx}: {e}")
-        win_rate_trace.append(wins / (game_idx + 1))
+        return None, current_opponents
+
+
+game_ids = count()
+
+
+def play_tables(n):
+    """再打 n 桌（每批并发执行），更新流式统计，返回 DQN 每桌的收益"""
+    tables = [make_table(next(game_ids)) for _ in range(n)]
+    profits = []
+    for profit, current_opponents in pool.map(play_table, tables):
+        # 出错的对局按收益 0、未获胜计入总体统计
+        stats.update("all", won=profit is not None and profit > 0, profit=profit or 0)
+        if profit is not None:
+            for opp_type in current_opponents:
+                stats.update(opp_type, won=profit > 0, profit=profit)
+        profits.append(profit or 0)
+    return profits
+
+
+# DQN 的前向计算合并成批量推理；batch_bot_decisions 为 True 时机器人决策也合并（每批一次 OpponentPopulation.decide）
+with BatchedInferenceServer(agent.policy_net, max_batch=parallel_tables) as server, \
+        (PopulationServer(population, max_batch=parallel_tables) if batch_bot_decisions else nullcontext()) as bot_server, \
+        ThreadPoolExecutor(max_workers=parallel_tables) as pool:
+    evaluator = SequentialEvaluator(
+        {"all": play_tables},
+        make_test=lambda: MeanBound(tolerance=tolerance, looks=-(-num_games // parallel_tables)),
+        batch=parallel_tables, min_games=2 * parallel_tables, max_games=num_games)
+    evaluator.run()
+    print(f"[⚡] {server.requests_served} decisions in {server.batches} batches "
+          f"(avg batch {server.mean_batch_size():.1f})")
+    if bot_server is not None:
+        print(f"[⚡] {bot_server.requests_served} bot decisions in {bot_server.batches} batches "
+              f"(avg batch {bot_server.mean_batch_size():.1f})")
 
 # 评估结果打印
-avg_profit = total_profit / num_games
-win_rate = wins / num_games
+overall = stats.groups["all"].summary()
+avg_profit = overall["avg_profit"]
+win_rate = overall["win_rate"]
 
-print(f"\n[📊] Multiplayer Evaluation ({num_games} Games)")
+print(f"\n[📊] Multiplayer Evaluation ({evaluator.tests['all'].n} Games this run, {overall['rounds']} in total)")
 print(f"[🎯] Average Profit: {avg_profit:.2f}")
 print(f"[🏆] Win Rate: {win_rate:.2%}")
+stats.report()
+evaluator.report()
+stats.save()
+
+# 对手模型：按风格汇总观察到的 VPIP / 激进度 / 面对加注弃牌率
+print(f"\n{'style':<12}{'bots':>6}{'hands':>8}{'VPIP':>8}{'AGG':>8}{'F2R':>8}")
+observed = opponent_stats.summary()
+for style in sorted(set(population.styles)):
+    rows = [observed[f"bot_{i}"] for i, bot_style in enumerate(population.styles) if bot_style == style and f"bot_{i}" in observed]
+    if rows:
+        hands = sum(row["hands"] for row in rows)
+        means = [sum(row[name] * row["hands"] for row in rows) / max(hands, 1)
+                 for name in ("opp_vpip", "opp_aggression", "opp_fold_to_raise")]
+        print(f"{style.capitalize():<12}{len(rows):>6}{hands:>8}" + "".join(f"{m:>8.2f}" for m in means))
+opponent_stats.save(opponent_stats_path)
 
 # ✅ 保存胜率趋势为 CSV
+import pandas as pd  # 只有写 CSV 时才需要 pandas
+
+trace = stats.trace("all")
 df = pd.DataFrame({
-    "game_index": list(range(1, num_games + 1)),
-    "cumulative_win_rate": win_rate_trace
+    "game_index": trace[:, 0].astype(int),
+    "cumulative_win_rate": trace[:, 1]
 })
 df.to_csv("dqn_multiplayer_winrate_trace.csv", index=False)
 print("[📁] Saved win rate trend to dqn_multiplayer_winrate_trace.csv")
@@ -87,9 +151,10 @@ profit_summary = {
     "opponent_type": [],
     "average_profit": []
 }
-for opp_type, profits in profit_by_type.items():
-    profit_summary["opponent_type"].append(opp_type)
-    profit_summary["average_profit"].append(np.mean(profits))
+for opp_type, summary in stats.summary().items():
+    if opp_type != "all":
+        profit_summary["opponent_type"].append(opp_type)
+        profit_summary["average_profit"].append(summary["avg_profit"])
 
 df_profit = pd.DataFrame(profit_summary)
 df_profit.to_csv("dqn_avg_profit_by_type.csv", index=False)
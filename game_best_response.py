@@ -0,0 +1,103 @@
+import sys
+import time
+from itertools import permutations
+
+import numpy as np
+
+from cfr_solver import CFRSolver, GAMES
+
+
+def enumerate_deals(game):
+    """所有等概率的发牌（有序排列）；Leduc 为 6×5×4 = 120 种，36 张牌的短牌博弈无法穷举"""
+    total_board = sum(game.board_cards) + game.showdown_board
+    h = game.hole_cards
+    return [(cards[:h], cards[h:2 * h], cards[2 * h:])
+            for cards in permutations(game.deck, 2 * h + total_board)]
+
+
+def solver_strategy(solver):
+    """{信息集 key: 按 legal_actions 顺序的平均策略}"""
+    return {key: solver.table.average_strategy(idx) for idx, key in enumerate(solver.info_set_keys())}
+
+
+def best_response_value(game, strategy, player, deals=None):
+    """
+    player 对 strategy 的最优反应价值（每手平均）：对全部发牌同时遍历博弈树，
+    每个历史上按信息集把发牌分组，组内加总各动作的价值后选最大的动作。未出现的信息集按均匀策略。
+    """
+    deals = deals or enumerate_deals(game)
+    values = _best_response(game, strategy, player, deals, "", np.full(len(deals), 1.0 / len(deals)))
+    return float(values.sum())
+
+
+def _best_response(game, strategy, player, deals, history, weights):
+    """返回每个发牌的 权重 × 价值（player 视角），权重为发牌概率 × 对手到达概率"""
+    if game.is_terminal(history):
+        sign = 1 if player == 0 else -1
+        return weights * np.array([sign * game.utility(deal, history) for deal in deals])
+    if game.is_chance_node(history):
+        return _best_response(game, strategy, player, deals, history + "/", weights)
+
+    actor = game.current_player(history)
+    actions = game.legal_actions(history)
+    keys = [game.info_set_key(deal, history, actor) for deal in deals]
+    if actor != player:
+        probs = np.array([strategy.get(key) or [1.0 / len(actions)] * len(actions) for key in keys])
+        return sum(_best_response(game, strategy, player, deals, history + act, weights * probs[:, a])
+                   for a, act in enumerate(actions))
+
+    children = np.stack([_best_response(game, strategy, player, deals, history + act, weights)
+                         for act in actions], axis=1)
+    groups = {}
+    for d, key in enumerate(keys):
+        groups.setdefault(key, []).append(d)
+    values = np.empty(len(deals))
+    for rows in groups.values():
+        best = children[rows].sum(axis=0).argmax()
+        values[rows] = children[rows, best]
+    return values
+
+
+def exploitability(game, strategy, deals=None):
+    """(BR0 + BR1) / 2，单位与 game.utility 相同；纳什均衡处为 0"""
+    deals = deals or enumerate_deals(game)
+    return (best_response_value(game, strategy, 0, deals) + best_response_value(game, strategy, 1, deals)) / 2
+
+
+class GameExploitabilityMonitor:
+    """
+    CFRSolver.train 的 callback：每 check_every 次迭代计算一次精确 exploitability，
+    记录 (iteration, exploitability, 训练耗时秒数)，耗时不含检查点本身，与 ExploitabilityMonitor 相同。
+    """
+
+    def __init__(self, game, check_every=1000):
+        self.game = game
+        self.deals = enumerate_deals(game)
+        self.check_every = check_every
+        self.history = []
+        self.start = None
+        self.overhead = 0.0
+
+    def __call__(self, solver, iteration):
+        now = time.perf_counter()
+        if self.start is None:
+            self.start = now
+        if iteration % self.check_every == 0:
+            value = exploitability(self.game, solver_strategy(solver), self.deals)
+            self.history.append((iteration, value, now - self.start - self.overhead))
+            self.overhead += time.perf_counter() - now
+        return False
+
+
+if __name__ == "__main__":
+    # 用法：python game_best_response.py [kuhn|leduc] [iterations] [chance|external|outcome]
+    name = sys.argv[1] if len(sys.argv) > 1 else "leduc"
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    mode = sys.argv[3] if len(sys.argv) > 3 else "chance"
+    game = GAMES[name]()
+    if not hasattr(game, "deck"):
+        raise SystemExit(f"❌ {name}: only LimitPokerGame-based games can be enumerated")
+    solver = CFRSolver(game, mode=mode)
+    solver.train(iterations)
+    print(f"[📐] {name} ({mode}, {iterations} iterations): exploitability = "
+          f"{exploitability(game, solver_strategy(solver)):.6f} chips/hand")
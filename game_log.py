@@ -0,0 +1,204 @@
+import os
+import re
+import sys
+import csv
+import json
+import time
+
+import numpy as np
+
+# 列式二进制对局日志：一个目录 <name>.glog/ 下三个文件
+#   rounds.bin   每回合一条定长记录（ROUND_DTYPE），可直接 np.memmap
+#   actions.bin  所有回合的动作依次排成一条流（ACTION_DTYPE），回合记录里存起始偏移和条数
+#   meta.json    玩家名、动作编码等元数据
+ROUND_DTYPE = np.dtype([
+    ("round", "<u4"),
+    ("player1_stack", "<i4"),
+    ("opponent_stack", "<i4"),
+    ("winner", "u1"),
+    ("num_actions", "<u2"),
+    ("action_offset", "<u8"),
+])
+ACTION_DTYPE = np.dtype([("code", "u1"), ("seat", "u1"), ("amount", "<u4")])
+ACTIONS = ["FOLD", "CALL", "RAISE", "SMALLBLIND", "BIGBLIND", "ANTE"]
+ACTION_CODES = {name: code for code, name in enumerate(ACTIONS)}
+UNKNOWN = 255  # 胜者 / 座位未知（平局、旧格式没有座位信息等）
+PLAYERS = ("Player1", "Opponent")
+
+# 动作字符串：新格式 "CALL:20"，旧 CSV 格式 "0 call:20"（前缀数字作为座位）
+_ACTION_RE = re.compile(r"(?:(\d+)\s+)?([A-Za-z]+):(-?\d+)")
+# 不同的动作字符串很少，解析结果按原文缓存
+_PARSED = {}
+
+
+def parse_actions(actions):
+    """把动作字符串列表（或 CSV 中用 ';' / ' | ' 拼接的字符串）编码成 ACTION_DTYPE 数组"""
+    if isinstance(actions, str):
+        actions = re.split(r"\s*[;|]\s*", actions)
+    return np.array(_parse_list(actions), dtype=ACTION_DTYPE)
+
+
+def _parse_list(actions):
+    parsed = []
+    for text in actions:
+        action = _PARSED.get(text)
+        if action is None:
+            action = _PARSED[text] = _parse_action(text)
+        if action:
+            parsed.append(action)
+    return parsed
+
+
+def _parse_action(text):
+    match = _ACTION_RE.fullmatch(text.strip())
+    if match is None or match.group(2).upper() not in ACTION_CODES:
+        return ()
+    seat, name, amount = match.groups()
+    return ACTION_CODES[name.upper()], int(seat) if seat else UNKNOWN, max(int(amount), 0)
+
+
+class GameLogWriter:
+    """
+    流式写入列式日志：回合记录和动作先以元组暂存，满 buffer_rounds 回合后整批转换成定长数组追加到文件，
+    内存占用与对局长度无关。
+    """
+
+    def __init__(self, path, players=PLAYERS, buffer_rounds=4096):
+        self.path = path
+        self.players = list(players)
+        os.makedirs(path, exist_ok=True)
+        self.rounds_file = open(os.path.join(path, "rounds.bin"), "wb")
+        self.actions_file = open(os.path.join(path, "actions.bin"), "wb")
+        self.buffer_rounds = buffer_rounds
+        self.round_rows = []
+        self.action_rows = []
+        self.num_rounds = 0
+        self.num_actions = 0
+
+    def write_round(self, round_num, info):
+        """info 与 ActionLog.rounds 中的回合汇总格式相同"""
+        actions = info.get("actions") or []
+        actions = _parse_list(re.split(r"\s*[;|]\s*", actions) if isinstance(actions, str) else actions)
+        winner = info.get("winner", "")
+        self.round_rows.append((round_num, _as_int(info.get("player1_stack")), _as_int(info.get("opponent_stack")),
+                                self.players.index(winner) if winner in self.players else UNKNOWN,
+                                len(actions), self.num_actions))
+        self.action_rows.extend(actions)
+        self.num_actions += len(actions)
+        if len(self.round_rows) >= self.buffer_rounds:
+            self.flush()
+
+    def write_rounds(self, rounds_log):
+        for round_num, info in rounds_log.items():
+            self.write_round(int(round_num), info)
+
+    def flush(self):
+        if self.round_rows:
+            self.rounds_file.write(np.array(self.round_rows, dtype=ROUND_DTYPE).tobytes())
+            self.actions_file.write(np.array(self.action_rows, dtype=ACTION_DTYPE).tobytes())
+            self.num_rounds += len(self.round_rows)
+            self.round_rows = []
+            self.action_rows = []
+
+    def close(self):
+        if self.rounds_file.closed:
+            return
+        self.flush()
+        self.rounds_file.close()
+        self.actions_file.close()
+        with open(os.path.join(self.path, "meta.json"), "w") as f:
+            json.dump({"version": 1, "players": self.players, "actions": ACTIONS,
+                       "rounds": self.num_rounds, "num_actions": self.num_actions}, f, indent=2)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _as_int(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return -1
+
+
+class GameLog:
+    """用 np.memmap 打开列式日志：只映射文件，不解析文本，按需读取的列才会真正从磁盘载入"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.players = self.meta["players"]
+        self.rounds = _memmap(os.path.join(path, "rounds.bin"), ROUND_DTYPE)
+        self.actions = _memmap(os.path.join(path, "actions.bin"), ACTION_DTYPE)
+
+    def __len__(self):
+        return len(self.rounds)
+
+    def wins(self, player="Player1"):
+        return self.rounds["winner"] == self.players.index(player)
+
+    def win_rate(self, player="Player1"):
+        return float(self.wins(player).mean()) if len(self) else 0.0
+
+    def cumulative_win_rate(self, player="Player1"):
+        return np.cumsum(self.wins(player)) / np.arange(1, len(self) + 1)
+
+    def winner_names(self):
+        names = np.array(self.players + [""], dtype=object)
+        return names[np.minimum(self.rounds["winner"], len(self.players))]
+
+    def round_actions(self, index):
+        record = self.rounds[index]
+        start = int(record["action_offset"])
+        return self.actions[start:start + int(record["num_actions"])]
+
+    def action_counts(self):
+        """各类动作在整个日志中的次数"""
+        counts = np.bincount(self.actions["code"], minlength=len(ACTIONS))
+        return dict(zip(ACTIONS, counts[:len(ACTIONS)].tolist()))
+
+
+def _memmap(path, dtype):
+    # 空文件无法映射，直接返回长度为 0 的数组
+    if os.path.getsize(path) == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r")
+
+
+def log_path(csv_path):
+    """log_gto_vs_random.csv → log_gto_vs_random.glog"""
+    return os.path.splitext(csv_path)[0] + ".glog"
+
+
+def write_game_log(path, rounds_log, players=PLAYERS):
+    with GameLogWriter(path, players) as writer:
+        writer.write_rounds(rounds_log)
+    print(f"[✔] Saved binary game log to: {path}")
+
+
+def convert_csv(csv_path, out_path=None, players=PLAYERS):
+    """把已有的 log_gto_vs_*.csv 转换为列式日志，返回输出目录"""
+    out_path = out_path or log_path(csv_path)
+    with open(csv_path, newline="") as f, GameLogWriter(out_path, players) as writer:
+        for row in csv.DictReader(f):
+            actions = row.get("actions", "")
+            writer.write_round(int(row["round"]), dict(row, actions="" if actions == "no_actions" else actions))
+    return out_path
+
+
+if __name__ == "__main__":
+    # 用法：python game_log.py log_gto_vs_random.csv [...]  把 CSV 日志转换为 .glog 并比较载入耗时
+    for csv_path in sys.argv[1:]:
+        out_path = convert_csv(csv_path)
+        start = time.perf_counter()
+        log = GameLog(out_path)
+        win_rate = log.win_rate()
+        elapsed = time.perf_counter() - start
+        size = sum(os.path.getsize(os.path.join(out_path, name)) for name in os.listdir(out_path))
+        print(f"[📁] {csv_path} ({os.path.getsize(csv_path) / 1024:.1f} KiB) → {out_path} ({size / 1024:.1f} KiB)")
+        print(f"  {len(log)} rounds, {len(log.actions)} actions, win rate {win_rate:.2%}, "
+              f"loaded in {elapsed * 1000:.2f} ms")
@@ -0,0 +1,142 @@
+import sys
+import json
+import time
+from cfr_vectorized import CARDS, ACTIONS, DECISION_HISTORIES, TERMINAL_HISTORIES, kuhn_payoff
+from itertools import permutations
+
+DEALS = list(permutations(CARDS, 2))
+
+
+def _action_probs(strategy, info_set):
+    """兼容 [pass, bet] 列表与 {"PASS", "BET"} 字典两种格式；缺失的信息集视为均匀策略"""
+    probs = strategy.get(info_set)
+    if probs is None:
+        return [0.5, 0.5]
+    if isinstance(probs, dict):
+        return [probs.get("PASS", 0.0), probs.get("BET", 0.0)]
+    return list(probs)
+
+
+def best_response_value(strategy, br_player):
+    """br_player 对固定策略 strategy 的最优应对期望收益（对 6 种发牌取平均）"""
+    # 对手在每个 (历史, 发牌) 上的到达概率
+    opp_reach = {}
+    for d, deal in enumerate(DEALS):
+        opp_reach[("", d)] = 1.0
+        for h in DECISION_HISTORIES:
+            player = len(h) % 2
+            probs = _action_probs(strategy, deal[player] + h)
+            for a, act in enumerate(ACTIONS):
+                weight = 1.0 if player == br_player else probs[a]
+                opp_reach[(h + act, d)] = opp_reach[(h, d)] * weight
+
+    # 自底向上求值（br_player 视角）
+    values = {}
+    for h in TERMINAL_HISTORIES:
+        sign = 1 if len(h) % 2 == br_player else -1
+        for d, deal in enumerate(DEALS):
+            values[(h, d)] = sign * kuhn_payoff(deal, h)
+
+    for h in reversed(DECISION_HISTORIES):
+        player = len(h) % 2
+        if player == br_player:
+            # 同一信息集（自己手牌 + 历史）上选择反事实价值最大的动作
+            for card in CARDS:
+                deals = [d for d, deal in enumerate(DEALS) if deal[player] == card]
+                action_values = [sum(opp_reach[(h, d)] * values[(h + act, d)] for d in deals) for act in ACTIONS]
+                best = ACTIONS[action_values.index(max(action_values))]
+                for d in deals:
+                    values[(h, d)] = values[(h + best, d)]
+        else:
+            for d, deal in enumerate(DEALS):
+                probs = _action_probs(strategy, deal[player] + h)
+                values[(h, d)] = sum(probs[a] * values[(h + act, d)] for a, act in enumerate(ACTIONS))
+
+    return sum(values[("", d)] for d in range(len(DEALS))) / len(DEALS)
+
+
+def exploitability(strategy):
+    """(BR0 + BR1) / 2；纳什均衡处为 0"""
+    return (best_response_value(strategy, 0) + best_response_value(strategy, 1)) / 2
+
+
+def game_value(strategy):
+    """双方都按 strategy 行动时玩家 0 的期望收益"""
+    total = 0.0
+    for deal in DEALS:
+        total += _expected_value(strategy, deal, "")
+    return total / len(DEALS)
+
+
+def _expected_value(strategy, deal, history):
+    if history in TERMINAL_HISTORIES:
+        sign = 1 if len(history) % 2 == 0 else -1
+        return sign * kuhn_payoff(deal, history)
+    probs = _action_probs(strategy, deal[len(history) % 2] + history)
+    return sum(probs[a] * _expected_value(strategy, deal, history + act) for a, act in enumerate(ACTIONS))
+
+
+def load_strategy(path="kuhn_gto_strategy.json"):
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def evaluate(strategy):
+    """返回策略表的最优应对价值、exploitability 与耗时（毫秒）"""
+    start = time.perf_counter()
+    br0 = best_response_value(strategy, 0)
+    br1 = best_response_value(strategy, 1)
+    report = {
+        "game_value": game_value(strategy),
+        "best_response_p0": br0,
+        "best_response_p1": br1,
+        "exploitability": (br0 + br1) / 2,
+    }
+    report["elapsed_ms"] = (time.perf_counter() - start) * 1000
+    return report
+
+
+class ExploitabilityMonitor:
+    """
+    训练循环中的检查点：每 check_every 次迭代计算一次 exploitability 并记录
+    (iteration, exploitability, 训练耗时秒数)，耗时不含检查点本身的计算。
+    trainer 需提供 get_average_strategy_map()（KuhnTrainer）或 strategy_dict()（VectorizedKuhnTrainer 等）。
+    """
+
+    def __init__(self, check_every=1000, target=None, verbose=False):
+        self.check_every = check_every
+        self.target = target
+        self.verbose = verbose
+        self.history = []
+        self.start = None
+        self.overhead = 0.0
+
+    def __call__(self, trainer, iteration):
+        """返回 True 表示已达到目标，可以停止训练"""
+        now = time.perf_counter()
+        if self.start is None:
+            self.start = now
+        if iteration % self.check_every != 0:
+            return False
+        if hasattr(trainer, "get_average_strategy_map"):
+            strategy = trainer.get_average_strategy_map()
+        else:
+            strategy = trainer.strategy_dict()
+        current = exploitability(strategy)
+        self.history.append((iteration, current, now - self.start - self.overhead))
+        self.overhead += time.perf_counter() - now
+        if self.verbose:
+            print(f"[iter {iteration}] exploitability = {current:.6f}")
+        return self.target is not None and current <= self.target
+
+
+if __name__ == "__main__":
+    # 用法：python kuhn_best_response.py [strategy.json]
+    path = sys.argv[1] if len(sys.argv) > 1 else "kuhn_gto_strategy.json"
+    report = evaluate(load_strategy(path))
+    print(f"[📐] Strategy: {path}")
+    print(f"  Game value (P0)        : {report['game_value']:+.6f}  (Nash: {-1 / 18:+.6f})")
+    print(f"  Best response vs P1    : {report['best_response_p0']:+.6f}")
+    print(f"  Best response vs P0    : {report['best_response_p1']:+.6f}")
+    print(f"  Exploitability         : {report['exploitability']:.6f}")
+    print(f"  Computed in {report['elapsed_ms']:.2f} ms")
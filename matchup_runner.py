@@ -0,0 +1,98 @@
+import os
+import sys
+import time
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from action_log import JsonlSink
+from game_log import log_path, write_game_log
+from streaming_stats import StreamingStats
+
+OPPONENT_TYPES = ["PASSIVE", "AGGRESSIVE", "BLUFF", "RANDOM"]
+
+
+def make_jobs(opponent_types=OPPONENT_TYPES, rounds=1000, shards=1, seed=0):
+    """把每个对手的 rounds 回合拆成 shards 个独立分片，每个分片有自己的随机种子"""
+    jobs = []
+    for opponent_type in opponent_types:
+        base, extra = divmod(rounds, shards)
+        for shard in range(shards):
+            jobs.append({
+                "opponent": opponent_type,
+                "shard": shard,
+                "rounds": base + (1 if shard < extra else 0),
+                "seed": f"{seed}-{opponent_type.lower()}-{shard}",
+            })
+    return jobs
+
+
+def run_job(job):
+    """
+    在独立进程中运行一个分片：每个进程有自己的 global_action_log，
+    动作记录写入各自的 JSONL 文件，互不干扰。
+    """
+    import starter
+    from shared_data import global_action_log
+
+    random.seed(job["seed"])
+    training_path = f"training/shards/{job['opponent'].lower()}_{job['shard']}.jsonl"
+    global_action_log.set_sink(JsonlSink(training_path))
+
+    start = time.perf_counter()
+    rounds_log = starter.play_match(job["opponent"], job["rounds"])
+    global_action_log.flush()
+    global_action_log.sink.close()
+    elapsed = time.perf_counter() - start
+
+    return dict(job, rounds_log=[rounds_log[k] for k in sorted(rounds_log)],
+                elapsed=elapsed, training_path=training_path)
+
+
+def merge_results(results):
+    """按对手合并分片结果：回合按分片顺序重新编号（各分片筹码独立从 1000 开始）"""
+    merged = {}
+    for result in sorted(results, key=lambda r: (r["opponent"], r["shard"])):
+        rounds_log = merged.setdefault(result["opponent"], {})
+        for info in result["rounds_log"]:
+            rounds_log[len(rounds_log) + 1] = info
+    return merged
+
+
+def run_matchups(opponent_types=OPPONENT_TYPES, rounds=1000, shards=1, seed=0, max_workers=None,
+                 stats_path="logs/match_stats"):
+    import starter
+
+    jobs = make_jobs(opponent_types, rounds, shards, seed)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        results = list(pool.map(run_job, jobs))
+    wall = time.perf_counter() - start
+
+    os.makedirs("logs", exist_ok=True)
+    win_rates = {}
+    for opponent_type, rounds_log in merge_results(results).items():
+        win_count, total = starter.count_wins(rounds_log)
+        win_rates[opponent_type] = win_count / total if total > 0 else 0
+        print(f"RESULT → GTO vs {opponent_type}: {win_count}/{total} wins ({win_rates[opponent_type] * 100:.2f}%)")
+        csv_path = f"logs/log_gto_vs_{opponent_type.lower()}.csv"
+        starter.write_round_log(csv_path, rounds_log)
+        write_game_log(log_path(csv_path), rounds_log)
+
+    # 每个分片是一场独立的对局（筹码从 1000 重新开始），按分片顺序计入流式统计
+    stats = StreamingStats.load(stats_path)
+    for result in sorted(results, key=lambda r: (r["opponent"], r["shard"])):
+        stats.update_rounds(result["opponent"], dict(enumerate(result["rounds_log"], 1)))
+    stats.save()
+
+    slowest = max(r["elapsed"] for r in results)
+    print(f"\n[⏱] {len(jobs)} shards finished in {wall:.2f}s "
+          f"(slowest shard {slowest:.2f}s, serial total {sum(r['elapsed'] for r in results):.2f}s)")
+    return win_rates, results
+
+
+if __name__ == "__main__":
+    # 用法：python matchup_runner.py [rounds] [shards] [workers]
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    shards = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else None
+    run_matchups(rounds=rounds, shards=shards, max_workers=workers)
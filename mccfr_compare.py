@@ -0,0 +1,79 @@
+import sys
+import csv
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+
+from cfr_vectorized import load_recursive_trainer_module
+from cfr_solver import CFRSolver, GAMES, MODES
+from kuhn_best_response import ExploitabilityMonitor
+from game_best_response import GameExploitabilityMonitor
+
+# 有精确 exploitability 曲线的博弈：Kuhn（KuhnTrainer）与 Leduc（CFRSolver，120 种发牌可以穷举最优反应）；
+# 短牌翻前博弈的发牌无法穷举，只比较单次迭代耗时
+CONVERGENCE_GAMES = ("kuhn", "leduc")
+
+
+def kuhn_convergence(iterations=50000, check_every=1000):
+    """KuhnTrainer 三种训练模式的 exploitability-耗时曲线"""
+    module = load_recursive_trainer_module()
+    curves = {}
+    for mode in module.MODES:
+        trainer = module.KuhnTrainer()
+        monitor = ExploitabilityMonitor(check_every)
+        with redirect_stdout(StringIO()):
+            trainer.train(iterations, callback=monitor, mode=mode)
+        curves[mode] = monitor.history
+    return curves
+
+
+def leduc_convergence(iterations=20000, check_every=1000):
+    """CFRSolver 三种模式在 Leduc 上的 exploitability-耗时曲线（单位：筹码/手）"""
+    curves = {}
+    for mode in MODES:
+        game = GAMES["leduc"]()
+        monitor = GameExploitabilityMonitor(game, check_every)
+        CFRSolver(game, mode=mode).train(iterations, verbose=False, callback=monitor)
+        curves[mode] = monitor.history
+    return curves
+
+
+def iteration_cost(games=("kuhn", "leduc", "shortdeck"), iterations=500):
+    """CFRSolver 各模式在不同规模博弈上的单次迭代耗时（微秒）"""
+    costs = {}
+    for name in games:
+        for mode in MODES:
+            solver = CFRSolver(GAMES[name](), mode=mode)
+            start = time.perf_counter()
+            solver.train(iterations, verbose=False)
+            costs[(name, mode)] = (time.perf_counter() - start) / iterations * 1e6
+    return costs
+
+
+if __name__ == "__main__":
+    # 用法：python mccfr_compare.py [kuhn_iterations] [leduc_iterations]
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    leduc_iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    curves = {"kuhn": kuhn_convergence(iterations), "leduc": leduc_convergence(leduc_iterations)}
+
+    for game, game_curves in curves.items():
+        print(f"\n[📈] {game.capitalize()} exploitability vs wall-clock")
+        print(f"{'mode':<10}{'it/s':>10}{'final expl.':>14}{'seconds':>10}")
+        for mode, history in game_curves.items():
+            iteration, value, seconds = history[-1]
+            print(f"{mode:<10}{iteration / seconds:>10.0f}{value:>14.6f}{seconds:>10.2f}")
+
+    with open("mccfr_convergence.csv", "w", newline="") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(["game", "mode", "iteration", "seconds", "exploitability"])
+        for game, game_curves in curves.items():
+            for mode, history in game_curves.items():
+                for iteration, value, seconds in history:
+                    writer.writerow([game, mode, iteration, f"{seconds:.4f}", f"{value:.6f}"])
+    print(f"[📁] Saved convergence curves ({', '.join(CONVERGENCE_GAMES)}) to mccfr_convergence.csv")
+
+    print("\n[⏱] Cost per iteration (µs); shortdeck has no exploitability curve (its deals cannot be enumerated)")
+    costs = iteration_cost()
+    print(f"{'game':<12}" + "".join(f"{mode:>12}" for mode in MODES))
+    for name in ("kuhn", "leduc", "shortdeck"):
+        print(f"{name:<12}" + "".join(f"{costs[(name, mode)]:>12.0f}" for mode in MODES))
@@ -30,3 +30,11 @@ class Bot(BasePokerPlayer):
             return "raise", raise_action["amount"]["min"]
         else:
             return "fold", 0
+
+    def act(self, state, seat):
+        """ ShortDeckEngine 的快速路径：直接读取 HandState，决策与 declare_action 相同 """
+        if random.random() < 0.9:
+            return "call", state.call_amount()
+        elif random.random() < 0.1:
+            return "raise", state.raise_range(seat)[0]
+        return "fold", 0
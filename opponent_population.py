@@ -0,0 +1,261 @@
+import sys
+import time
+import threading
+
+import numpy as np
+from pypokerengine.players import BasePokerPlayer
+
+from batched_server import BatchedServer
+from short_deck_eval import DECK, is_short_deck, hand_features
+
+# 每个机器人一行参数：
+#   fold / call / raise  可以加注时三种动作的概率（和为 1）
+#   bluff                已知牌力且牌弱（hand_strength < 0.5）时改用的加注概率；与 raise 相同表示不看牌
+#   raise_size           加注额在 [最小加注, 最大加注] 之间的位置，0 = 最小加注，1 = 全下
+PARAMS = ["fold", "call", "raise", "bluff", "raise_size"]
+FOLD, CALL, RAISE, BLUFF, RAISE_SIZE = range(len(PARAMS))
+ACTIONS = ("fold", "call", "raise")
+
+# 与 opponent_*.py 中四个脚本机器人相同的动作分布（都按最小加注）。
+# 不能加注时脚本机器人照样以加注概率发出 raise -1，两个引擎都把它当作弃牌，因此这里把加注概率并入弃牌
+
+STYLES = {
+    "passive": (0.09, 0.90, 0.01, 0.01, 0.0),
+    "aggressive": (0.0, 0.40, 0.60, 0.60, 0.0),
+    "bluff": (0.0, 0.30, 0.70, 0.70, 0.0),
+    "random": (0.0, 0.50, 0.50, 0.50, 0.0),
+}
+BLOCK = 4096  # 单个机器人决策时每个线程一次预先抽取的随机数个数
+
+
+class OpponentPopulation:
+    """
+    一组参数化的脚本对手：参数放在 (N, 5) 数组中，decide 用一次 NumPy 调用为任意多张牌桌上的机器人同时决策。
+    player(i) 把第 i 行包装成可以注册到 pypokerengine / ShortDeckEngine 的机器人；
+    需要时可以配合 PopulationServer，把多张牌桌上机器人的决策合并成一次 decide。
+    """
+
+    def __init__(self, params, styles=None, seed=None):
+        self.params = np.asarray(params, dtype=np.float64).reshape(-1, len(PARAMS))
+        self.styles = list(styles) if styles is not None else ["custom"] * len(self.params)
+        self._seeds = np.random.SeedSequence(seed)
+        self.rng = np.random.default_rng(self._seeds.spawn(1)[0])
+        # 单个决策的快速路径用 Python 浮点数，避免逐次访问 NumPy 标量
+        self._rows = self.params.tolist()
+        # 每个线程有自己的随机数流和预抽的随机数块，决策时不需要加锁
+        self._local = threading.local()
+        self._spawn_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.params)
+
+    @classmethod
+    def from_styles(cls, styles, seed=None):
+        return cls([STYLES[name] for name in styles], styles, seed)
+
+    @classmethod
+    def sample(cls, n, styles=None, concentration=None, seed=None):
+        """
+        n 个机器人，风格从 styles 中均匀抽取。concentration 为 None 时参数与预设完全相同；
+        否则以预设为中心抽取（动作概率用 Dirichlet，bluff 用 Beta），concentration 越小越分散，
+        加注额 raise_size 也从 Beta(1, concentration / 4) 中抽取。
+        """
+        rng = np.random.default_rng(seed)
+        styles = list(styles or STYLES)
+        labels = rng.integers(len(styles), size=n)
+        params = np.array([STYLES[name] for name in styles], dtype=np.float64)[labels]
+        if concentration:
+            # 给为 0 的概率留一点质量，Dirichlet 参数必须为正
+            probs = params[:, FOLD:RAISE + 1] + 0.01
+            probs = rng.gamma(probs / probs.sum(axis=1, keepdims=True) * concentration)
+            params[:, FOLD:RAISE + 1] = probs / probs.sum(axis=1, keepdims=True)
+            bluff = np.clip(params[:, BLUFF], 0.01, 0.99)
+            params[:, BLUFF] = rng.beta(bluff * concentration, (1 - bluff) * concentration)
+            params[:, RAISE_SIZE] = rng.beta(1.0, concentration / 4, size=n)
+        return cls(params, [styles[i] for i in labels], rng.integers(2 ** 32))
+
+    def decide(self, bots, call_amount, raise_min, raise_max, strength=None, uniforms=None):
+        """
+        批量决策：bots 为参数行下标，其余参数为等长数组（raise_min 为 -1 表示不能加注，
+        strength 为 NaN 表示牌力未知）。返回 (动作编码, 金额)，动作编码为 ACTIONS 的下标。
+        """
+        params = self.params[np.asarray(bots)]
+        call_amount = np.asarray(call_amount)
+        raise_min, raise_max = np.asarray(raise_min), np.asarray(raise_max)
+        raise_p = params[:, RAISE]
+        if strength is not None:
+            raise_p = np.where(np.asarray(strength) < 0.5, params[:, BLUFF], raise_p)
+        # 加注概率因牌力变化时，剩下的概率按 fold : call 的比例分配
+        passive = params[:, FOLD] + params[:, CALL]
+        fold_p = np.divide(params[:, FOLD] * (1 - raise_p), passive, out=np.zeros_like(raise_p), where=passive > 0)
+        # 不能加注时原本加注的那部分变成弃牌（与脚本机器人的 raise -1 相同）
+        can_raise = (raise_min >= 0) & (raise_max >= raise_min)
+        fold_p = np.where(can_raise, fold_p, fold_p + raise_p)
+        raise_p = np.where(can_raise, raise_p, 0.0)
+        u = self.rng.random(len(params)) if uniforms is None else np.asarray(uniforms)
+        actions = (u >= fold_p).astype(np.int8) + (u >= 1 - raise_p)
+        raise_to = np.rint(raise_min + params[:, RAISE_SIZE] * (raise_max - raise_min)).astype(np.int64)
+        amounts = np.where(actions == RAISE, raise_to, np.where(actions == CALL, call_amount, 0))
+        return actions, amounts
+
+    def decide_one(self, bot, call_amount, raise_min, raise_max, strength=None):
+        """单个决策：与 decide 的分布相同，随机数按块预先抽取，每次决策只做几次浮点比较"""
+        fold, call, raise_p, bluff, size = self._rows[bot]
+        if strength is not None and strength < 0.5:
+            raise_p = bluff
+        passive = fold + call
+        fold_p = fold * (1 - raise_p) / passive if passive > 0 else 0.0
+        if raise_min < 0 or raise_max < raise_min:
+            fold_p, raise_p = fold_p + raise_p, 0.0
+        u = self._uniform()
+        if u >= 1 - raise_p:
+            return "raise", int(round(raise_min + size * (raise_max - raise_min)))
+        if u >= fold_p:
+            return "call", call_amount
+        return "fold", 0
+
+    def _uniform(self):
+        local = self._local
+        block = getattr(local, "block", None)
+        if block is None:
+            with self._spawn_lock:
+                local.rng = np.random.default_rng(self._seeds.spawn(1)[0])
+            block = local.block = []
+        if not block:
+            block.extend(local.rng.random(BLOCK).tolist())
+        return block.pop()
+
+    def uses_strength(self, bot):
+        return self._rows[bot][BLUFF] != self._rows[bot][RAISE]
+
+    def player(self, bot, server=None):
+        return PopulationBot(self, bot, server)
+
+
+class PopulationServer(BatchedServer):
+    """
+    种群决策服务：各牌桌线程中的 PopulationBot 提交 (行号, 跟注额, 最小加注, 最大加注, 牌力)，
+    后台线程把同时等待的请求合成一次 OpponentPopulation.decide，与 BatchedInferenceServer 对 DQN 的做法相同。
+    脚本机器人的单个决策很便宜，线程交接反而更慢（benchmark 中约 28µs 对 decide_one 的约 1.7µs），
+    只有每次决策本身足够贵时才值得使用；默认的 PopulationBot 直接调用 decide_one。
+    """
+
+    def __init__(self, population, max_batch=256, max_latency=0.002):
+        super().__init__(max_batch, max_latency)
+        self.population = population
+
+    def process(self, requests):
+        bots, call_amount, raise_min, raise_max, strength = zip(*requests)
+        strength = [np.nan if s is None else s for s in strength]
+        actions, amounts = self.population.decide(bots, call_amount, raise_min, raise_max, strength)
+        return [(ACTIONS[a], int(amount)) for a, amount in zip(actions.tolist(), amounts.tolist())]
+
+
+class PopulationBot(BasePokerPlayer):
+    """
+    OpponentPopulation 中的一个机器人：只记住自己的行号，决策交给所属的种群；
+    给定 server（PopulationServer）时与其他牌桌的机器人一起批量决策。
+    """
+
+    def __init__(self, population, index, server=None):
+        self.population = population
+        self.index = index
+        self.style = population.styles[index]
+        self.server = server
+
+    def receive_game_start_message(self, game_info):
+        pass
+
+    def receive_round_start_message(self, round_count, hole_card, seats):
+        pass
+
+    def receive_street_start_message(self, street, round_state):
+        pass
+
+    def receive_game_update_message(self, action, round_state):
+        pass
+
+    def receive_round_result_message(self, winners, hand_info, round_state):
+        pass
+
+    def declare_action(self, valid_actions, hole_card, round_state):
+        call_amount, raise_min, raise_max = 0, -1, -1
+        for a in valid_actions:
+            if a["action"] == "call":
+                call_amount = a["amount"]
+            elif a["action"] == "raise":
+                raise_min, raise_max = a["amount"]["min"], a["amount"]["max"]
+        strength = self._strength(hole_card, round_state.get("community_card", []))
+        if self.server is not None:
+            return self.server.call((self.index, call_amount, raise_min, raise_max, strength))
+        return self.population.decide_one(self.index, call_amount, raise_min, raise_max, strength)
+
+    def act(self, state, seat):
+        """ ShortDeckEngine 的快速路径：直接读取 HandState，决策与 declare_action 相同 """
+        raise_min, raise_max = state.raise_range(seat)
+        strength = None
+        if self.population.uses_strength(self.index):
+            strength = self._strength([DECK[c] for c in state.hole[seat]], [DECK[c] for c in state.community_cards()])
+        if self.server is not None:
+            return self.server.call((self.index, state.call_amount(), raise_min, raise_max, strength))
+        return self.population.decide_one(self.index, state.call_amount(), raise_min, raise_max, strength)
+
+    def _strength(self, hole_card, community_card):
+        # 只有诈唬率与加注率不同的机器人才需要牌力；52 张牌的牌局里出现短牌以外的牌时视为未知
+        if not self.population.uses_strength(self.index):
+            return None
+        if not hole_card or not is_short_deck(list(hole_card) + list(community_card)):
+            return None
+        return hand_features(hole_card, community_card)[0]
+
+
+def benchmark(decisions=200000, seed=0, tables=64):
+    """
+    同样数量的决策：原有机器人逐个调用、PopulationBot 逐个调用、decide 一次批量调用，
+    以及 tables 个线程各自逐个调用 / 通过 PopulationServer 批量决策
+    """
+    import importlib
+    from concurrent.futures import ThreadPoolExecutor
+    valid_actions = [{"action": "fold", "amount": 0}, {"action": "call", "amount": 20},
+                     {"action": "raise", "amount": {"min": 40, "max": 1000}}]
+    population = OpponentPopulation.from_styles(list(STYLES), seed)
+    bots = [importlib.import_module(f"opponent_{name}").Bot() for name in STYLES]
+    players = [population.player(i) for i in range(len(population))]
+    results = {}
+    for label, seats in (("opponent_*.Bot", bots), ("PopulationBot", players)):
+        start = time.perf_counter()
+        for i in range(decisions):
+            seats[i % len(seats)].declare_action(valid_actions, [], {})
+        results[label] = time.perf_counter() - start
+    index = np.arange(decisions) % len(population)
+    start = time.perf_counter()
+    population.decide(index, np.full(decisions, 20), np.full(decisions, 40), np.full(decisions, 1000))
+    results["decide (batch)"] = time.perf_counter() - start
+
+    def run_table(seats):
+        for i in range(decisions // tables):
+            seats[i % len(seats)].declare_action(valid_actions, [], {})
+
+    with PopulationServer(population, max_batch=tables) as server:
+        for label, bot_server in ((f"{tables} threads", None), ("PopulationServer", server)):
+            seats = [population.player(i, bot_server) for i in range(len(population))]
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=tables) as pool:
+                list(pool.map(run_table, [seats] * tables))
+            results[label] = time.perf_counter() - start
+        print(f"[📦] PopulationServer: {server.batches} batches, mean batch size {server.mean_batch_size():.1f}")
+    for label, seconds in results.items():
+        print(f"{label:<16}{seconds:>8.3f}s  {seconds / decisions * 1e6:>7.2f} µs/decision")
+    return results
+
+
+if __name__ == "__main__":
+    # 用法：python opponent_population.py [decisions]  比较逐个决策与批量决策的耗时，并核对预设风格的动作分布
+    decisions = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    benchmark(decisions)
+    population = OpponentPopulation.from_styles(list(STYLES), seed=1)
+    for i, name in enumerate(population.styles):
+        actions, _ = population.decide(np.full(decisions, i), np.full(decisions, 20),
+                                       np.full(decisions, 40), np.full(decisions, 1000))
+        freqs = np.bincount(actions, minlength=len(ACTIONS)) / decisions
+        print(f"[📊] {name:<11}" + "  ".join(f"{a} {f:.3f}" for a, f in zip(ACTIONS, freqs)))
@@ -30,3 +30,9 @@ class Bot(BasePokerPlayer):
             return "call", call_action["amount"]
         else:
             return "fold", 0
+
+    def act(self, state, seat):
+        """ ShortDeckEngine 的快速路径：直接读取 HandState，决策与 declare_action 相同 """
+        if random.random() < 0.5:
+            return "raise", state.raise_range(seat)[0]
+        return "call", state.call_amount()
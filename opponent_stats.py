@@ -0,0 +1,178 @@
+import os
+import sys
+import threading
+
+import numpy as np
+
+# 每个对手一行计数：
+#   hands          发到牌的手数
+#   vpip           翻前主动入池（跟注超过自己的盲注或加注）的手数
+#   raises / calls / folds  各类动作次数（过牌算作金额为 0 的 call）
+#   faced_raise    面对别人加注时行动的次数，fold_to_raise 为其中弃牌的次数
+COUNTERS = ["hands", "vpip", "raises", "calls", "folds", "faced_raise", "fold_to_raise"]
+HANDS, VPIP, RAISES, CALLS, FOLDS, FACED_RAISE, FOLD_TO_RAISE = range(len(COUNTERS))
+
+# 作为 DQN 额外状态特征的三个频率；样本少时向先验收缩（相当于先验值上已有 PRIOR_WEIGHT 次观测）
+OPPONENT_FEATURES = ["opp_vpip", "opp_aggression", "opp_fold_to_raise"]
+OPPONENT_DIM = len(OPPONENT_FEATURES)
+PRIORS = np.array([0.5, 0.33, 0.5])
+PRIOR_WEIGHT = 4.0
+
+
+class OpponentStats:
+    """
+    对手倾向统计：计数放在 (容量, 7) 的 int64 数组中，按玩家名分配行（pypokerengine 的 uuid 每局重新生成，
+    名字在多局之间不变），每个动作只加一两个计数，内存只随对手个数增长，与手数无关。
+    多张牌桌可以共用同一个对象，各桌的一手牌内状态放在各自的 OpponentTracker 中。
+    """
+
+    def __init__(self, capacity=64):
+        self.counts = np.zeros((capacity, len(COUNTERS)), dtype=np.int64)
+        self.names = []
+        self.rows = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.names)
+
+    def row(self, name):
+        row = self.rows.get(name)
+        if row is None:
+            with self._lock:
+                row = self.rows.get(name)
+                if row is None:
+                    row = len(self.names)
+                    if row == len(self.counts):
+                        # 容量不够时加倍，摊还 O(1)
+                        self.counts = np.vstack([self.counts, np.zeros_like(self.counts)])
+                    self.names.append(name)
+                    self.rows[name] = row
+        return row
+
+    def add(self, row, counter, amount=1):
+        with self._lock:
+            self.counts[row, counter] += amount
+
+    def features(self, rows):
+        """(len(rows), 3) 的特征：vpip、aggression（加注占全部动作的比例）、fold_to_raise"""
+        counts = self.counts[np.asarray(rows, dtype=np.int64)].astype(np.float64)
+        hits = np.stack([counts[:, VPIP], counts[:, RAISES], counts[:, FOLD_TO_RAISE]], axis=1)
+        totals = np.stack([counts[:, HANDS], counts[:, RAISES] + counts[:, CALLS] + counts[:, FOLDS],
+                           counts[:, FACED_RAISE]], axis=1)
+        return ((hits + PRIORS * PRIOR_WEIGHT) / (totals + PRIOR_WEIGHT)).astype(np.float32)
+
+    def summary(self, names=None):
+        names = self.names if names is None else [name for name in names if name in self.rows]
+        features = self.features([self.rows[name] for name in names]) if names else np.zeros((0, OPPONENT_DIM))
+        return {name: dict(hands=int(self.counts[self.rows[name], HANDS]), **dict(zip(OPPONENT_FEATURES, row.tolist())))
+                for name, row in zip(names, features)}
+
+    def report(self, names=None, limit=20):
+        print(f"{'opponent':<16}{'hands':>7}{'VPIP':>8}{'AGG':>8}{'F2R':>8}")
+        summary = sorted(self.summary(names).items(), key=lambda item: -item[1]["hands"])
+        for name, s in summary[:limit]:
+            print(f"{name:<16}{s['hands']:>7}{s['opp_vpip']:>8.2f}{s['opp_aggression']:>8.2f}"
+                  f"{s['opp_fold_to_raise']:>8.2f}")
+
+    def save(self, path):
+        np.savez(path, names=np.array(self.names, dtype=str), counts=self.counts[:len(self.names)])
+        print(f"[📁] Saved opponent stats ({len(self.names)} opponents) to: {path}")
+
+    @classmethod
+    def load(cls, path):
+        """读取 save() 写出的 .npz；文件不存在时返回空的统计对象"""
+        if not os.path.exists(path):
+            return cls()
+        with np.load(path) as data:
+            names, counts = data["names"].tolist(), data["counts"]
+        stats = cls(max(64, len(names)))
+        stats.counts[:len(names)] = counts
+        stats.names = names
+        stats.rows = {name: row for row, name in enumerate(names)}
+        return stats
+
+
+class OpponentTracker:
+    """
+    一张牌桌上的跟踪器：接收 pypokerengine 消息，把每个动作计入共享的 OpponentStats。
+    一手牌内只记住 uuid → 行号、翻前盲注、本街最后加注者和已计入 VPIP 的玩家，
+    receive_game_update_message 对应的 update 是 O(1)。
+    """
+
+    def __init__(self, stats, uuid=None):
+        self.stats = stats
+        self.uuid = uuid
+        self.rows = {}
+        self.blinds = {}
+        self.preflop = False
+        self.raiser = None
+        self.entered = set()
+
+    def game_start(self, game_info):
+        # uuid 每局重新生成，旧映射不再有用
+        self.rows = {}
+        self._map_seats(game_info.get("seats", ()))
+
+    def round_start(self, seats):
+        self._map_seats(seats)
+        self.entered = set()
+        for seat in seats:
+            if seat.get("state") == "participating" and seat.get("uuid") != self.uuid:
+                self.stats.add(self.rows[seat["uuid"]], HANDS)
+
+    def street_start(self, street, round_state):
+        self.preflop = street == "preflop"
+        self.raiser = None
+        if self.preflop:
+            # 盲注在 street_start 之前已经下好，翻前跟注额不超过自己的盲注不算主动入池
+            seats = round_state.get("seats", [])
+            small_blind = round_state.get("small_blind_amount", 0)
+            self.blinds = {}
+            for pos, amount in ((round_state.get("small_blind_pos"), small_blind),
+                                (round_state.get("big_blind_pos"), 2 * small_blind)):
+                if pos is not None and pos < len(seats):
+                    self.blinds[seats[pos]["uuid"]] = amount
+
+    def update(self, new_action):
+        uuid = new_action.get("player_uuid")
+        row = self.rows.get(uuid)
+        action = new_action.get("action", "").upper()
+        facing_raise = self.raiser is not None and self.raiser != uuid
+        if action == "RAISE":
+            self.raiser = uuid
+        if row is None or uuid == self.uuid:
+            return
+        stats = self.stats
+        if action == "RAISE":
+            stats.add(row, RAISES)
+        elif action == "CALL":
+            stats.add(row, CALLS)
+        elif action == "FOLD":
+            stats.add(row, FOLDS)
+        else:
+            return
+        if facing_raise:
+            stats.add(row, FACED_RAISE)
+            if action == "FOLD":
+                stats.add(row, FOLD_TO_RAISE)
+        voluntary = action == "RAISE" or (action == "CALL" and new_action.get("amount", 0) > self.blinds.get(uuid, 0))
+        if self.preflop and voluntary and uuid not in self.entered:
+            self.entered.add(uuid)
+            stats.add(row, VPIP)
+
+    def features(self, uuids):
+        """uuids 中各对手特征的平均值（没有对手时为先验）"""
+        rows = [self.rows[uuid] for uuid in uuids if uuid in self.rows and uuid != self.uuid]
+        if not rows:
+            return PRIORS.astype(np.float32)
+        return self.stats.features(rows).mean(axis=0)
+
+    def _map_seats(self, seats):
+        for seat in seats:
+            if seat.get("uuid") not in self.rows and seat.get("uuid") != self.uuid:
+                self.rows[seat["uuid"]] = self.stats.row(seat.get("name") or seat["uuid"])
+
+
+if __name__ == "__main__":
+    # 用法：python opponent_stats.py [dqn_opponent_stats.npz]  打印保存的对手统计
+    OpponentStats.load(sys.argv[1] if len(sys.argv) > 1 else "dqn_opponent_stats.npz").report()
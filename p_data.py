@@ -1,6 +1,25 @@
+import os
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
+from game_log import GameLog, log_path
+from streaming_stats import StreamingStats, TRACE_COLUMNS
+
+# 模拟器累加的流式统计检查点：只看最近一次运行的轨迹，且只有它与 CSV 是同一批回合时才直接用其中的
+# 胜率与滑动平均，不再重算；否则（旧检查点、别的运行）按 CSV 计算
+STATS_PATH = "logs/match_stats"
+stats = StreamingStats.load(STATS_PATH) if os.path.exists(os.path.join(STATS_PATH, "stats.json")) else None
+
+
+def load_trace(opponent, df):
+    if stats is None or stats.last_run is None:
+        return None
+    trace = stats.trace(opponent.upper(), run=stats.last_run)
+    # 回合数与胜场数都一致才认为轨迹覆盖的就是 CSV 中的这些回合
+    wins = int((df["winner"] == "Player1").sum())
+    if len(trace) != len(df) or round(float(trace[-1, 1]) * len(trace)) != wins:
+        return None
+    return pd.DataFrame(trace, columns=TRACE_COLUMNS)
 
 # 四个 CSV 文件路径
 files = {
@@ -10,16 +29,35 @@ files = {
     'Random': 'log_gto_vs_random.csv'
 }
 
+
+# 有对应的 .glog 列式日志时直接内存映射读取，不再解析 CSV 文本（用 game_log.py 转换已有 CSV）
+def load_log(csv_file):
+    if not os.path.isdir(log_path(csv_file)):
+        return pd.read_csv(csv_file)
+    log = GameLog(log_path(csv_file))
+    return pd.DataFrame({
+        "round": log.rounds["round"],
+        "player1_stack": log.rounds["player1_stack"],
+        "opponent_stack": log.rounds["opponent_stack"],
+        "winner": log.winner_names(),
+    })
+
+
 all_data = []
 
 for opponent, file in files.items():
-    df = pd.read_csv(file)
+    df = load_log(file)
+    trace = load_trace(opponent, df)
+    if trace is not None:
+        trace["opponent_type"] = opponent
+        all_data.append(trace)
+        continue
 
     # 添加 round 编号（如果没有）
     df["round"] = df.index + 1
 
     # 添加是否赢（GTO是Player1）
-    df["is_win"] = df["winner"].apply(lambda x: 1 if x == "Player1" else 0)
+    df["is_win"] = (df["winner"] == "Player1").astype(int)
 
     # 计算累计胜率
     df["win_rate"] = df["is_win"].expanding().mean()
@@ -51,12 +89,16 @@ plt.show()
 
 # 可视化对每个对手的堆叠走势（折线图）
 def plot_stack_progression(csv_file, opponent_name, window=20):
-    df = pd.read_csv(csv_file)
-    df["round"] = df["round"].astype(int)
-
-    # 使用滚动平均（滑动窗口）平滑曲线
-    df["player1_avg"] = df["player1_stack"].rolling(window=window).mean()
-    df["opponent_avg"] = df["opponent_stack"].rolling(window=window).mean()
+    df = load_log(csv_file)
+    trace = load_trace(opponent_name, df)
+    if trace is not None and window == stats.window:
+        df = trace.rename(columns={"player_avg": "player1_avg"})
+    else:
+        df["round"] = df["round"].astype(int)
+
+        # 使用滚动平均（滑动窗口）平滑曲线
+        df["player1_avg"] = df["player1_stack"].rolling(window=window).mean()
+        df["opponent_avg"] = df["opponent_stack"].rolling(window=window).mean()
 
     plt.figure(figsize=(14, 5))
     plt.plot(df["round"], df["player1_avg"], label="Player1 Avg Stack", linewidth=2, alpha=0.8)
@@ -1,8 +1,16 @@
+import os
 import pandas as pd
 import matplotlib.pyplot as plt
+from streaming_stats import StreamingStats
 
-# 读取 evaluate_multiplayer_dqn.py 生成的胜率追踪文件
-df = pd.read_csv("dqn_multiplayer_winrate_trace.csv")
+# 优先读取 evaluate_multiplayer_dqn.py 保存的流式统计检查点中最近一次运行的轨迹（内存映射），
+# 没有时读取同一次运行写出的胜率追踪 CSV
+stats = StreamingStats.load("dqn_multiplayer_stats") if os.path.exists("dqn_multiplayer_stats/stats.json") else None
+trace = stats.trace("all", run=stats.last_run) if stats is not None and stats.last_run is not None else []
+if len(trace):
+    df = pd.DataFrame({"game_index": trace[:, 0], "cumulative_win_rate": trace[:, 1]})
+else:
+    df = pd.read_csv("dqn_multiplayer_winrate_trace.csv")
 
 # 画图
 plt.figure(figsize=(10, 6))
@@ -0,0 +1,231 @@
+from cfr_vectorized import CARDS as KUHN_CARDS, TERMINAL_HISTORIES as KUHN_TERMINALS, kuhn_payoff
+from short_deck_eval import DECK as SHORT_DECK, RANKS as SHORT_DECK_RANKS, rank_hand
+
+# 动作字符 → 策略表中的动作名
+ACTION_NAMES = {"p": "PASS", "b": "BET", "f": "FOLD", "c": "CALL", "r": "RAISE"}
+
+
+class Game:
+    """
+    博弈定义接口：CFRSolver 只通过这些方法访问博弈。
+    history 为动作字符组成的字符串，deal 为 sample_deal 返回的发牌结果。
+    utility 统一返回玩家 0 视角的收益（两人零和）。
+    信息集由私有部分（card_key）和公开历史组成；info_set_id 把两部分各自编成整数 id，
+    每种手牌抽象、每个历史只保存一份字符串，求解器按 id 存取，需要时用 key_from_id 还原 key。
+    """
+    num_players = 2
+    max_actions = 2
+
+    def __init__(self):
+        self.card_keys, self.card_ids = [], {}
+        self.histories, self.history_ids = [], {}
+
+    def sample_deal(self, rng):
+        raise NotImplementedError
+
+    def is_terminal(self, history):
+        raise NotImplementedError
+
+    def is_chance_node(self, history):
+        """下注轮之间的发牌节点（deal 已预先采样，求解器只需推进历史）"""
+        return False
+
+    def current_player(self, history):
+        raise NotImplementedError
+
+    def legal_actions(self, history):
+        raise NotImplementedError
+
+    def card_key(self, deal, history, player):
+        """信息集中 player 私有的部分（手牌或手牌抽象）"""
+        raise NotImplementedError
+
+    def join_key(self, card_key, history):
+        return card_key + ":" + history
+
+    def info_set_key(self, deal, history, player):
+        return self.join_key(self.card_key(deal, history, player), history)
+
+    def info_set_id(self, deal, history, player):
+        """(私有部分 id, 历史 id)，第一次出现时分配"""
+        card = self.card_key(deal, history, player)
+        card_id = self.card_ids.get(card)
+        if card_id is None:
+            card_id = self.card_ids[card] = len(self.card_keys)
+            self.card_keys.append(card)
+        history_id = self.history_ids.get(history)
+        if history_id is None:
+            history_id = self.history_ids[history] = len(self.histories)
+            self.histories.append(history)
+        return card_id, history_id
+
+    def key_from_id(self, card_id, history_id):
+        return self.join_key(self.card_keys[card_id], self.histories[history_id])
+
+    def history_from_key(self, key):
+        return key.split(":", 1)[1]
+
+    def utility(self, deal, history):
+        raise NotImplementedError
+
+
+class KuhnGame(Game):
+    """Kuhn Poker，信息集 key 与 KuhnTrainer 相同（手牌 + 历史）"""
+
+    def sample_deal(self, rng):
+        return tuple(rng.sample(KUHN_CARDS, 2))
+
+    def is_terminal(self, history):
+        return history in KUHN_TERMINALS
+
+    def current_player(self, history):
+        return len(history) % 2
+
+    def legal_actions(self, history):
+        return ["p", "b"]
+
+    def card_key(self, deal, history, player):
+        return deal[player]
+
+    def join_key(self, card_key, history):
+        return card_key + history
+
+    def history_from_key(self, key):
+        return key[1:]
+
+    def utility(self, deal, history):
+        sign = 1 if len(history) % 2 == 0 else -1
+        return sign * kuhn_payoff(deal, history)
+
+
+class LimitPokerGame(Game):
+    """
+    两人限注扑克：若干下注轮，每轮固定加注额与加注次数上限。
+    动作：f = fold，c = check/call，r = raise；下注轮之间用 "/" 分隔。
+    deal = (玩家0手牌, 玩家1手牌, 公共牌)，公共牌按 board_cards 在各轮开始时翻开。
+    """
+    max_actions = 3
+
+    def __init__(self, deck, hole_cards, board_cards, raise_sizes, max_raises, blinds, showdown_board=0):
+        super().__init__()
+        self.deck = list(deck)
+        self.hole_cards = hole_cards
+        self.board_cards = board_cards  # 每轮开始时新翻开的公共牌数
+        self.raise_sizes = raise_sizes
+        self.max_raises = max_raises
+        self.blinds = blinds  # 两名玩家的强制下注（前注或盲注）
+        self.showdown_board = showdown_board  # 摊牌时额外补发的公共牌（不影响信息集）
+        self.num_rounds = len(raise_sizes)
+
+    def sample_deal(self, rng):
+        total_board = sum(self.board_cards) + self.showdown_board
+        cards = rng.sample(self.deck, 2 * self.hole_cards + total_board)
+        h = self.hole_cards
+        return tuple(cards[:h]), tuple(cards[h:2 * h]), tuple(cards[2 * h:])
+
+    def _replay(self, history):
+        """回放历史，得到 (当前轮, 双方投入, 本轮加注次数, 本轮动作数, 是否有人弃牌)"""
+        contributions = list(self.blinds)
+        rounds = history.split("/")
+        for round_index, actions in enumerate(rounds):
+            raises = 0
+            for i, act in enumerate(actions):
+                player = i % 2
+                if act == "c":
+                    contributions[player] = max(contributions)
+                elif act == "r":
+                    contributions[player] = max(contributions) + self.raise_sizes[round_index]
+                    raises += 1
+                elif act == "f":
+                    return round_index, contributions, raises, len(actions), True
+        return len(rounds) - 1, contributions, raises, len(rounds[-1]), False
+
+    def _round_closed(self, actions):
+        return len(actions) >= 2 and actions[-1] == "c"
+
+    def is_terminal(self, history):
+        if history.endswith("f"):
+            return True
+        rounds = history.split("/")
+        return len(rounds) == self.num_rounds and self._round_closed(rounds[-1])
+
+    def is_chance_node(self, history):
+        """本轮已结束但还有下一轮：需要在历史中追加 "/" """
+        rounds = history.split("/")
+        return len(rounds) < self.num_rounds and self._round_closed(rounds[-1])
+
+    def current_player(self, history):
+        return len(history.split("/")[-1]) % 2
+
+    def legal_actions(self, history):
+        round_index, contributions, raises, _, _ = self._replay(history)
+        player = self.current_player(history)
+        actions = []
+        if contributions[player] < max(contributions):
+            actions.append("f")
+        actions.append("c")
+        if raises < self.max_raises:
+            actions.append("r")
+        return actions
+
+    def visible_board(self, deal, history):
+        round_index = len(history.split("/")) - 1
+        return deal[2][:sum(self.board_cards[:round_index + 1])]
+
+    def card_abstraction(self, hole, board):
+        """默认抽象：只保留点数（忽略花色）"""
+        return "".join(c[1] for c in hole) + ("|" + "".join(c[1] for c in board) if board else "")
+
+    def card_key(self, deal, history, player):
+        return self.card_abstraction(deal[player], self.visible_board(deal, history))
+
+    def compare_hands(self, deal):
+        """摊牌比较：玩家 0 胜返回 1，负返回 -1，平局返回 0"""
+        board = deal[2]
+        rank0 = rank_hand(deal[0] + board)
+        rank1 = rank_hand(deal[1] + board)
+        return (rank0 > rank1) - (rank0 < rank1)
+
+    def utility(self, deal, history):
+        _, contributions, _, actions_in_round, folded = self._replay(history)
+        if folded:
+            folder = (actions_in_round - 1) % 2
+            return -contributions[0] if folder == 0 else contributions[1]
+        result = self.compare_hands(deal)
+        if result > 0:
+            return contributions[1]
+        if result < 0:
+            return -contributions[0]
+        return 0
+
+
+class LeducGame(LimitPokerGame):
+    """Leduc Hold'em：6 张牌（J/Q/K 各两张），每人 1 张手牌，第二轮翻 1 张公共牌"""
+
+    def __init__(self):
+        super().__init__(deck=["SJ", "HJ", "SQ", "HQ", "SK", "HK"], hole_cards=1, board_cards=[0, 1],
+                         raise_sizes=[2, 4], max_raises=2, blinds=[1, 1])
+
+    def compare_hands(self, deal):
+        # 与公共牌成对者胜，否则比较手牌点数
+        board_rank = deal[2][0][1]
+        strength = [(hole[0][1] == board_rank, "JQK".index(hole[0][1])) for hole in deal[:2]]
+        return (strength[0] > strength[1]) - (strength[0] < strength[1])
+
+
+class ShortDeckPreflopGame(LimitPokerGame):
+    """
+    抽象化的两人短牌（36 张）翻前博弈：小盲 10 / 大盲 20（与 starter.py 相同），
+    只有翻前一轮下注，加注额固定为 40、最多 3 次加注；之后直接发满 5 张公共牌摊牌。
+    手牌抽象为点数 + 是否同花（如 "AKs"、"T9o"、"77"）。
+    """
+
+    def __init__(self, raise_size=40, max_raises=3):
+        super().__init__(deck=SHORT_DECK, hole_cards=2, board_cards=[0], raise_sizes=[raise_size],
+                         max_raises=max_raises, blinds=[10, 20], showdown_board=5)
+
+    def card_abstraction(self, hole, board):
+        high, low = sorted(hole, key=lambda c: SHORT_DECK_RANKS.index(c[1]), reverse=True)
+        if high[1] == low[1]:
+            return high[1] + low[1]
+        return high[1] + low[1] + ("s" if high[0] == low[0] else "o")
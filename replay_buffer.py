@@ -0,0 +1,127 @@
+import numpy as np
+import torch
+
+
+class SumTree:
+    """
+    数组形式的求和树：叶子存放优先级，内部节点是子节点之和。
+    更新与采样都对整批下标按层向量化处理，每批只需 O(log capacity) 次 NumPy 运算。
+    """
+
+    def __init__(self, capacity):
+        self.depth = 0
+        while (1 << self.depth) < capacity:
+            self.depth += 1
+        self.leaves = 1 << self.depth
+        self.tree = np.zeros(2 * self.leaves, dtype=np.float64)
+
+    def total(self):
+        return self.tree[1]
+
+    def update(self, indices, priorities):
+        tree = self.tree
+        nodes = np.asarray(indices) + self.leaves
+        tree[nodes] = priorities
+        # 重复的父节点会得到相同的和，无需去重
+        for _ in range(self.depth):
+            nodes = nodes >> 1
+            tree[nodes] = tree[2 * nodes] + tree[2 * nodes + 1]
+
+    def find(self, values):
+        """对每个 value 找到前缀和首次超过它的叶子下标"""
+        tree = self.tree
+        nodes = np.ones(len(values), dtype=np.int64)
+        values = np.array(values, dtype=np.float64)
+        for _ in range(self.depth):
+            left = 2 * nodes
+            left_sum = tree[left]
+            go_right = values >= left_sum
+            values -= left_sum * go_right
+            nodes = left + go_right
+        return nodes - self.leaves
+
+    def priorities(self, indices):
+        return self.tree[np.asarray(indices) + self.leaves]
+
+
+class ReplayBuffer:
+    """
+    预分配的环形经验池：states / actions / rewards / next_states / dones 各是一块连续的
+    NumPy 数组，采样时按下标一次取出整批并直接包装成张量。
+    prioritized=True 时按 |TD 误差|^alpha 的比例采样（求和树），并返回重要性采样权重。
+    """
+
+    def __init__(self, capacity, state_dim, prioritized=False, alpha=0.6, beta=0.4, eps=1e-6, seed=None):
+        self.capacity = capacity
+        self.prioritized = prioritized
+        self.alpha = alpha
+        self.beta = beta
+        self.eps = eps
+        self.rng = np.random.default_rng(seed)
+        self.size = 0
+        self.pos = 0
+
+        self.states = np.zeros((capacity, state_dim), dtype=np.float32)
+        self.next_states = np.zeros((capacity, state_dim), dtype=np.float32)
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.dones = np.zeros(capacity, dtype=np.float32)
+
+        self.tree = SumTree(capacity) if prioritized else None
+        self.max_priority = 1.0
+
+    def __len__(self):
+        return self.size
+
+    def add(self, state, action, reward, next_state, done):
+        self.add_batch([state], [action], [reward], [next_state], [done])
+
+    def add_batch(self, states, actions, rewards, next_states, dones):
+        """一次写入多条转移（例如 VecShortDeckEnv 一步产生的 N 条），超出容量时覆盖最旧的记录"""
+        n = len(actions)
+        indices = (self.pos + np.arange(n)) % self.capacity
+        self.states[indices] = _as_array(states)
+        self.actions[indices] = _as_array(actions)
+        self.rewards[indices] = _as_array(rewards)
+        self.next_states[indices] = _as_array(next_states)
+        self.dones[indices] = _as_array(dones)
+        self.pos = (self.pos + n) % self.capacity
+        self.size = min(self.size + n, self.capacity)
+        if self.prioritized:
+            # 新经验用当前最大优先级，保证至少被采到一次
+            self.tree.update(indices, np.full(n, self.max_priority ** self.alpha))
+
+    def sample(self, batch_size):
+        """返回 (states, actions, rewards, next_states, dones, indices, weights)，均为张量（indices 为数组）"""
+        if self.prioritized:
+            total = self.tree.total()
+            # 分层采样：把 [0, total) 分成 batch_size 段，每段取一个点
+            values = (np.arange(batch_size) + self.rng.random(batch_size)) * (total / batch_size)
+            indices = np.minimum(self.tree.find(values), self.size - 1)
+            probs = self.tree.priorities(indices) / total
+            weights = (self.size * probs) ** -self.beta
+            weights = torch.from_numpy((weights / weights.max()).astype(np.float32))
+        else:
+            # 与原来的 random.sample 相同：一批之内不放回
+            indices = self.rng.choice(self.size, batch_size, replace=False)
+            weights = torch.ones(batch_size)
+
+        # 按下标从连续数组中取出整批，再用 from_numpy 包装成张量（不再额外复制）
+        return (torch.from_numpy(self.states[indices]), torch.from_numpy(self.actions[indices]),
+                torch.from_numpy(self.rewards[indices]), torch.from_numpy(self.next_states[indices]),
+                torch.from_numpy(self.dones[indices]), indices, weights)
+
+    def update_priorities(self, indices, td_errors):
+        if not self.prioritized:
+            return
+        priorities = np.abs(np.asarray(td_errors, dtype=np.float64)) + self.eps
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+        self.tree.update(indices, priorities ** self.alpha)
+
+
+def _as_array(values):
+    if isinstance(values, torch.Tensor):
+        return values.detach().numpy()
+    if isinstance(values, (list, tuple)) and values and isinstance(values[0], torch.Tensor):
+        return torch.stack(list(values)).detach().numpy()
+    return np.asarray(values)
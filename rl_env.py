@@ -1,7 +1,9 @@
 import numpy as np
 import torch
 # 在 rl_env.py 的顶部添加
-from shared_data import ShortDeckSimulator
+from shared_data import ShortDeckSimulator, equity_estimator, ACTION_SPACE
+from state_encoder import StateEncoder, STATE_DIM, PLAYER_STACK, OPP_STACK, NUM_PLAYERS, NUM_ACTIVE, LAST_ACTION
+from opponent_stats import OpponentTracker, OPPONENT_DIM
 
 class RLShortDeckEnv:
     def __init__(self, agent, opponent, max_rounds=1000):
@@ -18,46 +20,7 @@ class RLShortDeckEnv:
         self.done = False
 
     def get_state_tensor(self):
-        state = self.simulator._get_state()
-        round_state = state.get("round_state", {})
-        seats = round_state.get("seats", [])
-        community = round_state.get("community_card", [])
-        player1 = next((p for p in seats if p.get("name") == "Player1"), {})
-        opponent = next((p for p in seats if p.get("name") != "Player1"), {})
-
-        community_count = len(community)
-        is_flop = int(community_count >= 3)
-        is_turn = int(community_count >= 4)
-        is_river = int(community_count == 5)
-
-        chip_diff = (player1.get("stack", 0) - opponent.get("stack", 0)) / 1000.0
-
-        histories = round_state.get("action_histories", {})
-        all_actions = sum(len(v) for v in histories.values())
-        p1_actions = sum(
-            sum(1 for act in v if act.get("player_name") == "Player1")
-            for v in histories.values()
-        )
-        opp_actions = all_actions - p1_actions
-
-        is_dealer = int(round_state.get("dealer_btn") == 0)
-        pot = round_state.get("pot", {}).get("main", 0) / 1000.0
-
-        return [
-            player1.get("stack", 0),  # 1: player_stack
-            player1.get("bet", 0),  # 2: player_bet
-            opponent.get("stack", 0),  # 3: opp_stack
-            opponent.get("bet", 0),  # 4: opp_bet
-            round_state.get("pot", {}).get("main", 0),  # 5: pot_size
-            is_flop,  # 6
-            is_turn,  # 7
-            is_river,  # 8
-            0.0,  # 9: hand_strength placeholder
-            0.0,  # 10: hand_rank placeholder
-            len(seats),  # 11: num_players
-            sum(1 for p in seats if p.get("state") == "participating"),  # 12: num_active
-            0.0  # 13: last_action placeholder
-        ]
+        return self.simulator.get_state_tensor()
 
     def reset(self):
         self.simulator = ShortDeckSimulator()  # 重建模拟器
@@ -80,73 +43,139 @@ class RLShortDeckEnv:
     def get_valid_actions(self):
         return self.simulator.get_legal_actions()
 
+class VecShortDeckEnv:
+    """
+    N 个 ShortDeckSimulator 的向量化版本：筹码、回合数、done 标记放在 NumPy 数组中，
+    一次 step 推进全部环境，状态以单个 (N, 13) 张量返回（与 get_state_tensor 的 13 维布局一致）。
+    结束的环境自动重置：返回的是新一局的初始状态，结束时的状态放在 info["terminal_states"] 中。
+    """
+
+    def __init__(self, num_envs=16, max_rounds=1000, initial_stack=1000, bet=10, win_prob=0.51, seed=None):
+        self.num_envs = num_envs
+        self.max_rounds = max_rounds
+        self.initial_stack = initial_stack
+        self.bet = bet
+        self.win_prob = win_prob
+        self.rng = np.random.default_rng(seed)
+        self.stacks = np.zeros((num_envs, 2), dtype=np.float32)
+        self.rounds = np.zeros(num_envs, dtype=np.int64)
+        self.dones = np.zeros(num_envs, dtype=bool)
+        self.last_actions = np.zeros(num_envs, dtype=np.float32)
+        self.episode_rewards = np.zeros(num_envs, dtype=np.float32)
+
+    def reset(self, mask=None):
+        """重置全部环境，或只重置 mask 为 True 的环境"""
+        mask = np.ones(self.num_envs, dtype=bool) if mask is None else mask
+        self.stacks[mask] = self.initial_stack
+        self.rounds[mask] = 0
+        self.dones[mask] = False
+        self.last_actions[mask] = 0.0
+        self.episode_rewards[mask] = 0.0
+        return self.get_state_tensor()
+
+    def step(self, actions):
+        """actions: 长度为 N 的动作下标（对应 ACTION_SPACE）；返回 (states, rewards, dones, info)"""
+        actions = np.asarray(actions)
+        win = self.rng.random(self.num_envs) < self.win_prob
+        rewards = np.where(win, 1.0, -1.0).astype(np.float32)
+        self.stacks[:, 0] += rewards * self.bet
+        self.stacks[:, 1] -= rewards * self.bet
+        self.rounds += 1
+        self.last_actions[:] = actions
+        self.episode_rewards += rewards
+        self.dones[:] = self.rounds >= self.max_rounds
+
+        dones = self.dones.copy()
+        info = {}
+        if dones.any():
+            info["terminal_states"] = self.get_state_tensor()[torch.from_numpy(dones)]
+            info["episode_rewards"] = self.episode_rewards[dones].copy()
+            self.reset(dones)
+        return self.get_state_tensor(), torch.from_numpy(rewards), dones, info
+
+    def get_state_tensor(self):
+        state = np.zeros((self.num_envs, STATE_DIM), dtype=np.float32)
+        state[:, PLAYER_STACK] = self.stacks[:, 0]
+        state[:, OPP_STACK] = self.stacks[:, 1]
+        state[:, NUM_PLAYERS] = 2
+        state[:, NUM_ACTIVE] = 2
+        state[:, LAST_ACTION] = self.last_actions
+        return torch.from_numpy(state)
+
+    def get_valid_actions(self):
+        return ACTION_SPACE
+
+
 from pypokerengine.players import BasePokerPlayer
 
 class DQNPlayerWrapper(BasePokerPlayer):
-    def __init__(self, dqn_agent):
+    def __init__(self, dqn_agent, server=None, backend=None, encoder=None, opponent_stats=None):
         self.agent = dqn_agent
         self.name = None  # 会在注册时赋值
+        # 可选的 BatchedInferenceServer：多张牌桌并发时把决策合并成批量前向计算
+        self.server = server
+        # 可选的推理后端（dqn_export.load_backend / select_backend 的 predict），替代 eager 的 policy_net
+        self.backend = backend
+        # 状态向量由消息增量维护；可传入 StateBatch 中的一行，让多张牌桌共用一块缓冲区
+        self.encoder = encoder or StateEncoder(estimator=equity_estimator)
+        # 可选的 OpponentStats（可多桌、多局共用）：跟踪对手倾向；
+        # 模型输入为 STATE_DIM + OPPONENT_DIM 维时，把在局对手的平均 VPIP / 激进度 / 面对加注弃牌率接在状态后面
+        self.opponents = OpponentTracker(opponent_stats) if opponent_stats is not None else None
 
     def set_uuid(self, uuid):
         self.uuid = uuid
+        self.encoder.uuid = uuid
+        if self.opponents is not None:
+            self.opponents.uuid = uuid
+
+    def state_vector(self):
+        state_vector = self.encoder.vector()
+        if self.opponents is not None and getattr(self.agent, "state_dim", STATE_DIM) == STATE_DIM + OPPONENT_DIM:
+            state_vector = np.concatenate([state_vector, self.opponents.features(self.encoder.active)])
+        return state_vector
 
     def declare_action(self, valid_actions, hole_card, round_state):
-        seats = round_state["seats"]
-        # 找出自己的 player 实例（根据 uuid 匹配）
-        player = next((p for p in seats if p["uuid"] == self.uuid), None)
-        if player is None:
-            raise ValueError(f"Cannot find player with uuid: {self.uuid}")
-
-        others = [p for p in seats if p["uuid"] != self.uuid]
-        opponent = others[0] if others else {"stack": 0, "bet": 0}
-
-        community = round_state.get("community_card", [])
-        is_flop = int(len(community) >= 3)
-        is_turn = int(len(community) >= 4)
-        is_river = int(len(community) == 5)
-
-        pot = round_state.get("pot", {})
-        main_pot = pot["main"] if isinstance(pot, dict) and "main" in pot else 0
-
-        state_vector = [
-            float(player.get("stack", 0)),
-            float(player.get("bet", 0)),
-            float(opponent.get("stack", 0)),
-            float(opponent.get("bet", 0)),
-            float(main_pot.get("main", 0)),  # 如果你不确定是否 float
-            float(is_flop),
-            float(is_turn),
-            float(is_river),
-            0.0,  # hand_strength
-            0.0,  # hand_rank
-            float(len(seats)),
-            float(sum(1 for p in seats if p.get("state") == "participating")),
-            0.0  # last_action
-        ]
-
-        state_tensor = torch.tensor(state_vector, dtype=torch.float32).unsqueeze(0)
-        with torch.no_grad():
-            q_values = self.agent.policy_net(state_tensor).squeeze().numpy()
+        if not self.encoder.synced:
+            # 没有收到本局的开局消息（例如被直接调用）时，按完整的 round_state 同步一次
+            self.encoder.sync(round_state, hole_card)
+        state_vector = self.state_vector()
+
+        if self.server is not None:
+            q_values = self.server.infer(state_vector)
+        elif self.backend is not None:
+            q_values = self.backend(state_vector[None, :])[0]
+        else:
+            with torch.no_grad():
+                q_values = self.agent.policy_net(torch.from_numpy(state_vector).unsqueeze(0)).squeeze().numpy()
 
         action_index = np.argmax(q_values)
         legal_actions = [act["action"] for act in valid_actions]
         selected_action = legal_actions[action_index % len(legal_actions)]
         action_info = next(a for a in valid_actions if a["action"] == selected_action)
-        return selected_action, action_info["amount"]
+        amount = action_info["amount"]
+        if isinstance(amount, dict):
+            amount = amount["min"]  # raise 的 amount 是 {"min", "max"} 区间，按最小加注
+        return selected_action, amount
 
 
     def receive_game_start_message(self, game_info):
-        pass
+        if self.opponents is not None:
+            self.opponents.game_start(game_info)
 
     def receive_round_start_message(self, round_count, hole_card, seats):
-        pass
+        self.encoder.round_start(hole_card, seats)
+        if self.opponents is not None:
+            self.opponents.round_start(seats)
 
     def receive_street_start_message(self, street, round_state):
-        pass
+        self.encoder.street_start(street, round_state)
+        if self.opponents is not None:
+            self.opponents.street_start(street, round_state)
 
     def receive_game_update_message(self, new_action, round_state):
-        pass
+        self.encoder.update(new_action, round_state)
+        if self.opponents is not None:
+            self.opponents.update(new_action)
 
     def receive_round_result_message(self, winners, hand_info, round_state):
         pass
-
@@ -0,0 +1,170 @@
+import sys
+import math
+import random
+from statistics import NormalDist
+
+# 结论：winning / losing 表示显著高于 / 低于基准，even 表示落在无差别区间内，None 表示还需要更多对局
+WINNING, LOSING, EVEN = "winning", "losing", "even"
+
+
+class SPRT:
+    """
+    胜负（伯努利）样本的序贯概率比检验：H0: p = p0 对 H1: p = p1。
+    对数似然比越过上界接受 H1（winning），越过下界接受 H0（losing）；
+    第一类 / 第二类错误率分别不超过 alpha / beta，与中途检查多少次无关。
+    """
+
+    def __init__(self, p0=0.45, p1=0.55, alpha=0.05, beta=0.05):
+        self.p0, self.p1 = p0, p1
+        self.upper = math.log((1 - beta) / alpha)
+        self.lower = math.log(beta / (1 - alpha))
+        self._win = math.log(p1 / p0)
+        self._loss = math.log((1 - p1) / (1 - p0))
+        self.llr = 0.0
+        self.n = 0
+        self.total = 0.0
+
+    def update(self, won):
+        self.n += 1
+        self.total += bool(won)
+        self.llr += self._win if won else self._loss
+
+    def mean(self):
+        return self.total / self.n if self.n else 0.0
+
+    def decision(self):
+        if self.llr >= self.upper:
+            return WINNING
+        if self.llr <= self.lower:
+            return LOSING
+        return None
+
+    def progress(self):
+        """离最近边界的距离（0 = 刚开始，1 = 已到边界），用于挑选最不确定的对局"""
+        return max(self.llr / self.upper, self.llr / self.lower, 0.0)
+
+
+class MeanBound:
+    """
+    连续样本（如每局收益）的置信界停止规则：均值的置信区间整体高于 / 低于 threshold 时停止，
+    区间半宽小于 tolerance 时判为 even。最多检查 looks 次，每次用 alpha / looks（Bonferroni）控制总错误率。
+    """
+
+    def __init__(self, threshold=0.0, tolerance=1.0, alpha=0.05, looks=20):
+        self.threshold = threshold
+        self.tolerance = tolerance
+        self.z = NormalDist().inv_cdf(1 - alpha / (2 * looks))
+        self.n = 0
+        self.total = 0.0
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, value):
+        value = float(value)
+        self.n += 1
+        self.total += value
+        delta = value - self._mean
+        self._mean += delta / self.n
+        self._m2 += delta * (value - self._mean)
+
+    def mean(self):
+        return self._mean
+
+    def half_width(self):
+        if self.n < 2:
+            return float("inf")
+        return self.z * math.sqrt(self._m2 / (self.n - 1) / self.n)
+
+    def decision(self):
+        half = self.half_width()
+        if self._mean - half > self.threshold:
+            return WINNING
+        if self._mean + half < self.threshold:
+            return LOSING
+        if half < self.tolerance:
+            return EVEN
+        return None
+
+    def progress(self):
+        half = self.half_width()
+        return 0.0 if math.isinf(half) else min(1.0, self.tolerance / half)
+
+
+class SequentialEvaluator:
+    """
+    多个对局（matchup）共用的序贯评估：每轮只给尚未得出结论的对局再分配 batch 局，
+    已有结论或达到 max_games 的对局不再消耗手数。
+    matchups: {名称: play(n) → 长度为 n 的样本列表}；make_test: 为每个对局创建 SPRT / MeanBound。
+    """
+
+    def __init__(self, matchups, make_test=SPRT, batch=50, min_games=100, max_games=1000):
+        self.matchups = matchups
+        self.tests = {name: make_test() for name in matchups}
+        self.batch = batch
+        self.min_games = min_games
+        self.max_games = max_games
+
+    def pending(self):
+        return [name for name, test in self.tests.items()
+                if test.n < self.max_games and (test.n < self.min_games or test.decision() is None)]
+
+    def run(self, verbose=True):
+        while True:
+            names = self.pending()
+            if not names:
+                break
+            # 离结论最远的对局先打
+            for name in sorted(names, key=lambda n: self.tests[n].progress()):
+                test = self.tests[name]
+                for sample in self.matchups[name](min(self.batch, self.max_games - test.n)):
+                    test.update(sample)
+                # 只在对局停止（得出结论或达到上限）时打印
+                if verbose and name not in self.pending():
+                    print(f"  [⏱] {name:<12} stopped after {test.n:>5} games  mean {test.mean():.3f}  "
+                          f"{test.decision() or 'unresolved'}")
+        return self.tests
+
+    def report(self):
+        fixed = self.max_games * len(self.tests)
+        spent = sum(test.n for test in self.tests.values())
+        print(f"\n{'matchup':<12}{'games':>7}{'mean':>9}  decision")
+        for name, test in self.tests.items():
+            decision = test.decision() if test.n >= self.min_games else None
+            print(f"{name:<12}{test.n:>7}{test.mean():>9.3f}  {decision or 'unresolved (max games)'}")
+        print(f"[🚀] {spent} games played instead of {fixed} ({fixed - spent} saved, {spent / fixed:.0%} of fixed budget)")
+        return {name: (test.n, test.mean(), test.decision()) for name, test in self.tests.items()}
+
+
+def hand_matchup(agent, opponent, seed=0):
+    """agent 对 opponent 逐手对局（原生引擎，每手重新发牌、交替庄位），play(n) 返回 agent 这 n 手的收益"""
+    from duplicate_eval import play_hand
+    deal_rng = random.Random(seed)
+    hands = [0]
+
+    def play(n):
+        profits = []
+        for _ in range(n):
+            i = hands[0]
+            hands[0] += 1
+            _, stacks = play_hand([agent, opponent], deal_rng.sample(range(36), 9), i % 2, f"{seed}-{i}")
+            profits.append(stacks[0])
+        return profits
+
+    return play
+
+
+if __name__ == "__main__":
+    # 用法：python sequential_eval.py [gto|dqn] [max_hands] [tolerance]  对四类对手做序贯评估
+    from duplicate_eval import make_player
+    agent_name = sys.argv[1] if len(sys.argv) > 1 else "gto"
+    max_hands = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    tolerance = float(sys.argv[3]) if len(sys.argv) > 3 else 5.0
+    batch = 50
+    agent = make_player(agent_name)
+    matchups = {name: hand_matchup(agent, make_player(name), seed)
+                for seed, name in enumerate(["passive", "aggressive", "bluff", "random"])}
+    evaluator = SequentialEvaluator(matchups, lambda: MeanBound(tolerance=tolerance, looks=-(-max_hands // batch)),
+                                    batch=batch, max_games=max_hands)
+    print(f"[🃏] {agent_name.upper()}: chips/hand vs each opponent, stopping once the sign is resolved")
+    evaluator.run()
+    evaluator.report()
@@ -1,16 +1,18 @@
 # shared_data.py
 
 import random
-import torch
 import numpy as np
+from action_log import ActionLog
+from short_deck_equity import EquityEstimator
+from state_encoder import encode_round_state
 
 ACTION_SPACE = ["fold", "call", "raise"]
 
-# 用于记录所有回合的动作（训练数据）
-global_action_log = {
-    "rounds": {},
-    "data": []  # ✅ 这一行必须保留，避免 KeyError
-}
+# 用于记录所有回合的动作（训练数据）：动作记录结算后流式写入 sink，回合汇总在 rounds 中
+global_action_log = ActionLog()
+
+# 胜率估计（翻前查表，其他街蒙特卡洛 + LRU 缓存），用于状态向量中的 hand_strength
+equity_estimator = EquityEstimator()
 
 # 强化学习训练数据
 training_data = []
@@ -80,58 +82,13 @@ class ShortDeckSimulator:
         return reward, self.done
 
     def get_state_tensor(self):
-        if not self.round_state or "seats" not in self.round_state:
-            # 提供默认维度为13的0向量
-            return torch.zeros(13)
-
-        seats = self.round_state.get("seats", [])
-        player1 = seats[0] if len(seats) > 0 else {}
-        opponent = seats[1] if len(seats) > 1 else {}
-
-        player_stack = player1.get("stack", 0)
-        player_bet = player1.get("bet", 0)
-        opp_stack = opponent.get("stack", 0)
-        opp_bet = opponent.get("bet", 0)
-        pot_size = self.round_state.get("pot", {}).get("main", 0)
-
-        street = self.round_state.get("street", "")
-        is_flop = int(street == "flop")
-        is_turn = int(street == "turn")
-        is_river = int(street == "river")
-
-        hand_strength = 0.0  # 可以后续补充真实值
-        hand_rank = 0.0  # 可以后续补充真实值
-
-        num_players = len(seats)
-        num_active = sum(1 for p in seats if p.get("state") == "participating")
-        last_action = 0.0  # 可以后续编码
-
-        state = [
-            player_stack, player_bet, opp_stack, opp_bet,
-            pot_size, is_flop, is_turn, is_river,
-            hand_strength, hand_rank
-        ]
-
-        # 新增的3项（确保它们在类中存在或能取到）
-        num_players = len(self.round_state["seats"])
-        num_active = sum(1 for p in self.round_state["seats"] if p["state"] == "participating")
-        last_action = self._encode_last_action(self.round_state.get("action_histories", {}))
+        # 延迟导入：只做对局模拟时（starter → cfr_gto_agent → shared_data）不加载 torch
+        import torch
 
-        # 拼接新状态向量
-        state.extend([num_players, num_active, last_action])
-
-        return torch.tensor(state, dtype=torch.float32)
-
-    def _encode_last_action(self, action):
-        action_map = {
-            "fold": 0,
-            "call": 1,
-            "raise": 2,
-            "allin": 3,
-            "check": 4,
-            # 如果你有其他动作，也可以继续加
-        }
-        return action_map.get(action, -1)  # -1 表示未知动作，或者你可以设为 0
+        # 与 DQNPlayerWrapper 使用同一个状态编码器；有手牌时 hand_strength 为对其余在局玩家的胜率
+        state = encode_round_state(self.round_state, hole_card=self.round_state.get("hole_card"),
+                                   estimator=equity_estimator)
+        return torch.from_numpy(state)
 
     def get_legal_actions(self):
         return ["fold", "call", "raise"]
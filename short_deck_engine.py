@@ -0,0 +1,359 @@
+import sys
+import time
+import random
+
+from pypokerengine.players import BasePokerPlayer
+from short_deck_eval import DECK, hand_value, value_category
+
+STREETS = ["preflop", "flop", "turn", "river"]
+BOARD_SIZES = [0, 3, 4, 5]
+
+
+class HandState:
+    """
+    一手牌的紧凑状态：牌用 DECK 下标表示，筹码 / 下注按座位存放在列表中。
+    金额约定与 pypokerengine 相同：call / raise 的 amount 都是本街的下注总额。
+    """
+    __slots__ = ("round_count", "small_blind", "dealer", "sb_pos", "bb_pos", "hole", "board",
+                 "street", "stacks", "bets", "paid", "folded", "acted", "history", "last_raise")
+
+    def __init__(self, round_count, small_blind, dealer, hole, board, stacks):
+        self.round_count = round_count
+        self.small_blind = small_blind
+        self.dealer = dealer
+        # 两人桌与 pypokerengine 一致：庄家下一位是小盲，庄家是大盲，每条街小盲先行动
+        self.sb_pos = 1 - dealer
+        self.bb_pos = dealer
+        self.hole = hole
+        self.board = board
+        self.street = 0
+        self.stacks = stacks
+        self.bets = [0, 0]
+        self.paid = [0, 0]
+        self.folded = [False, False]
+        self.acted = [False, False]
+        # (street, seat, 动作, 本街下注总额, 加注增量)
+        self.history = []
+        # 本街最大的下注记录 (amount, add_amount)，盲注也算在内
+        self.last_raise = None
+
+    def community_cards(self):
+        return self.board[:BOARD_SIZES[self.street]]
+
+    def pot(self):
+        return self.paid[0] + self.paid[1]
+
+    def call_amount(self):
+        return self.last_raise[0] if self.last_raise else 0
+
+    def raise_range(self, seat):
+        """(最小, 最大) 加注总额；筹码不够最小加注时为 (-1, -1)"""
+        low = sum(self.last_raise) if self.last_raise else self.small_blind * 2
+        high = self.stacks[seat] + self.bets[seat]
+        return (low, high) if high >= low else (-1, -1)
+
+    def can_raise(self, seat):
+        return self.raise_range(seat)[0] != -1
+
+    def valid_actions(self, seat):
+        low, high = self.raise_range(seat)
+        return [
+            {"action": "fold", "amount": 0},
+            {"action": "call", "amount": self.call_amount()},
+            {"action": "raise", "amount": {"min": low, "max": high}},
+        ]
+
+
+class ShortDeckEngine:
+    """
+    两人短牌德州的原生对局引擎，规则与 pypokerengine 的无限注对局一致（盲注、最小加注、
+    非法动作按弃牌处理、筹码不足以支付盲注时结束），摊牌使用预计算牌力表。
+
+    玩家若实现 act(state, seat) 则走快速路径，直接读取 HandState；
+    可选的回调 game_start / round_start / street_start / update / round_end 只在存在时调用，
+    update 额外收到行动者座位 actor 与实际执行的 (action, amount)。
+    其他 BasePokerPlayer 通过 PokerPlayerAdapter 接入，照常收到 pypokerengine 格式的消息。
+    """
+
+    def __init__(self, players, names=None, initial_stack=1000, small_blind=10, rng=None):
+        if len(players) != 2:
+            raise ValueError("ShortDeckEngine only supports heads-up (2 players)")
+        names = names or [f"Player{i + 1}" for i in range(2)]
+        self.names = names
+        self.uuids = [f"p{i}" for i in range(2)]
+        self.players = [wrap_player(p, name, uuid) for p, name, uuid in zip(players, names, self.uuids)]
+        self.initial_stack = initial_stack
+        self.small_blind = small_blind
+        self.rng = rng if rng is not None else random
+        self.stacks = [initial_stack, initial_stack]
+        self.round_count = 0
+        self.dealer = 0
+        self.state = None
+        self._hooks = {name: [getattr(p, name, None) for p in self.players]
+                       for name in ("round_start", "street_start", "update", "round_end")}
+
+    def _notify(self, name, *args):
+        for seat, hook in enumerate(self._hooks[name]):
+            if hook is not None:
+                hook(self.state, seat, *args)
+
+    def play(self, max_round=1000):
+        for seat, player in enumerate(self.players):
+            if hasattr(player, "game_start"):
+                player.game_start(self, seat, max_round)
+        for _ in range(max_round):
+            # 下一手的小盲 / 大盲付不起盲注时结束对局
+            sb_pos = 1 - self.dealer
+            if self.stacks[sb_pos] < self.small_blind or self.stacks[self.dealer] < self.small_blind * 2:
+                break
+            self.play_round()
+            self.dealer = 1 - self.dealer
+        return self.result()
+
+    def result(self):
+        """与 start_poker 的返回值格式相同"""
+        return {
+            "rule": {"initial_stack": self.initial_stack, "small_blind_amount": self.small_blind,
+                     "max_round": self.round_count},
+            "players": [{"name": name, "uuid": uuid, "stack": stack, "state": "participating"}
+                        for name, uuid, stack in zip(self.names, self.uuids, self.stacks)],
+        }
+
+    def play_round(self):
+        self.round_count += 1
+        cards = self.rng.sample(range(len(DECK)), 9)
+        state = self.state = HandState(self.round_count, self.small_blind, self.dealer,
+                                       [cards[0:2], cards[2:4]], cards[4:9], self.stacks)
+        self._post_blind(state.sb_pos, "SMALLBLIND", self.small_blind)
+        self._post_blind(state.bb_pos, "BIGBLIND", self.small_blind * 2)
+        self._notify("round_start")
+
+        for street in range(4):
+            if street > 0:
+                state.street = street
+                state.bets = [0, 0]
+                state.acted = [False, False]
+                state.last_raise = None
+            self._notify("street_start")
+            # 至少两名玩家还有筹码时才需要下注
+            if state.stacks[0] > 0 and state.stacks[1] > 0 or street == 0:
+                if not self._betting_round(state):
+                    break
+        self._settle(state)
+
+    def _post_blind(self, seat, action, amount):
+        state = self.state
+        amount = min(amount, state.stacks[seat])
+        state.stacks[seat] -= amount
+        state.bets[seat] += amount
+        state.paid[seat] += amount
+        state.history.append((0, seat, action, amount, self.small_blind))
+        if state.last_raise is None or amount > state.last_raise[0]:
+            state.last_raise = (amount, self.small_blind)
+
+    def _betting_round(self, state):
+        """进行一条街的下注；有人弃牌时返回 False"""
+        seat = state.sb_pos
+        while True:
+            if state.stacks[seat] > 0 and not (state.acted[seat] and state.bets[seat] == state.call_amount()):
+                action, amount = self.players[seat].act(state, seat)
+                action, amount = self._apply(state, seat, action, amount)
+                self._notify("update", seat, action, amount)
+                if action == "fold":
+                    return False
+            if all(state.stacks[s] == 0 or (state.acted[s] and state.bets[s] == state.call_amount())
+                   for s in (0, 1)):
+                return True
+            seat = 1 - seat
+
+    def _apply(self, state, seat, action, amount):
+        """按 pypokerengine 的规则修正并执行动作，返回实际执行的 (action, amount)"""
+        stack, bet = state.stacks[seat], state.bets[seat]
+        if action == "call":
+            call = state.call_amount()
+            if amount >= stack + bet:
+                amount = stack + bet
+            elif amount != call:
+                action, amount = "fold", 0
+        elif action == "raise":
+            low, _ = state.raise_range(seat)
+            if amount != stack + bet and (amount < low or low == -1 or amount > stack + bet):
+                action, amount = "fold", 0
+        else:
+            action, amount = "fold", 0
+
+        state.acted[seat] = True
+        if action == "fold":
+            state.folded[seat] = True
+            state.history.append((state.street, seat, "FOLD", 0, 0))
+            return action, amount
+
+        state.stacks[seat] -= amount - bet
+        state.paid[seat] += amount - bet
+        state.bets[seat] = amount
+        if action == "raise":
+            add = amount - state.call_amount()
+            state.last_raise = (amount, add)
+            state.acted[1 - seat] = False
+            state.history.append((state.street, seat, "RAISE", amount, add))
+        else:
+            state.history.append((state.street, seat, "CALL", amount, 0))
+        return action, amount
+
+    def _settle(self, state):
+        paid = state.paid
+        # 超出对手投入的部分无人跟注，直接退回
+        matched = min(paid)
+        for seat in (0, 1):
+            state.stacks[seat] += paid[seat] - matched
+        pot = matched * 2
+
+        hand_info = []
+        if state.folded[0] or state.folded[1]:
+            winners = [0 if state.folded[1] else 1]
+        else:
+            state.street = 3
+            values = [hand_value(state.hole[seat] + state.board) for seat in (0, 1)]
+            best = max(values)
+            winners = [seat for seat in (0, 1) if values[seat] == best]
+            hand_info = [{"uuid": self.uuids[seat],
+                          "hand": {"hole": [DECK[c] for c in state.hole[seat]],
+                                   "strength": value_category(values[seat])}} for seat in (0, 1)]
+        share, odd = divmod(pot, len(winners))
+        for seat in winners:
+            state.stacks[seat] += share
+        # 平分时的零头给小盲
+        state.stacks[winners[0] if len(winners) == 1 else state.sb_pos] += odd
+        self._notify("round_end", winners, hand_info)
+
+
+class PokerPlayerAdapter:
+    """把 BasePokerPlayer 接到 ShortDeckEngine：按需构造 pypokerengine 格式的消息并转发"""
+
+    def __init__(self, player, name, uuid):
+        self.player = player
+        self.name = name
+        self.uuid = uuid
+        if hasattr(player, "set_uuid"):
+            player.set_uuid(uuid)
+        self.engine = None
+        # 状态没有变化时（如 update 之后紧接着 act）复用上一次构造的 round_state
+        self._cache_key = None
+        self._cache = None
+        # 已转换成消息格式的动作历史，按街增量追加
+        self._histories = {}
+        self._converted = 0
+        self._history_round = None
+
+    def _seats(self):
+        engine = self.engine
+        state = engine.state
+        seats = []
+        for seat in (0, 1):
+            if state is not None and state.folded[seat]:
+                status = "folded"
+            elif engine.stacks[seat] == 0:
+                status = "allin"
+            else:
+                status = "participating"
+            seats.append({"name": engine.names[seat], "uuid": engine.uuids[seat],
+                          "stack": engine.stacks[seat], "state": status})
+        return seats
+
+    def _round_state(self, state, finished=False):
+        key = (state.round_count, state.street, len(state.history), finished)
+        if key != self._cache_key:
+            self._cache_key = key
+            self._cache = self._build_round_state(state, finished)
+        return self._cache
+
+    def _build_round_state(self, state, finished):
+        if state.round_count != self._history_round:
+            self._history_round = state.round_count
+            self._histories = {}
+            self._converted = 0
+        uuids = self.engine.uuids
+        for street, seat, action, amount, add in state.history[self._converted:]:
+            entry = {"action": action, "amount": amount, "uuid": uuids[seat]}
+            if action in ("RAISE", "SMALLBLIND", "BIGBLIND"):
+                entry["add_amount"] = add
+            self._histories.setdefault(STREETS[street], []).append(entry)
+        self._converted = len(state.history)
+        histories = {street: list(self._histories.get(street, ())) for street in STREETS[:state.street + 1]}
+        return {
+            "street": "showdown" if finished else STREETS[state.street],
+            "pot": {"main": {"amount": state.pot()}, "side": []},
+            "community_card": [DECK[c] for c in state.community_cards()],
+            "dealer_btn": state.dealer,
+            "small_blind_pos": state.sb_pos,
+            "big_blind_pos": state.bb_pos,
+            "round_count": state.round_count,
+            "small_blind_amount": state.small_blind,
+            "seats": self._seats(),
+            "action_histories": histories,
+        }
+
+    def game_start(self, engine, seat, max_round):
+        self.engine = engine
+        self.player.receive_game_start_message({
+            "player_num": 2,
+            "rule": {"initial_stack": engine.initial_stack, "max_round": max_round,
+                     "small_blind_amount": engine.small_blind, "ante": 0},
+            "seats": self._seats(),
+        })
+
+    def round_start(self, state, seat):
+        hole_card = [DECK[c] for c in state.hole[seat]]
+        self.player.receive_round_start_message(state.round_count, hole_card, self._seats())
+
+    def street_start(self, state, seat):
+        self.player.receive_street_start_message(STREETS[state.street], self._round_state(state))
+
+    def act(self, state, seat):
+        hole_card = [DECK[c] for c in state.hole[seat]]
+        return self.player.declare_action(state.valid_actions(seat), hole_card, self._round_state(state))
+
+    def update(self, state, seat, actor, action, amount):
+        new_action = {"player_uuid": self.engine.uuids[actor], "action": action, "amount": amount}
+        self.player.receive_game_update_message(new_action, self._round_state(state))
+
+    def round_end(self, state, seat, winners, hand_info):
+        engine = self.engine
+        winner_info = [{"name": engine.names[w], "uuid": engine.uuids[w], "stack": engine.stacks[w],
+                        "state": "participating"} for w in winners]
+        self.player.receive_round_result_message(winner_info, hand_info, self._round_state(state, finished=True))
+
+
+def wrap_player(player, name, uuid):
+    """实现了 act() 的玩家直接走快速路径，其他 BasePokerPlayer 经适配器接入"""
+    if hasattr(player, "act"):
+        return player
+    if isinstance(player, BasePokerPlayer):
+        return PokerPlayerAdapter(player, name, uuid)
+    raise TypeError(f"{type(player).__name__} implements neither act() nor BasePokerPlayer")
+
+
+def benchmark(opponent_types=("PASSIVE", "AGGRESSIVE", "BLUFF", "RANDOM"), rounds=1000):
+    """GTO 智能体对每个对手在 pypokerengine 与原生引擎上各打 rounds 手（有人出局则重开），返回每秒手数"""
+    import starter
+
+    results = {}
+    for engine in ("pypokerengine", "native"):
+        hands = 0
+        start = time.perf_counter()
+        for opponent_type in opponent_types:
+            played = 0
+            while played < rounds:
+                played += len(starter.play_match(opponent_type, rounds - played, engine=engine))
+            hands += played
+        results[engine] = hands / (time.perf_counter() - start)
+    return results
+
+
+if __name__ == "__main__":
+    # 用法：python short_deck_engine.py [rounds]
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    results = benchmark(rounds=rounds)
+    for engine, hands_per_sec in results.items():
+        print(f"[⏱] {engine:<14} {hands_per_sec:>10.0f} hands/s")
+    print(f"[🚀] Speed-up: {results['native'] / results['pypokerengine']:.1f}x")
@@ -0,0 +1,153 @@
+import os
+import sys
+import time
+import threading
+from collections import OrderedDict
+from itertools import permutations
+
+import numpy as np
+
+from short_deck_eval import DECK, RANKS, card_ids, evaluate_batch
+
+PREFLOP_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "short_deck_preflop_equity.npy")
+MIN_PLAYERS, MAX_PLAYERS = 2, 8
+# 起手牌类别：9 个对子 + 36 个同花 + 36 个不同花 = 81 类
+NUM_STARTING_HANDS = len(RANKS) * len(RANKS)
+_SUIT_PERMUTATIONS = [np.array(p) for p in permutations(range(4))]
+
+
+def starting_hand_index(hole):
+    """两张牌（DECK 下标）→ 起手牌类别编号：高牌行、低牌列，同花放在上三角，不同花 / 对子在下三角"""
+    high, low = max(hole[0] >> 2, hole[1] >> 2), min(hole[0] >> 2, hole[1] >> 2)
+    if (hole[0] & 3) == (hole[1] & 3):
+        return low * len(RANKS) + high
+    return high * len(RANKS) + low
+
+
+def starting_hand_name(index):
+    row, col = divmod(index, len(RANKS))
+    if row == col:
+        return RANKS[row] * 2
+    if row < col:
+        return RANKS[col] + RANKS[row] + "s"
+    return RANKS[row] + RANKS[col] + "o"
+
+
+def canonical_key(hole, board):
+    """花色同构的规范形式：在 24 种花色置换中取 (手牌, 公共牌) 的最小表示，手牌与公共牌各自无序"""
+    cards = np.array(list(hole) + list(board))
+    ranks, suits = cards >> 2 << 2, cards & 3
+    best = None
+    for perm in _SUIT_PERMUTATIONS:
+        mapped = ranks | perm[suits]
+        key = (tuple(sorted(mapped[:len(hole)].tolist())), tuple(sorted(mapped[len(hole):].tolist())))
+        if best is None or key < best:
+            best = key
+    return best
+
+
+def monte_carlo_equity(hole, board=(), num_players=2, samples=1000, rng=None):
+    """
+    向量化蒙特卡洛：一次性为 samples 局随机补全公共牌并给 num_players-1 个对手随机发牌，
+    批量计算牌力。返回平均分到的底池比例（平局按人数平分）。
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    hole, board = list(hole), list(board)
+    num_opponents = num_players - 1
+    remaining = np.array([c for c in range(len(DECK)) if c not in hole and c not in board])
+    missing = 5 - len(board)
+    draw = missing + 2 * num_opponents
+
+    # 每行取随机排列的前 draw 张，即不放回抽样
+    picks = remaining[np.argsort(rng.random((samples, len(remaining))), axis=1)[:, :draw]]
+    boards = np.hstack([np.tile(board, (samples, 1)).astype(np.int64), picks[:, :missing]])
+    hands = [np.hstack([np.tile(hole, (samples, 1)), boards])]
+    for i in range(num_opponents):
+        opponent = picks[:, missing + 2 * i:missing + 2 * i + 2]
+        hands.append(np.hstack([opponent, boards]))
+
+    values = evaluate_batch(np.vstack(hands)).reshape(num_players, samples)
+    best = values.max(axis=0)
+    winners = (values == best).sum(axis=0)
+    return float(np.mean(np.where(values[0] == best, 1.0 / winners, 0.0)))
+
+
+def build_preflop_table(samples=20000, seed=0, verbose=True):
+    """81 类起手牌 × 2~8 人的翻前胜率，以 uint16（胜率 × 65535）存放"""
+    rng = np.random.default_rng(seed)
+    table = np.zeros((NUM_STARTING_HANDS, MAX_PLAYERS - MIN_PLAYERS + 1), dtype=np.uint16)
+    start = time.perf_counter()
+    for index in range(NUM_STARTING_HANDS):
+        row, col = divmod(index, len(RANKS))
+        high, low = max(row, col), min(row, col)
+        # 取该类别的一个代表手牌：同花都用梅花，不同花 / 对子第二张用方块
+        hole = [high * 4, low * 4 + (0 if row < col else 1)]
+        for j, num_players in enumerate(range(MIN_PLAYERS, MAX_PLAYERS + 1)):
+            equity = monte_carlo_equity(hole, (), num_players, samples, rng)
+            table[index, j] = round(equity * 65535)
+        if verbose and (index + 1) % 9 == 0:
+            print(f"[🂡] {index + 1}/{NUM_STARTING_HANDS} starting hands ({time.perf_counter() - start:.0f}s)")
+    return table
+
+
+def load_preflop_table(path=PREFLOP_TABLE_PATH):
+    if not os.path.exists(path):
+        return None
+    return np.load(path).astype(np.float64) / 65535
+
+
+class EquityEstimator:
+    """
+    胜率估计：翻前直接查预计算表；其他情况用蒙特卡洛，结果按花色同构的
+    (手牌, 公共牌, 人数) 缓存在 LRU 中，超过 cache_size 时淘汰最久未使用的条目。
+    多张牌桌的线程可以共用同一个对象：缓存的读取、写入和淘汰加锁，蒙特卡洛在锁外计算。
+    """
+
+    def __init__(self, samples=500, cache_size=50000, seed=None, table_path=PREFLOP_TABLE_PATH):
+        self.samples = samples
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.rng = np.random.default_rng(seed)
+        self.preflop_table = load_preflop_table(table_path)
+
+    def equity(self, hole_card, community_card=(), num_players=2):
+        """
+        牌用 pypokerengine 格式字符串，返回对 num_players-1 个随机对手的胜率；
+        牌不属于 36 张短牌时抛出 ValueError（调用方先用 is_short_deck 检查）
+        """
+        hole = card_ids(hole_card)
+        board = card_ids(community_card)
+        num_players = min(max(num_players, MIN_PLAYERS), MAX_PLAYERS)
+        if not board and self.preflop_table is not None:
+            return float(self.preflop_table[starting_hand_index(hole), num_players - MIN_PLAYERS])
+
+        key = (canonical_key(hole, board), num_players)
+        with self._lock:
+            value = self.cache.get(key)
+            if value is not None:
+                self.hits += 1
+                self.cache.move_to_end(key)
+                return value
+            self.misses += 1
+            # Generator 不是线程安全的，每次未命中从共享 rng 取一个子种子
+            seed = self.rng.integers(2 ** 63)
+        value = monte_carlo_equity(hole, board, num_players, self.samples, np.random.default_rng(seed))
+        with self._lock:
+            self.cache[key] = value
+            self.cache.move_to_end(key)
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return value
+
+
+if __name__ == "__main__":
+    # 用法：python short_deck_equity.py [samples]  重新生成翻前胜率表
+    samples = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    table = build_preflop_table(samples)
+    np.save(PREFLOP_TABLE_PATH, table)
+    print(f"[📁] Saved preflop equity table ({table.nbytes} bytes) to {PREFLOP_TABLE_PATH}")
+    for index in np.argsort(-table[:, 0])[:5]:
+        print(f"  {starting_hand_name(index):<4}" + "".join(f"{v / 65535:>7.3f}" for v in table[index]))
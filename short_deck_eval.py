@@ -0,0 +1,246 @@
+import os
+from itertools import combinations, combinations_with_replacement
+
+import numpy as np
+
+# 短牌（36 张，6~A）牌面，格式与 pypokerengine 一致：花色在前，如 "SA"、"H9"、"DT"
+RANKS = "6789TJQKA"
+SUITS = "CDHS"
+DECK = [suit + rank for rank in RANKS for suit in SUITS]
+
+# 牌型等级（短牌规则：三条 > 顺子，同花 > 葫芦）
+HIGH_CARD, ONE_PAIR, TWO_PAIR, STRAIGHT, THREE_OF_A_KIND, FULL_HOUSE, FLUSH, FOUR_OF_A_KIND, STRAIGHT_FLUSH = range(9)
+CATEGORY_NAMES = ["high_card", "one_pair", "two_pair", "straight", "three_of_a_kind",
+                  "full_house", "flush", "four_of_a_kind", "straight_flush"]
+
+
+def card_rank(card):
+    return RANKS.index(card[1])
+
+
+def _straight_high(ranks):
+    """ranks 为去重后的点数下标集合；返回顺子最大牌下标，A-6-7-8-9 中 A 当作最小牌"""
+    for high in range(len(RANKS) - 1, 3, -1):
+        if all(r in ranks for r in range(high - 4, high + 1)):
+            return high
+    if {8, 0, 1, 2, 3} <= ranks:
+        return 3
+    return None
+
+
+def rank_5(cards):
+    """5 张牌的可比较牌力元组 (牌型, 比较点数...)，越大越好"""
+    ranks = sorted((card_rank(c) for c in cards), reverse=True)
+    counts = {}
+    for r in ranks:
+        counts[r] = counts.get(r, 0) + 1
+    # 按 (张数, 点数) 降序排列，用于比较对子/三条等
+    groups = sorted(counts.items(), key=lambda x: (x[1], x[0]), reverse=True)
+    ordered = [r for r, _ in groups]
+    is_flush = len({c[0] for c in cards}) == 1
+    straight_high = _straight_high(set(ranks)) if len(counts) == 5 else None
+
+    if straight_high is not None and is_flush:
+        return (STRAIGHT_FLUSH, straight_high)
+    if groups[0][1] == 4:
+        return (FOUR_OF_A_KIND, *ordered)
+    if is_flush:
+        return (FLUSH, *ranks)
+    if groups[0][1] == 3 and groups[1][1] == 2:
+        return (FULL_HOUSE, *ordered)
+    if groups[0][1] == 3:
+        return (THREE_OF_A_KIND, *ordered)
+    if straight_high is not None:
+        return (STRAIGHT, straight_high)
+    if groups[0][1] == 2 and groups[1][1] == 2:
+        return (TWO_PAIR, *ordered)
+    if groups[0][1] == 2:
+        return (ONE_PAIR, *ordered)
+    return (HIGH_CARD, *ranks)
+
+
+def rank_hand(cards):
+    """5~7 张牌中最好的 5 张组合的牌力"""
+    return max(rank_5(combo) for combo in combinations(cards, 5))
+
+
+# ===== 预计算牌力表 =====
+# 牌的整数编号为其在 DECK 中的下标：rank_index * 4 + suit_index
+CARD_IDS = {card: i for i, card in enumerate(DECK)}
+
+
+def is_short_deck(cards):
+    """cards 是否全部属于 36 张短牌（pypokerengine 默认发 52 张牌，会出现 2~5）"""
+    return all(card in CARD_IDS for card in cards)
+
+
+def card_ids(cards):
+    """pypokerengine 格式的牌 → DECK 下标；不属于短牌时抛出 ValueError"""
+    try:
+        return [CARD_IDS[card] for card in cards]
+    except KeyError as e:
+        raise ValueError(f"card {e.args[0]!r} is not in the 36-card short deck") from None
+PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23)
+
+
+def _build_rank_tables():
+    """
+    枚举所有 5 张牌的点数组合，用 rank_5 计算牌力后按大小编号（越大越好）。
+    非同花按点数质数积查表，同花（5 张点数互不相同）单独一张表。
+    """
+    entries = []
+    for ranks in combinations_with_replacement(range(len(RANKS)), 5):
+        if max(ranks.count(r) for r in ranks) > 4:
+            continue
+        # 同一点数的第 k 张用第 k 种花色，保证不构成同花
+        seen = {}
+        cards = []
+        for r in ranks:
+            cards.append(SUITS[seen.get(r, 0)] + RANKS[r])
+            seen[r] = seen.get(r, 0) + 1
+        if len(seen) == 5:
+            cards[-1] = SUITS[1] + cards[-1][1]
+            entries.append((True, ranks, rank_5([SUITS[0] + RANKS[r] for r in ranks])))
+        entries.append((False, ranks, rank_5(cards)))
+
+    order = {strength: value for value, strength in enumerate(sorted({e[2] for e in entries}))}
+    flush_table, rank_table = {}, {}
+    for is_flush, ranks, strength in entries:
+        product = 1
+        for r in ranks:
+            product *= PRIMES[r]
+        (flush_table if is_flush else rank_table)[product] = order[strength]
+    categories = [strength[0] for strength in sorted(order)]
+    return flush_table, rank_table, categories
+
+
+FLUSH_TABLE, RANK_TABLE, VALUE_CATEGORIES = _build_rank_tables()
+
+
+def hand_value(card_ids):
+    """5~7 张牌（DECK 下标）的整数牌力，可直接比较大小，与 rank_hand 的顺序一致"""
+    primes = [PRIMES[c >> 2] for c in card_ids]
+    best = -1
+    for a, b, c, d, e in combinations(primes, 5):
+        value = RANK_TABLE[a * b * c * d * e]
+        if value > best:
+            best = value
+    # 同花只可能出现在某一花色有 5 张以上时；同花牌力总是高于同样点数的非同花
+    suits = [c & 3 for c in card_ids]
+    for suit in set(suits):
+        suited = [p for p, s in zip(primes, suits) if s == suit]
+        if len(suited) >= 5:
+            for a, b, c, d, e in combinations(suited, 5):
+                value = FLUSH_TABLE[a * b * c * d * e]
+                if value > best:
+                    best = value
+    return best
+
+
+def value_category(value):
+    return CATEGORY_NAMES[VALUE_CATEGORIES[value]]
+
+
+# ===== 5 张牌完美哈希表（NumPy 批量接口） =====
+# 5 张升序排列的牌 c0<c1<...<c4 的 colex 编号 sum(C(c_i, i+1)) 恰好是 0..C(36,5)-1 的一一映射，
+# 表中按编号存放牌力值（与 hand_value 相同），可保存为 .npy 后以 mmap 方式加载
+RANK_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "short_deck_ranks.npy")
+BINOM = np.array([[0 if k > n else int(np.prod(range(n - k + 1, n + 1)) // np.prod(range(1, k + 1)))
+                   for k in range(8)] for n in range(len(DECK) + 1)], dtype=np.int64)
+_BINOM_FLAT = BINOM.ravel()
+_PRIME_ARRAY = np.array(PRIMES, dtype=np.int64)
+_five_card_table = None
+
+
+def build_five_card_table():
+    """枚举全部 C(36,5) 手牌，按 colex 编号生成 uint16 牌力表"""
+    combos = np.array(list(combinations(range(len(DECK)), 5)), dtype=np.int64)
+    products = _PRIME_ARRAY[combos >> 2].prod(axis=1)
+    suits = combos & 3
+    is_flush = (suits == suits[:, :1]).all(axis=1)
+
+    values = np.empty(len(combos), dtype=np.uint16)
+    for mask, lookup in ((is_flush, FLUSH_TABLE), (~is_flush, RANK_TABLE)):
+        keys = np.array(sorted(lookup), dtype=np.int64)
+        table_values = np.array([lookup[k] for k in keys], dtype=np.uint16)
+        values[mask] = table_values[np.searchsorted(keys, products[mask])]
+
+    table = np.empty(len(combos), dtype=np.uint16)
+    table[colex_index(combos)] = values
+    return table
+
+
+def colex_index(cards):
+    """cards: (..., 5) 升序牌编号 → 完美哈希编号"""
+    return _BINOM_FLAT.take(cards * BINOM.shape[1] + np.arange(1, 6)).sum(axis=-1)
+
+
+def save_rank_table(path=RANK_TABLE_PATH, table=None):
+    np.save(path, build_five_card_table() if table is None else table)
+    return path
+
+
+def load_rank_table(path=RANK_TABLE_PATH, mmap=True):
+    """从磁盘加载牌力表（默认 mmap，多进程共享同一份页缓存）；文件不存在时现场构建并尝试保存"""
+    if os.path.exists(path):
+        return np.load(path, mmap_mode="r" if mmap else None)
+    table = build_five_card_table()
+    try:
+        np.save(path, table)
+    except OSError:
+        pass
+    return table
+
+
+def five_card_table():
+    global _five_card_table
+    if _five_card_table is None:
+        _five_card_table = load_rank_table()
+    return _five_card_table
+
+
+_COMBO_COLUMNS = {k: np.array(list(combinations(range(k), 5)), dtype=np.int64) for k in (5, 6, 7)}
+
+
+def evaluate_batch(cards, table=None):
+    """
+    批量计算牌力：cards 为 (N, k) 的牌编号数组，k = 5~7，返回 (N,) 的牌力值，
+    与逐手调用 hand_value 的结果相同。
+    """
+    table = five_card_table() if table is None else table
+    cards = np.sort(np.asarray(cards, dtype=np.int64), axis=1)
+    subsets = cards[:, _COMBO_COLUMNS[cards.shape[1]]]
+    return table[colex_index(subsets)].max(axis=1)
+
+
+# ===== 状态特征：hand_strength / hand_rank =====
+ALL_HOLES = np.array(list(combinations(range(len(DECK)), 2)), dtype=np.int64)
+_HOLE_HAS_CARD = np.array([(ALL_HOLES == c).any(axis=1) for c in range(len(DECK))])
+# 翻前比较用的两张牌键值：(是否对子, 高牌, 低牌)
+_HOLE_KEYS = ((ALL_HOLES[:, 0] >> 2 == ALL_HOLES[:, 1] >> 2) * 100
+              + np.maximum(ALL_HOLES[:, 0] >> 2, ALL_HOLES[:, 1] >> 2) * 10
+              + np.minimum(ALL_HOLES[:, 0] >> 2, ALL_HOLES[:, 1] >> 2))
+
+
+def hand_features(hole_card, community_card):
+    """
+    返回 (hand_strength, hand_rank)，牌用 pypokerengine 格式字符串（必须是短牌，见 is_short_deck）：
+    hand_strength 为当前牌面下我方牌力胜过对手所有可能手牌的比例（平局算一半），
+    翻前按 (对子, 高牌, 低牌) 比较；hand_rank 为当前成牌牌力归一化到 [0, 1]，翻前为 0。
+    """
+    hole = card_ids(hole_card)
+    board = card_ids(community_card)
+    used = hole + board
+    opponents = ~_HOLE_HAS_CARD[used].any(axis=0)
+
+    if len(board) < 3:
+        key = _HOLE_KEYS[(ALL_HOLES[:, 0] == min(hole)) & (ALL_HOLES[:, 1] == max(hole))][0]
+        their = _HOLE_KEYS[opponents]
+        mine, hand_rank = key, 0.0
+    else:
+        mine = hand_value(used)
+        their_cards = np.hstack([ALL_HOLES[opponents], np.tile(board, (int(opponents.sum()), 1))])
+        their = evaluate_batch(their_cards)
+        hand_rank = mine / (len(VALUE_CATEGORIES) - 1)
+    hand_strength = ((their < mine).sum() + 0.5 * (their == mine).sum()) / len(their)
+    return float(hand_strength), float(hand_rank)
@@ -1,73 +1,51 @@
 import os
 import csv
 import importlib
-import json
 from pypokerengine.api.game import setup_config, start_poker
 from cfr_gto_agent import CFRGTOAgent
+from short_deck_engine import ShortDeckEngine
 from shared_data import global_action_log
-from shared_data import global_action_log
-
-# 确保结构健全
-if "data" not in global_action_log:
-    global_action_log["data"] = []
-if "rounds" not in global_action_log:
-    global_action_log["rounds"] = {}
+from action_log import JsonlSink
+from game_log import log_path, write_game_log
+from streaming_stats import StreamingStats
 
 # 创建保存目录
 os.makedirs("logs", exist_ok=True)
 os.makedirs("training", exist_ok=True)
 
 
-# 模拟一场游戏，返回 game_log
-def simulate_game(opponent_type, rounds=1000):
-    import importlib
-    from pypokerengine.api.game import setup_config, start_poker
-    from shared_data import global_action_log
-    import csv
-    import os
-
-    print(f"\n▶ Simulating GTO vs {opponent_type.upper()} ({rounds} rounds)...")
-
-    # 清空日志
-    global_action_log.clear()
-    global_action_log["rounds"] = {}
-
-    global_action_log["data"] = []
-    global_action_log["rounds"] = {}
+# 进行一场对局，返回本场的回合汇总 {round: info}
+# engine="native" 使用原生短牌引擎，"pypokerengine" 使用原来的 start_poker
+def play_match(opponent_type, rounds=1000, engine="native"):
+    # 清空本场的回合汇总（动作记录已流式写入 sink）
+    global_action_log.reset()
 
     # 导入对手类
     opponent_module = importlib.import_module(f"opponent_{opponent_type.lower()}")
     Opponent = getattr(opponent_module, "Bot")
 
     # 导入我们的GTO智能体
-    from cfr_gto_agent import CFRGTOAgent
     p1, p2 = CFRGTOAgent(), Opponent()
 
+    if engine == "native":
+        ShortDeckEngine([p1, p2], names=["Player1", "Opponent"], initial_stack=1000, small_blind=10).play(rounds)
+        return global_action_log.rounds
+
     config = setup_config(max_round=rounds, initial_stack=1000, small_blind_amount=10, ante=0)
     config.register_player(name="Player1", algorithm=p1)
     config.register_player(name="Opponent", algorithm=p2)
 
-    game_result = start_poker(config, verbose=0)
+    start_poker(config, verbose=0)
+    return global_action_log.rounds
 
-    # ========== 记录胜率 ==========
-    rounds_log = global_action_log.get("rounds", {})
-    win_count = 0
-    total = 0
 
-    for round_num, round_info in rounds_log.items():
-        winner = round_info.get("winner")
-        if winner == "Player1":
-            win_count += 1
-        total += 1
+def count_wins(rounds_log):
+    win_count = sum(1 for info in rounds_log.values() if info.get("winner") == "Player1")
+    return win_count, len(rounds_log)
 
-    win_rate = win_count / total if total > 0 else 0
-    print(f"\n============================================================")
-    print(f"RESULT → GTO vs {opponent_type.upper()}: {win_count}/{total} wins ({win_rate * 100:.2f}%)")
-    print(f"============================================================")
 
-    # ========== 保存 CSV ==========
-    os.makedirs("logs", exist_ok=True)
-    csv_filename = f"logs/log_gto_vs_{opponent_type.lower()}.csv"
+# 把回合汇总写成 CSV
+def write_round_log(csv_filename, rounds_log):
     with open(csv_filename, "w", newline="") as csvfile:
         fieldnames = ["round", "player1_stack", "opponent_stack", "winner", "actions"]
         writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
@@ -82,85 +60,81 @@ def simulate_game(opponent_type, rounds=1000):
             })
     print(f"[✔] Saved detailed game log to: {csv_filename}")
 
-    return win_rate
 
+# 模拟一场游戏，返回胜率
+# stats 为 StreamingStats 时把本场每一回合计入流式统计
+def simulate_game(opponent_type, rounds=1000, engine="native", stats=None):
+    print(f"\n▶ Simulating GTO vs {opponent_type.upper()} ({rounds} rounds)...")
 
-# 保存游戏日志到 CSV
-def save_game_log(name):
-    csv_filename = f"logs/log_gto_vs_{name.lower()}.csv"
-    with open(csv_filename, "w", newline="") as csvfile:
-        fieldnames = ["round", "player1_stack", "opponent_stack", "winner", "actions"]
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
+    rounds_log = play_match(opponent_type, rounds, engine)
+    if stats is not None:
+        stats.update_rounds(opponent_type.upper(), rounds_log)
 
-        for round_num, round_info in global_action_log.get(name, {}).items():
-            writer.writerow({
-                "round": round_num,
-                "player1_stack": round_info.get("player1_stack", 0),
-                "opponent_stack": round_info.get("opponent_stack", 0),
-                "winner": round_info.get("winner", ""),
-                "actions": round_info.get("actions", "no_actions")
-            })
+    # ========== 记录胜率 ==========
+    win_count, total = count_wins(rounds_log)
+    win_rate = win_count / total if total > 0 else 0
+    print(f"\n============================================================")
+    print(f"RESULT → GTO vs {opponent_type.upper()}: {win_count}/{total} wins ({win_rate * 100:.2f}%)")
+    print(f"============================================================")
+
+    # ========== 保存 CSV 与列式二进制日志 ==========
+    os.makedirs("logs", exist_ok=True)
+    csv_path = f"logs/log_gto_vs_{opponent_type.lower()}.csv"
+    write_round_log(csv_path, rounds_log)
+    write_game_log(log_path(csv_path), rounds_log)
+
+    return win_rate
 
-    print(f"[✔] Saved detailed game log to: {csv_filename}")
 
 # 提取训练数据
 def extract_training_data():
     print("[🧠] Extracting training data from global_action_log...")
 
-    rounds = global_action_log.get("rounds", {})
-    if not rounds:
-        print("[!] No rounds found in global_action_log.")
-        return
-
-    # 强制转换 round_count 为 int 确保能匹配
-    rounds = {int(k): v for k, v in rounds.items()}
-
-    valid_pairs = 0
-    for round_num, round_info in rounds.items():
-        winner_name = round_info["winner"]
-
-        matched = False
-        for entry in reversed(global_action_log["data"]):
-            if entry.get("round_count") == round_num and entry["reward"] is None:
-                reward = 1 if entry["player_name"] == winner_name else -1
-                entry["reward"] = reward
-                matched = True
-                valid_pairs += 1
-                break
-
-        if not matched:
-            print(f"[!] No reward matched for round {round_num} | expected winner: {winner_name}")
-
-    if valid_pairs == 0:
-        print("[!] No valid state-action pairs found. DQN training skipped.")
-        return
-
-    # 保存 JSON 训练数据
-    os.makedirs("training", exist_ok=True)
-    with open("training/training_data.json", "w") as f:
-        json.dump(global_action_log["data"], f, indent=2)
-
-    print(f"[✔] Saved training data to: training/training_data.json")
-
-
-
-# ==========================================
-# 主程序
-if __name__ == "__main__":
-    opponent_types = ["PASSIVE", "AGGRESSIVE", "BLUFF", "RANDOM"]
+    # 动作记录在回合结束时已按 (回合, uuid) 结算并写入 sink，这里只处理残留的未结算记录
+    rounds = {int(k): v for k, v in global_action_log.rounds.items()}
+    for (round_num, player_uuid), entries in list(global_action_log.pending.items()):
+        round_info = rounds.get(round_num)
+        if round_info is None:
+            print(f"[!] No reward matched for round {round_num}")
+            continue
+        reward = 1 if entries[-1]["player_name"] == round_info["winner"] else -1
+        global_action_log.assign_reward(round_num, player_uuid, reward)
+
+    global_action_log.flush()
+    sink = global_action_log.sink
+    if isinstance(sink, JsonlSink):
+        if sink.count == 0:
+            print("[!] No valid state-action pairs found. DQN training skipped.")
+            return
+        print(f"[✔] Saved {sink.count} training records to: {sink.path}")
+
+
+# 依次与每种对手对局，保存对战日志并提取训练数据；统计累加到 stats_path 的检查点中
+def run_all(opponent_types=("PASSIVE", "AGGRESSIVE", "BLUFF", "RANDOM"), rounds=1000, engine="native",
+            stats_path="logs/match_stats"):
+    # 训练数据按批追加写入 JSONL，内存中只保留未结算的记录
+    global_action_log.set_sink(JsonlSink("training/training_data.jsonl"))
+    stats = StreamingStats.load(stats_path)
 
     for opp_type in opponent_types:
-        print(f"\n▶ Simulating GTO vs {opp_type} (1000 rounds)...")
+        print(f"\n▶ Simulating GTO vs {opp_type} ({rounds} rounds)...")
 
-        win_rate = simulate_game(opp_type, rounds=1000)
+        win_rate = simulate_game(opp_type, rounds=rounds, engine=engine, stats=stats)
 
         print("=" * 60)
         print(f"RESULT → GTO vs {opp_type}: {win_rate * 100:.2f}% wins")
         print("=" * 60)
 
-        # 保存对战日志
-        save_game_log(opp_type)
-
     # 提取总的训练数据
     extract_training_data()
+    global_action_log.sink.close()
+
+    stats.save()
+    print(f"\n[📊] Running totals ({stats_path})")
+    stats.report()
+
+
+# ==========================================
+# 主程序
+if __name__ == "__main__":
+    run_all()
@@ -0,0 +1,195 @@
+import numpy as np
+
+from short_deck_eval import is_short_deck, hand_features
+
+# 13 维状态向量的布局（训练环境与评估时的 DQNPlayerWrapper 共用）
+FEATURES = [
+    "player_stack", "player_bet", "opp_stack", "opp_bet", "pot_size",
+    "is_flop", "is_turn", "is_river", "hand_strength", "hand_rank",
+    "num_players", "num_active", "last_action",
+]
+STATE_DIM = len(FEATURES)
+(PLAYER_STACK, PLAYER_BET, OPP_STACK, OPP_BET, POT_SIZE, IS_FLOP, IS_TURN, IS_RIVER,
+ HAND_STRENGTH, HAND_RANK, NUM_PLAYERS, NUM_ACTIVE, LAST_ACTION) = range(STATE_DIM)
+
+# last_action 编码与 ACTION_SPACE 下标一致（check 在 pypokerengine 中就是金额为 0 的 call）
+ACTION_CODES = {"FOLD": 0, "CALL": 1, "RAISE": 2}
+STREET_FLAGS = {"flop": (1, 0, 0), "turn": (1, 1, 0), "river": (1, 1, 1)}
+BLINDS = ("SMALLBLIND", "BIGBLIND", "ANTE")
+
+
+def _default_estimator():
+    from shared_data import equity_estimator  # 延迟导入，避免与 shared_data 循环导入
+    return equity_estimator
+
+
+def _pot_total(pot):
+    """兼容 pypokerengine 的 {"main": {"amount": n}, "side": [...]} 和旧模拟器的 {"main": n}"""
+    main = pot.get("main", 0)
+    total = main.get("amount", 0) if isinstance(main, dict) else main
+    return total + sum(side.get("amount", 0) for side in pot.get("side", ()))
+
+
+class StateEncoder:
+    """
+    从一个玩家（uuid）视角维护 13 维状态向量，写入预分配的 float32 行 out。
+    每条街开始时用 round_state 同步一次（O(人数 + 本街动作数)），
+    之后每个 game_update 只更新出手者相关的几个特征，决策时直接读取，代价 O(1)。
+    没有 uuid 时以 seats[0] 为自己；对手特征取 seats 中第一个其他玩家。
+    """
+
+    def __init__(self, uuid=None, out=None, estimator=None):
+        self.uuid = uuid
+        self.state = np.zeros(STATE_DIM, dtype=np.float32) if out is None else out
+        self.estimator = estimator
+        self.hole_card = []
+        self.community_card = []
+        self.opponent = None
+        self._me = None
+        self.stacks = {}
+        self.bets = {}
+        self.active = set()
+        self.synced = False
+        self._hand_dirty = False
+
+    def round_start(self, hole_card, seats=None):
+        """新一局：记下手牌，状态等到 preflop 的 street_start 再同步"""
+        self.hole_card = list(hole_card or [])
+        self.community_card = []
+        self.synced = False
+
+    def street_start(self, street, round_state):
+        self.sync(round_state, self.hole_card)
+
+    def sync(self, round_state, hole_card=None):
+        """按完整的 round_state 重建全部特征"""
+        if hole_card is not None:
+            self.hole_card = list(hole_card)
+        state = self.state
+        state[:] = 0.0
+        seats = round_state.get("seats", [])
+        if not seats:
+            self.synced = False
+            return state
+
+        me = next((p for p in seats if p.get("uuid") == self.uuid), seats[0]) if self.uuid else seats[0]
+        others = [p for p in seats if p is not me]
+        self.opponent = others[0].get("uuid") if others else None
+        self._me = me.get("uuid")
+        self.stacks = {p.get("uuid"): p.get("stack", 0) for p in seats}
+        self.active = {p.get("uuid") for p in seats if p.get("state") == "participating"}
+
+        # 本街已下注额：CALL / RAISE / 盲注的 amount 都是本街累计额
+        street = round_state.get("street", "")
+        self.bets = {}
+        last_action = 0
+        histories = round_state.get("action_histories", {})
+        for entry in histories.get(street, ()):
+            if entry["action"] != "FOLD":
+                self.bets[entry["uuid"]] = entry.get("amount", 0)
+        for actions in histories.values():
+            for entry in actions:
+                if entry["action"] not in BLINDS:
+                    last_action = ACTION_CODES.get(entry["action"], last_action)
+
+        state[PLAYER_STACK] = me.get("stack", 0)
+        state[PLAYER_BET] = self.bets.get(self._me, me.get("bet", 0))
+        if others:
+            state[OPP_STACK] = others[0].get("stack", 0)
+            state[OPP_BET] = self.bets.get(self.opponent, others[0].get("bet", 0))
+        state[POT_SIZE] = _pot_total(round_state.get("pot", {}))
+        state[IS_FLOP:IS_RIVER + 1] = STREET_FLAGS.get(street, (0, 0, 0))
+        state[NUM_PLAYERS] = len(seats)
+        state[NUM_ACTIVE] = len(self.active)
+        state[LAST_ACTION] = last_action
+
+        self.community_card = list(round_state.get("community_card", []))
+        self._hand_dirty = True
+        self.synced = True
+        return state
+
+    def update(self, new_action, round_state=None):
+        """receive_game_update_message 的增量更新：只改动出手者的筹码、下注、底池和 last_action"""
+        if not self.synced:
+            return
+        uuid = new_action.get("player_uuid")
+        action = new_action.get("action", "").upper()
+        state = self.state
+        if action == "FOLD":
+            self._deactivate(uuid)
+        elif action in ("CALL", "RAISE"):
+            paid = max(0, min(new_action.get("amount", 0) - self.bets.get(uuid, 0), self.stacks.get(uuid, 0)))
+            self.bets[uuid] = self.bets.get(uuid, 0) + paid
+            self.stacks[uuid] = self.stacks.get(uuid, 0) - paid
+            state[POT_SIZE] += paid
+            if uuid == self._me:
+                state[PLAYER_STACK] = self.stacks[uuid]
+                state[PLAYER_BET] = self.bets[uuid]
+            elif uuid == self.opponent:
+                state[OPP_STACK] = self.stacks[uuid]
+                state[OPP_BET] = self.bets[uuid]
+            # 全下的玩家在 pypokerengine 中不再是 participating
+            if self.stacks[uuid] == 0:
+                self._deactivate(uuid)
+        state[LAST_ACTION] = ACTION_CODES.get(action, state[LAST_ACTION])
+
+    def _deactivate(self, uuid):
+        if uuid in self.active:
+            self.active.discard(uuid)
+            self.state[NUM_ACTIVE] = len(self.active)
+            self._hand_dirty = True
+
+    def refresh(self):
+        """在局人数或公共牌变化后重新计算 hand_strength / hand_rank（胜率结果有 LRU 缓存）"""
+        if self._hand_dirty:
+            self._hand_dirty = False
+            self.state[HAND_STRENGTH] = self.state[HAND_RANK] = 0.0
+            # pypokerengine 默认发 52 张牌，出现 2–5 的牌时没有短牌牌力，两项保持为 0
+            cards = self.hole_card + self.community_card
+            if self.hole_card and is_short_deck(cards):
+                estimator = self.estimator or _default_estimator()
+                self.state[HAND_STRENGTH] = estimator.equity(self.hole_card, self.community_card,
+                                                             int(self.state[NUM_ACTIVE]))
+                self.state[HAND_RANK] = hand_features(self.hole_card, self.community_card)[1]
+        return self.state
+
+    def vector(self):
+        return self.refresh()
+
+
+class StateBatch:
+    """N 个 StateEncoder 共享一块 (N, 13) 的 float32 缓冲区，每个编码器只写自己的一行，encode 一次取出整批"""
+
+    def __init__(self, size, uuids=None, estimator=None):
+        self.buffer = np.zeros((size, STATE_DIM), dtype=np.float32)
+        uuids = uuids or [None] * size
+        self.encoders = [StateEncoder(uuids[i], self.buffer[i], estimator) for i in range(size)]
+
+    def __len__(self):
+        return len(self.encoders)
+
+    def __getitem__(self, index):
+        return self.encoders[index]
+
+    def encode(self, rows=None):
+        """返回 (N, 13) 状态数组（副本）；rows 指定时只取这些行"""
+        rows = range(len(self.encoders)) if rows is None else rows
+        for row in rows:
+            self.encoders[row].refresh()
+        return self.buffer[list(rows)]
+
+
+def encode_round_state(round_state, uuid=None, hole_card=None, estimator=None):
+    """一次性编码单个 round_state，返回长度 13 的 float32 数组"""
+    encoder = StateEncoder(uuid, estimator=estimator)
+    encoder.sync(round_state, hole_card)
+    return encoder.refresh()
+
+
+def encode_batch(round_states, uuids=None, hole_cards=None, estimator=None):
+    """一次调用编码多个 round_state，返回 (N, 13) float32 数组"""
+    batch = StateBatch(len(round_states), uuids, estimator)
+    hole_cards = hole_cards or [None] * len(round_states)
+    for encoder, round_state, hole_card in zip(batch.encoders, round_states, hole_cards):
+        encoder.sync(round_state, hole_card)
+    return batch.encode()
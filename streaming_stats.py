@@ -0,0 +1,228 @@
+import os
+import sys
+import json
+import math
+
+import numpy as np
+
+Z_95 = 1.959964
+# 每个分组的轨迹文件按回合追加一行：本次运行内的回合数、累计胜率、两边筹码的滑动平均、累计平均收益
+TRACE_COLUMNS = ["round", "win_rate", "player_avg", "opponent_avg", "avg_profit"]
+
+
+def wilson_interval(wins, n, z=Z_95):
+    """胜率的 Wilson 置信区间，n 较小或胜率接近 0/1 时比正态近似更稳"""
+    if n == 0:
+        return 0.0, 1.0
+    p = wins / n
+    denom = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+class RollingMean:
+    """定长环形缓冲区 + 滑动和，每次更新 O(1)；未满 window 个值时返回 nan（与 pandas rolling 一致）"""
+
+    def __init__(self, window, values=()):
+        self.window = window
+        self.values = list(values)[-window:]
+        self.pos = 0
+        self.total = float(sum(self.values))
+
+    def add(self, value):
+        if len(self.values) < self.window:
+            self.values.append(value)
+        else:
+            self.total -= self.values[self.pos]
+            self.values[self.pos] = value
+            self.pos = (self.pos + 1) % self.window
+        self.total += value
+        return self.mean()
+
+    def mean(self):
+        return self.total / self.window if len(self.values) == self.window else float("nan")
+
+    def state(self):
+        # 按时间顺序保存，恢复后 pos 从 0 开始
+        return self.values[self.pos:] + self.values[:self.pos]
+
+
+class GroupStats:
+    """一个分组（对手类型）的累计量：胜场、收益的 Welford 均值/方差（只计有收益的回合）、筹码滑动平均"""
+
+    def __init__(self, window=20, state=None):
+        state = state or {}
+        self.rounds = state.get("rounds", 0)
+        self.wins = state.get("wins", 0)
+        self.profit_n = state.get("profit_n", self.rounds)
+        self.profit_mean = state.get("profit_mean", 0.0)
+        self.profit_m2 = state.get("profit_m2", 0.0)
+        self.last_stack = state.get("last_stack")
+        self.player_avg = RollingMean(window, state.get("player_window", ()))
+        self.opponent_avg = RollingMean(window, state.get("opponent_window", ()))
+
+    def start_match(self, stack):
+        """新的一场对局：收益从 stack 重新算起，筹码滑动平均不跨过对局边界"""
+        self.last_stack = stack
+        self.player_avg = RollingMean(self.player_avg.window)
+        self.opponent_avg = RollingMean(self.opponent_avg.window)
+
+    def update(self, won, profit=None, player_stack=None, opponent_stack=None):
+        self.rounds += 1
+        self.wins += int(bool(won))
+        if profit is not None:
+            profit = float(profit)
+            self.profit_n += 1
+            delta = profit - self.profit_mean
+            self.profit_mean += delta / self.profit_n
+            self.profit_m2 += delta * (profit - self.profit_mean)
+        player_avg = self.player_avg.add(float(player_stack)) if player_stack is not None else float("nan")
+        opponent_avg = self.opponent_avg.add(float(opponent_stack)) if opponent_stack is not None else float("nan")
+        return (self.rounds, self.wins / self.rounds, player_avg, opponent_avg, self.profit_mean)
+
+    def summary(self):
+        n, m = self.rounds, self.profit_n
+        std = math.sqrt(self.profit_m2 / (m - 1)) if m > 1 else 0.0
+        half = Z_95 * std / math.sqrt(m) if m > 1 else float("inf")
+        return {
+            "rounds": n,
+            "win_rate": self.wins / n if n else 0.0,
+            "win_rate_ci": wilson_interval(self.wins, n),
+            "avg_profit": self.profit_mean,
+            "profit_ci": (self.profit_mean - half, self.profit_mean + half),
+            "player_avg": self.player_avg.mean(),
+            "opponent_avg": self.opponent_avg.mean(),
+        }
+
+    def state(self):
+        return {"rounds": self.rounds, "wins": self.wins, "profit_n": self.profit_n, "profit_mean": self.profit_mean,
+                "profit_m2": self.profit_m2, "last_stack": self.last_stack,
+                "player_window": self.player_avg.state(), "opponent_window": self.opponent_avg.state()}
+
+
+class StreamingStats:
+    """
+    流式统计：模拟器每结束一回合调用 update，按分组维护累计胜率、筹码滑动平均、平均收益及置信区间。
+    summary() 的累计量跨运行保存在 stats.json 中，load() 恢复后继续累加；
+    轨迹只记录本次运行：每次运行有自己的编号，save() 只把新增的行追加到 run_<编号>/<分组>.trace.bin，
+    行中的回合数、胜率和平均收益都从本次运行开始算，报表不会把多次运行拼在一条曲线上。
+    """
+
+    def __init__(self, path=None, window=20, initial_stack=1000, last_run=None):
+        self.path = path
+        self.window = window
+        self.initial_stack = initial_stack
+        self.groups = {}
+        # 检查点中最近一次运行的编号（读取报表用），本对象写入的是下一次运行
+        self.last_run = last_run
+        self.run = 0 if last_run is None else last_run + 1
+        self.run_groups = {}
+        self.pending = {}
+        # 本次运行中已写过轨迹文件的分组：之后的保存追加，首次保存时新建
+        self.saved = set()
+
+    def group(self, name):
+        if name not in self.groups:
+            self.groups[name] = GroupStats(self.window)
+        return self.groups[name]
+
+    def run_group(self, name):
+        if name not in self.run_groups:
+            self.run_groups[name] = GroupStats(self.window)
+        return self.run_groups[name]
+
+    def update(self, name, won, profit=None, player_stack=None, opponent_stack=None):
+        self.group(name).update(won, profit, player_stack, opponent_stack)
+        row = self.run_group(name).update(won, profit, player_stack, opponent_stack)
+        self.pending.setdefault(name, []).append(row)
+        return row
+
+    def start_match(self, name):
+        """新的一场对局：收益从 initial_stack 重新算起"""
+        self.group(name).start_match(self.initial_stack)
+        self.run_group(name).start_match(self.initial_stack)
+
+    def update_round(self, name, info, player="Player1"):
+        """用 ActionLog.rounds 中的一条回合汇总更新（收益为相对上一回合的筹码变化）"""
+        group = self.group(name)
+        stack = info.get("player1_stack")
+        last = group.last_stack if group.last_stack is not None else self.initial_stack
+        # CSV 中缺失的筹码是空字符串：不计收益，也不进入筹码滑动平均
+        if not isinstance(stack, (int, float)):
+            stack = None
+        opponent_stack = info.get("opponent_stack")
+        if not isinstance(opponent_stack, (int, float)):
+            opponent_stack = None
+        profit = stack - last if stack is not None else None
+        if profit is not None:
+            group.last_stack = stack
+        return self.update(name, info.get("winner") == player, profit, stack, opponent_stack)
+
+    def update_rounds(self, name, rounds_log):
+        """把一整场对局的回合汇总依次加入"""
+        self.start_match(name)
+        for round_num in sorted(rounds_log, key=int):
+            self.update_round(name, rounds_log[round_num])
+
+    def summary(self):
+        return {name: group.summary() for name, group in self.groups.items()}
+
+    def report(self):
+        print(f"{'group':<12}{'rounds':>8}{'win rate':>10}{'95% CI':>18}{'avg profit':>12}{'95% CI':>20}")
+        for name, s in self.summary().items():
+            low, high = s["win_rate_ci"]
+            p_low, p_high = s["profit_ci"]
+            print(f"{name:<12}{s['rounds']:>8}{s['win_rate']:>10.2%}{f'[{low:.3f}, {high:.3f}]':>18}"
+                  f"{s['avg_profit']:>12.2f}{f'[{p_low:.1f}, {p_high:.1f}]':>20}")
+
+    def trace(self, name, run=None):
+        """
+        第 run 次运行（默认本次运行）的 (回合数, 5) 轨迹数组：已保存部分内存映射读取，再接上尚未保存的行。
+        只读取检查点的报表用 run=stats.last_run。
+        """
+        run = self.run if run is None else run
+        saved = np.zeros((0, len(TRACE_COLUMNS)), dtype=np.float32)
+        path = self._trace_path(name, run)
+        if (run != self.run or name in self.saved) and path and os.path.exists(path) and os.path.getsize(path):
+            saved = np.memmap(path, dtype=np.float32, mode="r").reshape(-1, len(TRACE_COLUMNS))
+        pending = self.pending.get(name) if run == self.run else None
+        if not pending:
+            return saved
+        return np.concatenate([saved, np.array(pending, dtype=np.float32)])
+
+    def _trace_path(self, name, run=None):
+        run = self.run if run is None else run
+        return os.path.join(self.path, f"run_{run}", f"{name}.trace.bin") if self.path else None
+
+    def save(self, path=None):
+        self.path = path or self.path
+        os.makedirs(os.path.join(self.path, f"run_{self.run}"), exist_ok=True)
+        for name, rows in self.pending.items():
+            with open(self._trace_path(name), "ab" if name in self.saved else "wb") as f:
+                f.write(np.array(rows, dtype=np.float32).tobytes())
+            self.saved.add(name)
+        self.pending = {}
+        with open(os.path.join(self.path, "stats.json"), "w") as f:
+            json.dump({"window": self.window, "initial_stack": self.initial_stack, "last_run": self.run,
+                       "groups": {name: group.state() for name, group in self.groups.items()}}, f)
+
+    @classmethod
+    def load(cls, path, window=20, initial_stack=1000):
+        """读取检查点；目录不存在时返回空的统计对象（保存时创建）"""
+        state_path = os.path.join(path, "stats.json")
+        if not os.path.exists(state_path):
+            return cls(path, window, initial_stack)
+        with open(state_path) as f:
+            state = json.load(f)
+        stats = cls(path, state["window"], state["initial_stack"], state.get("last_run"))
+        stats.groups = {name: GroupStats(stats.window, group) for name, group in state["groups"].items()}
+        return stats
+
+
+if __name__ == "__main__":
+    # 用法：python streaming_stats.py [checkpoint_dir]  打印检查点中的统计
+    stats = StreamingStats.load(sys.argv[1] if len(sys.argv) > 1 else "logs/match_stats")
+    stats.report()
+    if stats.last_run is not None:
+        print(f"[📈] Last run: run_{stats.last_run}")
@@ -1,11 +1,10 @@
 import torch
 import torch.nn as nn
 import torch.optim as optim
-import random
-from collections import deque
-from rl_env import RLShortDeckEnv
+from rl_env import VecShortDeckEnv
 from dqn_agent import DQNAgent
 from shared_data import ACTION_SPACE  # ⬅️ 确保你这里定义了 ['fold', 'call', 'raise']
+from replay_buffer import ReplayBuffer
 
 # 参数
 EPISODES = 5000
@@ -14,61 +13,59 @@ LR = 0.001
 BATCH_SIZE = 64
 MEMORY_SIZE = 5000
 TARGET_UPDATE = 10
+NUM_ENVS = 16  # 并行环境数：一次前向计算为所有环境选择动作
+UPDATES_PER_STEP = NUM_ENVS  # 每次同步推进后的梯度更新次数；等于 NUM_ENVS 时与单环境一样每条转移一次更新
+PRIORITIZED = False  # True 时使用求和树优先经验回放
 
 # 初始化
 state_dim = 13
 action_dim = len(ACTION_SPACE)
 agent = DQNAgent(state_dim, action_dim)
-env = RLShortDeckEnv(agent=agent, opponent=None)
-memory = deque(maxlen=MEMORY_SIZE)
+env = VecShortDeckEnv(num_envs=NUM_ENVS)
+memory = ReplayBuffer(MEMORY_SIZE, state_dim, prioritized=PRIORITIZED)
 optimizer = optim.Adam(agent.policy_net.parameters(), lr=LR)
 loss_fn = nn.MSELoss()
 
 def train_step():
     if len(memory) < BATCH_SIZE:
         return
-    batch = random.sample(memory, BATCH_SIZE)
-    states, actions, rewards, next_states, dones = zip(*batch)
+    states, actions, rewards, next_states, dones, indices, weights = memory.sample(BATCH_SIZE)
 
-    # 保证每个 state 是 [13] 的 tensor
-    states = torch.stack([s if isinstance(s, torch.Tensor) else torch.tensor(s, dtype=torch.float32) for s in states])
-    next_states = torch.stack([s if isinstance(s, torch.Tensor) else torch.tensor(s, dtype=torch.float32) for s in next_states])
-
-    action_map = {"fold": 0, "call": 1, "raise": 2}
-    actions = torch.tensor([action_map[a] if isinstance(a, str) else a for a in actions], dtype=torch.long)
-
-    rewards = torch.tensor(rewards, dtype=torch.float32)
-    dones = torch.tensor(dones, dtype=torch.float32)
-
-    q_values = agent.policy_net(states).gather(1, actions.unsqueeze(1)).squeeze()
+    q_values = agent.policy_net(states).gather(1, actions.unsqueeze(1)).squeeze(1)
     next_q = agent.target_net(next_states).max(1)[0]
-    target = rewards + GAMMA * next_q * (1 - dones)
+    target = (rewards + GAMMA * next_q * (1 - dones)).detach()
 
-    loss = loss_fn(q_values, target.detach())
+    if memory.prioritized:
+        td_error = q_values - target
+        loss = (weights * td_error.pow(2)).mean()
+        memory.update_priorities(indices, td_error.detach().numpy())
+    else:
+        loss = loss_fn(q_values, target)
     optimizer.zero_grad()
     loss.backward()
     optimizer.step()
 
-# 主训练循环
-for episode in range(EPISODES):
-    state = env.reset()
-    total_reward = 0
-    done = False
+# 主训练循环：N 个环境同步推进，结束的环境自动重置
+states = env.reset()
+episode = 0
+while episode < EPISODES:
+    actions = agent.select_actions(states)
+    next_states, rewards, dones, info = env.step(actions)
 
-    while not done:
-        valid_actions = env.get_valid_actions()
-        action = agent.select_action(state, valid_actions)
-        next_state, reward, done, _ = env.step(action)
-
-        memory.append((state, action, reward, next_state, done))
+    # 结束的环境返回的是重置后的状态，转移中要存结束时的状态
+    stored_next = next_states.clone()
+    if dones.any():
+        stored_next[torch.from_numpy(dones)] = info["terminal_states"]
+    memory.add_batch(states, actions, rewards, stored_next, dones)
+    for _ in range(UPDATES_PER_STEP):
         train_step()
-        state = next_state
-        total_reward += reward
-
-    if episode % TARGET_UPDATE == 0:
-        agent.target_net.load_state_dict(agent.policy_net.state_dict())
+    states = next_states
 
-    print(f"[Episode {episode}] Total reward: {total_reward}")
+    for total_reward in info.get("episode_rewards", []):
+        if episode % TARGET_UPDATE == 0:
+            agent.target_net.load_state_dict(agent.policy_net.state_dict())
+        print(f"[Episode {episode}] Total reward: {total_reward:.0f}")
+        episode += 1
 
 # 保存模型
 agent.save_model("trained_dqn.pt")